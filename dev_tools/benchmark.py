@@ -0,0 +1,100 @@
+"""Time the hot paths of `jchess` over a fixed, randomly played game.
+
+Run with `python dev_tools/benchmark.py`; each benchmark prints the average time taken.
+"""
+import random
+from copy import deepcopy
+from time import perf_counter
+
+from jchess.board import Board
+from jchess.pieces import Role
+from jchess.search import Budget, Searcher
+from jchess.testutils import exposes_king_by_copy
+
+SEED = 0
+PLY_COUNT = 10
+
+
+def _random_game(seed: int = SEED, ply_count: int = PLY_COUNT) -> list[Board]:
+    """Play random moves, returning a copy of the board before each one."""
+    rng = random.Random(seed)
+    board = Board()
+    boards = []
+    for _ in range(ply_count):
+        boards.append(deepcopy(board))
+        src = rng.choice([v for v in board if board.can_move_from(v)])
+        board.process_move(src, rng.choice(sorted(board.targets_of[src], key=tuple)))
+    return boards
+
+
+def _per_ply_by_copy(boards: list[Board]) -> float:
+    """Time taken to exclude risky targets the old way: a copy of the board per move."""
+    start = perf_counter()
+    for board in boards:
+        board.protect_king = False
+        board.update_targets()
+        for coord, targets in board.targets_of.items():
+            _ = {t for t in targets if not exposes_king_by_copy(board, coord, t)}
+    return (perf_counter() - start) / len(boards)
+
+
+def _per_ply_by_pins(boards: list[Board]) -> float:
+    """Time taken to exclude risky targets using checks & pins."""
+    start = perf_counter()
+    for board in boards:
+        board.protect_king = True
+        board.update_targets()
+    return (perf_counter() - start) / len(boards)
+
+
+def _update_targets(boards: list[Board], repeat: int = 20) -> float:
+    """Time taken by a full `Board.update_targets` with the dict based engine."""
+    start = perf_counter()
+    for _ in range(repeat):
+        for board in boards:
+            board.update_targets()
+    return (perf_counter() - start) / (repeat * len(boards))
+
+
+def _per_ply_process_move(incremental: bool, ply_count: int = 100) -> float:
+    """Time taken by `Board.process_move` during a random game."""
+    rng = random.Random(SEED)
+    board = Board(incremental=incremental)
+    duration = 0.0
+    for _ in range(ply_count):
+        src = rng.choice([v for v in board if board.can_move_from(v)])
+        dst = rng.choice(sorted(board.targets_of[src], key=tuple))
+        piece = board[src]
+        promote = piece and piece.role is Role.PAWN and dst.y in [0, 7]
+        start = perf_counter()
+        board.process_move(src, dst, promote_to=Role.QUEEN if promote else None)
+        duration += perf_counter() - start
+    return duration / ply_count
+
+
+def main() -> None:
+    boards = _random_game()
+    by_copy = _per_ply_by_copy(deepcopy(boards))
+    by_pins = _per_ply_by_pins(deepcopy(boards))
+    print(f"Legal targets per ply ({PLY_COUNT} plies of a random game):")
+    print(f"  copy per move:  {1000 * by_copy:9.3f}ms")
+    print(
+        f"  checks & pins:  {1000 * by_pins:9.3f}ms ({by_copy / by_pins:.0f}x faster)"
+    )
+
+    print("Board.update_targets per ply (dict engine):")
+    print(f"  full update:    {1000 * _update_targets(deepcopy(boards)):9.3f}ms")
+
+    full = _per_ply_process_move(incremental=False)
+    incremental = _per_ply_process_move(incremental=True)
+    print("Board.process_move per ply (100 plies of a random game):")
+    print(f"  full update:    {1000 * full:9.3f}ms")
+    print(f"  incremental:    {1000 * incremental:9.3f}ms ({full / incremental:.1f}x)")
+
+    result = Searcher().search(Board(), Budget(seconds=5.0))
+    print(f"Search from the starting position (5s budget, depth {result.depth}):")
+    print(f"  throughput:     {result.nps:9.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
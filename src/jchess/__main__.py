@@ -1,5 +1,5 @@
 """Allow program can be run as `python -m jchess`."""
 
-from jchess.run import run
+from jchess.run import main
 
-run()
+main()
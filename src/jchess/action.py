@@ -47,25 +47,23 @@ ACTION_LOOKUP_LHS = {
 ACTION_LOOKUP_GENERIC = ACTION_LOOKUP_LHS | ACTION_LOOKUP_RHS
 
 
+def to_action(key: str, lookup: dict[str, Action]) -> Action:
+    """Translate a keystroke (from `get_input`) into an action, using `lookup`."""
+    if key == ESC:
+        raise ExitGame
+    return lookup.get(key.upper(), Action.IGNORE)
+
+
 def get_action_rhs() -> Action:
     """Get input form the right hand side of keyboard (arrow, enter and end keys)."""
-    x = get_input()
-    if x == ESC:
-        raise ExitGame
-    return ACTION_LOOKUP_RHS.get(x, Action.IGNORE)
+    return to_action(get_input(), ACTION_LOOKUP_RHS)
 
 
 def get_action_lhs() -> Action:
     """Get input from the left hand side of keyboard (WASD, tab and Q keys)."""
-    x = get_input().upper()
-    if x == ESC:
-        raise ExitGame
-    return ACTION_LOOKUP_LHS.get(x, Action.IGNORE)
+    return to_action(get_input(), ACTION_LOOKUP_LHS)
 
 
 def get_action() -> Action:
     """Get input from either side of the keyboard."""
-    x = get_input().upper()
-    if x == ESC:
-        raise ExitGame
-    return ACTION_LOOKUP_GENERIC.get(x, Action.IGNORE)
+    return to_action(get_input(), ACTION_LOOKUP_GENERIC)
@@ -0,0 +1,371 @@
+"""Vectorised move generation for many positions at once; requires `numpy`.
+
+`numpy` is an optional dependency, installed by `pip install jchess[batch]`.
+
+`generate_targets` packs positions into arrays (via `CompactBoard`) and computes the
+targets of every square of every position with whole-array shifts & masks, so the
+python overhead is per square of the board rather than per position. The results are
+the masks of `bitboard.compute_masks`, so they agree with `Board.targets_of`.
+
+Rather than trying each move (as `bitboard` does) moves are made legal using the checks
+& pins of each player's king, so positions where a player doesn't have exactly one king
+fall back to `bitboard.compute_masks`.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from jchess.bitboard import (
+    CARDINAL_DIRS,
+    DIAGONAL_DIRS,
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    L_DIRS,
+    PAWN_ATTACKS,
+    PAWN_DY,
+    RAYS,
+    compute_masks,
+)
+from jchess.board import Board
+from jchess.compact import MOVED_BIT, ROLES, SIZE, TWO_BIT, CompactBoard, encode
+from jchess.pieces import Piece, Player, Role
+
+KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN, _ = list(Role)
+KING_DIRS = DIAGONAL_DIRS + CARDINAL_DIRS
+
+U64: Any = np.uint64
+Masks = NDArray[np.uint64]
+Rows = NDArray[np.intp]
+Squares = NDArray[np.intp] | int
+
+FULL = U64(0xFFFF_FFFF_FFFF_FFFF)
+ZERO = U64(0)
+ONE = U64(1)
+# masks which clear the squares a shift by `dx` would have wrapped around the board
+FILE_MASKS = {
+    dx: U64(sum(1 << i for i in range(64) if 0 <= i % 8 - dx < 8))
+    for dx in range(-2, 3)
+}
+
+KNIGHT_TABLE = np.array(KNIGHT_ATTACKS, dtype=np.uint64)
+KING_TABLE = np.array(KING_ATTACKS, dtype=np.uint64)
+PAWN_TABLES = {p: np.array(masks, dtype=np.uint64) for p, masks in PAWN_ATTACKS.items()}
+RAY_TABLES = {d: np.array(masks, dtype=np.uint64) for d, masks in RAYS.items()}
+
+
+def _between(i: int, j: int) -> int:
+    for ray in RAYS.values():
+        if ray[i] >> j & 1:
+            return ray[i] & ~ray[j] & ~(1 << j)
+    return 0
+
+
+# squares strictly between two squares on a line (zero if they aren't on a line)
+BETWEEN = np.array(
+    [[_between(i, j) for j in range(64)] for i in range(64)], dtype=np.uint64
+)
+
+
+def _shift(masks: Masks, dx: int, dy: int) -> Masks:
+    """Move every square of `masks` by `(dx, dy)`, dropping those leaving the board."""
+    bits = dx + 8 * dy
+    moved = masks << U64(bits) if bits > 0 else masks >> U64(-bits)
+    shifted: Masks = moved & FILE_MASKS[dx]
+    return shifted
+
+
+def _squares(indices: Iterable[int]) -> Any:
+    return U64(sum(1 << i for i in set(indices)))
+
+
+def _increasing(direction: tuple[int, int]) -> bool:
+    return direction[0] + 8 * direction[1] > 0
+
+
+def _first(blockers: Masks, increasing: bool) -> Masks:
+    """Find the blocker nearest the start of a ray (zero if there isn't one)."""
+    first: Masks
+    if increasing:
+        first = blockers & (~blockers + ONE)
+        return first
+    for bits in (1, 2, 4, 8, 16, 32):
+        blockers = blockers | blockers >> U64(bits)
+    first = blockers ^ blockers >> ONE
+    return first
+
+
+def _ray_attacks(i: Squares, direction: tuple[int, int], occupied: Masks) -> Masks:
+    """Squares along the ray from `i`, up to and including the first blocker."""
+    ray = RAY_TABLES[direction][i]
+    increasing = _increasing(direction)
+    first = _first(ray & occupied, increasing)
+    attacks: Masks
+    if increasing:
+        attacks = ray & ((first << ONE) - ONE)  # everything if `first` is zero
+    else:
+        attacks = np.where(first == ZERO, ray, ray & ~(first - ONE))
+    return attacks
+
+
+def _slider_attacks(i: Squares, dirs: Iterable[tuple[int, int]], occ: Masks) -> Masks:
+    attacks = np.zeros_like(occ)
+    for direction in dirs:
+        attacks |= _ray_attacks(i, direction, occ)
+    return attacks
+
+
+def _fill_attacks(
+    masks: Masks, empty: Masks, dirs: Iterable[tuple[int, int]], slides: bool
+) -> Masks:
+    """Squares attacked by the pieces of `masks` moving along `dirs`."""
+    attacks = np.zeros_like(masks)
+    for dx, dy in dirs:
+        reached = _shift(masks, dx, dy)
+        attacks |= reached
+        for _ in range(6 if slides else 0):
+            reached = _shift(reached & empty, dx, dy)
+            attacks |= reached
+    return attacks
+
+
+def _index(single: Masks) -> NDArray[np.intp]:
+    """Index of the only set bit of each mask (zero if no bits are set)."""
+    powers = np.where(single == ZERO, ONE, single).astype(np.float64)
+    return np.log2(powers).astype(np.intp)  # powers of 2 are exact as floats
+
+
+class _Positions:
+    """Occupancy masks of many positions, split by player and by role."""
+
+    def __init__(self, data: NDArray[np.uint8]) -> None:
+        self.codes = data[:, :64]
+        self.passant = data[:, 64].astype(np.intp)
+        two = self.codes & TWO_BIT != 0
+        self.by_player = {
+            Player.ONE: self.__select((self.codes != 0) & ~two),
+            Player.TWO: self.__select(two),
+        }
+        self.by_role = {
+            role: self.__select(self.codes & 0x07 == ROLES.index(role) + 1)
+            for role in ROLES
+        }
+        self.occupied = self.by_player[Player.ONE] | self.by_player[Player.TWO]
+
+    @staticmethod
+    def __select(selected: NDArray[np.bool_]) -> Masks:
+        packed = np.packbits(selected, axis=1, bitorder="little")
+        return packed.view("<u8").ravel().astype(np.uint64)
+
+    def pieces(self, player: Player, *roles: Role) -> Masks:
+        masks = np.zeros_like(self.occupied)
+        for role in roles:
+            masks |= self.by_role[role]
+        return masks & self.by_player[player]
+
+    def attack_map(self, player: Player, occupied: Masks) -> Masks:
+        """Every square attacked by `player`, as `Position.is_attacked` would find."""
+        empty = ~occupied
+        pawn_dirs = ((1, PAWN_DY[player]), (-1, PAWN_DY[player]))
+        return (
+            _fill_attacks(self.pieces(player, KNIGHT), empty, L_DIRS, False)
+            | _fill_attacks(self.pieces(player, KING), empty, KING_DIRS, False)
+            | _fill_attacks(self.pieces(player, PAWN), empty, pawn_dirs, False)
+            | _fill_attacks(
+                self.pieces(player, BISHOP, QUEEN), empty, DIAGONAL_DIRS, True
+            )
+            | _fill_attacks(
+                self.pieces(player, ROOK, QUEEN), empty, CARDINAL_DIRS, True
+            )
+        )
+
+    def attackers(self, i: Squares, by: Player, occupied: Masks, rows: Any) -> Masks:
+        """Pieces of `by` attacking `i` in each of the positions selected by `rows`.
+
+        :param occupied: Occupancy masks to use in place of `self.occupied[rows]`.
+        """
+        role = {r: masks[rows] for r, masks in self.by_role.items()}
+        diagonal = _slider_attacks(i, DIAGONAL_DIRS, occupied)
+        cardinal = _slider_attacks(i, CARDINAL_DIRS, occupied)
+        attackers: Masks = self.by_player[by][rows] & (
+            (KNIGHT_TABLE[i] & role[KNIGHT])
+            | (KING_TABLE[i] & role[KING])
+            | (PAWN_TABLES[~by][i] & role[PAWN])
+            | (diagonal & (role[BISHOP] | role[QUEEN]))
+            | (cardinal & (role[ROOK] | role[QUEEN]))
+        )
+        return attackers
+
+
+class _Side:
+    """Checks & pins of one player's king, used to make that player's moves legal."""
+
+    def __init__(self, pos: _Positions, player: Player) -> None:
+        self.pos = pos
+        self.player = player
+        self.own = pos.by_player[player]
+        kings = self.own & pos.by_role[KING]
+        self.king = _index(kings)
+        occupied = pos.occupied
+
+        # the king may not move to a square attacked "through" it's current square
+        self.danger = pos.attack_map(~player, occupied & ~kings)
+        self.path_danger = pos.attack_map(~player, occupied)
+
+        checkers = pos.attackers(self.king, ~player, occupied, slice(None))
+        several = checkers & (checkers - ONE) != ZERO
+        self.block = np.where(
+            checkers == ZERO,
+            FULL,
+            np.where(several, ZERO, checkers | BETWEEN[self.king, _index(checkers)]),
+        )
+
+        # a piece is pinned if it's the first blocker & the second is an opposing slider
+        self.pins: list[tuple[Masks, Masks]] = []
+        for dirs, sliders in (
+            (DIAGONAL_DIRS, pos.pieces(~player, BISHOP, QUEEN)),
+            (CARDINAL_DIRS, pos.pieces(~player, ROOK, QUEEN)),
+        ):
+            for direction in dirs:
+                ray = RAY_TABLES[direction][self.king]
+                first = _first(ray & occupied, _increasing(direction))
+                beyond = _ray_attacks(self.king, direction, occupied & ~first)
+                pinner = beyond & occupied & ~first & sliders
+                pinned = (pinner != ZERO) & (first & self.own != ZERO)
+                self.pins.append((np.where(pinned, first, ZERO), beyond))
+
+    def is_safe(self, rows: Rows, king: Squares, removed: Masks, added: Masks) -> Any:
+        """Check the king (at `king` after the move) isn't attacked in each row.
+
+        :param removed: Squares emptied by the move; their pieces can't attack.
+        :param added: Squares filled by the move.
+        """
+        occupied = (self.pos.occupied[rows] & ~removed) | added
+        attackers = self.pos.attackers(king, ~self.player, occupied, rows) & ~removed
+        return attackers == ZERO
+
+    def legal(self, i: int, pseudo: Masks) -> Masks:
+        """Restrict targets of (non-king) pieces at `i` to those leaving no check."""
+        legal: Masks = pseudo & ~self.own & self.block
+        bit = ONE << U64(i)
+        for pinned, allowed in self.pins:
+            legal = np.where(pinned & bit != ZERO, legal & allowed, legal)
+        return legal
+
+    def pawn_targets(self, i: int, moved: NDArray[np.bool_]) -> Masks:
+        """Pseudo-legal steps, jumps & captures (except en passant) of pawns at `i`."""
+        pos, dy = self.pos, PAWN_DY[self.player]
+        y = i // 8
+        empty = ~pos.occupied
+        targets: Masks = PAWN_TABLES[self.player][i] & pos.by_player[~self.player]
+        if 0 <= y + dy < 8:
+            step = empty & (ONE << U64(i + 8 * dy))
+            targets = targets | step
+            if 0 <= y + 2 * dy < 8:
+                jump = empty & (ONE << U64(i + 16 * dy))
+                targets |= np.where((step != ZERO) & ~moved, jump, ZERO)
+        return targets
+
+    def passant_targets(self, i: int, pawns: NDArray[np.bool_]) -> Masks:
+        """En passant captures by pawns at `i`, each tried out in full."""
+        pos, dy = self.pos, PAWN_DY[self.player]
+        x, y = i % 8, i // 8
+        targets = np.zeros_like(pos.occupied)
+        for dx in (1, -1):
+            if not (0 <= x + dx < 8 and 0 <= y + dy < 8):
+                continue
+            j, dst = i + dx, i + dx + 8 * dy
+            opposed = pos.by_player[~self.player] >> U64(j) & ONE != ZERO
+            rows = np.nonzero(pawns & (pos.passant == j) & opposed)[0]
+            if rows.size:
+                src_bit, j_bit, dst_bit = (ONE << U64(k) for k in (i, j, dst))
+                removed = src_bit | j_bit | dst_bit
+                safe = self.is_safe(rows, self.king[rows], removed, dst_bit)
+                targets[rows[safe]] |= dst_bit
+        return targets
+
+    def king_targets(self, i: int, unmoved: NDArray[np.bool_]) -> Masks:
+        """Legal targets of kings at `i`, including castling."""
+        pos = self.pos
+        targets: Masks = KING_TABLE[i] & ~self.own & ~self.danger
+        x_king, y = i % 8, i // 8
+        rook = encode(Piece(ROOK, self.player))  # ie unmoved
+        for x_rook, sign in zip((0, 7), (1, -1)):
+            dst = 8 * y + x_king - 2 * sign
+            if not 0 <= x_king - 2 * sign < 8:
+                continue
+            between = _squares(8 * y + x for x in range(x_rook + sign, 4, sign))
+            path = _squares(8 * y + x for x in (4, 4 - sign, 4 - 2 * sign))
+            rows = np.nonzero(
+                unmoved
+                & (pos.codes[:, 8 * y + x_rook] == rook)
+                & (pos.occupied & between == ZERO)
+                & (self.path_danger & path == ZERO)
+            )[0]
+            if rows.size:
+                new_rook = 8 * y + (5 if sign < 0 else 3)
+                removed = _squares((i, dst, 8 * y + x_rook))
+                added = _squares((dst, new_rook))
+                safe = self.is_safe(rows, dst, removed, added)
+                targets[rows[safe]] |= ONE << U64(dst)
+        return targets
+
+
+def pack(boards: Iterable[Board | CompactBoard]) -> NDArray[np.uint8]:
+    """Pack positions into an array with a row of `compact.SIZE` bytes for each."""
+    data = b"".join(
+        (b if isinstance(b, CompactBoard) else CompactBoard.from_board(b)).data
+        for b in boards
+    )
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, SIZE)
+
+
+def generate_targets(boards: Iterable[Board | CompactBoard]) -> Masks:
+    """Compute the targets of every square of every position at once.
+
+    :param boards: Positions to find the targets of.
+    :return: Array of shape `(len(boards), 64)`; element `[n, 8 * y + x]` is the mask of
+        the targets of the piece at `V(x, y)` of the n-th board (as `compute_masks`).
+    """
+    data = pack(boards)
+    pos = _Positions(data)
+    result = np.zeros((len(data), 64), dtype=np.uint64)
+    if not data.size:
+        return result
+
+    sides = [_Side(pos, player) for player in Player]
+    roles = pos.codes & 0x07
+    moved = pos.codes & MOVED_BIT != 0
+    for i in range(64):
+        diagonal = _slider_attacks(i, DIAGONAL_DIRS, pos.occupied)
+        cardinal = _slider_attacks(i, CARDINAL_DIRS, pos.occupied)
+        for side in sides:
+            mine = side.own >> U64(i) & ONE != ZERO
+            if not mine.any():
+                continue
+            is_role = {r: mine & (roles[:, i] == ROLES.index(r) + 1) for r in ROLES}
+            pseudo = np.select(
+                [is_role[KNIGHT], is_role[BISHOP], is_role[ROOK], is_role[QUEEN]],
+                [KNIGHT_TABLE[i], diagonal, cardinal, diagonal | cardinal],
+                ZERO,
+            )
+            pseudo |= np.where(is_role[PAWN], side.pawn_targets(i, moved[:, i]), ZERO)
+            legal = side.legal(i, pseudo)
+            if is_role[PAWN].any():
+                legal |= side.passant_targets(i, is_role[PAWN])
+            if is_role[KING].any():
+                kings = side.king_targets(i, is_role[KING] & ~moved[:, i])
+                legal = np.where(is_role[KING], kings, legal)
+            result[:, i] |= np.where(mine, legal, ZERO)
+
+    # checks & pins assume each player has exactly one king; try out each move instead
+    counts = [
+        (pos.codes & 0x0F == encode(Piece(KING, player))).sum(axis=1)
+        for player in Player
+    ]
+    for row in np.nonzero((counts[0] != 1) | (counts[1] != 1))[0]:
+        board = CompactBoard(data[row].tobytes())
+        result[row] = compute_masks(board, board.passant)
+    return result
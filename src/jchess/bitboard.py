@@ -0,0 +1,252 @@
+"""Bitboard implementation of the move generation used by `Board.update_targets`.
+
+Each square `V(x, y)` maps to bit `8 * y + x` of a python `int`, so a set of squares is
+a single 64-bit mask. Knight & king moves come from precomputed tables and sliding
+pieces use precomputed rays which are cut at the first blocker.
+
+The results are identical to those of the dict based engine in `jchess.board` (which is
+kept as the reference implementation) but are computed without any `V` arithmetic.
+"""
+
+from collections.abc import Iterator, Mapping
+from itertools import product
+
+from jchess.geometry import SQUARES, Vector, VectorSet
+from jchess.pieces import LocPiece, Piece, Player, Role
+
+KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN, _ = list(Role)
+
+# same iteration order as `Board.targets_of`
+ORDER = tuple(product(range(8), range(8)))
+
+DIAGONAL_DIRS = (1, 1), (1, -1), (-1, 1), (-1, -1)
+CARDINAL_DIRS = (1, 0), (0, 1), (-1, 0), (0, -1)
+L_DIRS = (-1, -2), (-1, 2), (1, -2), (1, 2), (-2, -1), (-2, 1), (2, -1), (2, 1)
+SLIDER_DIRS = {QUEEN: DIAGONAL_DIRS + CARDINAL_DIRS, ROOK: CARDINAL_DIRS}
+SLIDER_DIRS[BISHOP] = DIAGONAL_DIRS
+PAWN_DY = {Player.ONE: -1, Player.TWO: 1}
+
+
+def _index(x: int, y: int) -> int | None:
+    return 8 * y + x if 0 <= x < 8 and 0 <= y < 8 else None
+
+
+def _mask(xys: Iterator[tuple[int, int]]) -> int:
+    return sum(1 << i for x, y in xys if (i := _index(x, y)) is not None)
+
+
+def _ray(i: int, dx: int, dy: int) -> int:
+    x, y = i % 8, i // 8
+    return _mask((x + d * dx, y + d * dy) for d in range(1, 8))
+
+
+# Precomputed tables, each indexed by square index ----------------------------------- #
+
+KNIGHT_ATTACKS = tuple(
+    _mask((i % 8 + dx, i // 8 + dy) for dx, dy in L_DIRS) for i in range(64)
+)
+KING_ATTACKS = tuple(
+    _mask((i % 8 + dx, i // 8 + dy) for dx, dy in DIAGONAL_DIRS + CARDINAL_DIRS)
+    for i in range(64)
+)
+# squares attacked by a pawn of the given player standing on the square
+PAWN_ATTACKS = {
+    player: tuple(_mask((i % 8 + dx, i // 8 + dy) for dx in (1, -1)) for i in range(64))
+    for player, dy in PAWN_DY.items()
+}
+RAYS = {
+    (dx, dy): tuple(_ray(i, dx, dy) for i in range(64))
+    for dx, dy in DIAGONAL_DIRS + CARDINAL_DIRS
+}
+
+
+def bits(mask: int) -> Iterator[int]:
+    """Iterate over the indices of the set bits of `mask`, lowest first."""
+    while mask:
+        lsb = mask & -mask
+        yield lsb.bit_length() - 1
+        mask ^= lsb
+
+
+def to_vectors(mask: int) -> VectorSet:
+    return {SQUARES[i] for i in bits(mask)}
+
+
+def slider_attacks(i: int, dirs: tuple[tuple[int, int], ...], occupied: int) -> int:
+    """Squares reached from `i` along `dirs`, up to and including the first blocker."""
+    attacks = 0
+    for d in dirs:
+        ray = RAYS[d][i]
+        blockers = ray & occupied
+        if blockers:
+            # rays with a positive step have their nearest square in the lowest bit
+            if d[0] + 8 * d[1] > 0:
+                ray ^= RAYS[d][(blockers & -blockers).bit_length() - 1]
+            else:
+                ray ^= RAYS[d][blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+
+class Position:
+    """Occupancy masks of a board, split by player and by role."""
+
+    def __init__(self, squares: Mapping[Vector, Piece | None]) -> None:
+        self.pieces: list[Piece | None] = [None] * 64
+        self.by_player = {Player.ONE: 0, Player.TWO: 0}
+        self.by_role = {role: 0 for role in Role}
+        for coord, piece in squares.items():
+            if piece:
+                i = 8 * coord.y + coord.x
+                self.pieces[i] = piece
+                self.by_player[piece.player] |= 1 << i
+                self.by_role[piece.role] |= 1 << i
+        self.occupied = self.by_player[Player.ONE] | self.by_player[Player.TWO]
+
+    def is_attacked(self, i: int, by: Player, occupied: int, removed: int = 0) -> bool:
+        """Check if any piece of `by` (excluding those on `removed`) attacks square `i`.
+
+        :param occupied: Occupancy mask to use in place of `self.occupied`.
+        :param removed: Mask of squares whose pieces should be disregarded.
+        """
+        attackers = self.by_player[by] & ~removed
+        role = self.by_role
+        diagonal = slider_attacks(i, DIAGONAL_DIRS, occupied)
+        cardinal = slider_attacks(i, CARDINAL_DIRS, occupied)
+        return bool(
+            attackers
+            & (
+                (KNIGHT_ATTACKS[i] & role[KNIGHT])
+                | (KING_ATTACKS[i] & role[KING])
+                | (PAWN_ATTACKS[~by][i] & role[PAWN])
+                | (diagonal & (role[BISHOP] | role[QUEEN]))
+                | (cardinal & (role[ROOK] | role[QUEEN]))
+            )
+        )
+
+
+def _pawn_targets(pos: Position, i: int, pawn: Piece, passant: LocPiece | None) -> int:
+    x, y = i % 8, i // 8
+    dy = PAWN_DY[pawn.player]
+    empty = ~pos.occupied
+    targets = 0
+
+    step = _index(x, y + dy)
+    if step is not None and empty >> step & 1:
+        targets |= 1 << step
+        jump = _index(x, y + 2 * dy)
+        if not pawn.moved and jump is not None and empty >> jump & 1:
+            targets |= 1 << jump
+
+    targets |= PAWN_ATTACKS[pawn.player][i] & pos.by_player[~pawn.player]
+
+    # `passant` is only capturable if the very same piece is still at its coordinate
+    j = 8 * passant.coord.y + passant.coord.x if passant else -1
+    if (
+        passant
+        and passant.piece.player is not pawn.player
+        and pos.pieces[j] == passant.piece
+    ):
+        for dx in (1, -1):
+            capture = _index(x + dx, y + dy)
+            if capture is not None and _index(x + dx, y) == j:
+                targets |= 1 << capture
+    return targets
+
+
+def _castling_targets(pos: Position, i: int, king: Piece) -> int:
+    x_king, y_king = i % 8, i // 8
+    targets = 0
+    for x_rook, sign in zip((0, 7), (1, -1)):
+        rook = pos.pieces[8 * y_king + x_rook]
+        between = _mask((x, y_king) for x in range(x_rook + sign, 4, sign))
+        # the king can't be in, pass through or move into check
+        path = (8 * y_king + x for x in (4, 4 - sign, 4 - 2 * sign))
+        dst = _index(x_king - 2 * sign, y_king)
+        if (
+            rook == Piece(ROOK, king.player)  # ie unmoved
+            and not between & pos.occupied
+            and not any(pos.is_attacked(j, ~king.player, pos.occupied) for j in path)
+        ):
+            targets |= 1 << dst if dst is not None else 0
+    return targets
+
+
+def _is_safe(pos: Position, i: int, j: int) -> bool:
+    """Check the player moving the piece at `i` to `j` is not left in check."""
+    piece = pos.pieces[i]
+    assert piece, "Only call this function on an occupied square."
+    player = piece.player
+    src, dst = 1 << i, 1 << j
+    removed, added = src | dst, dst
+
+    # en passant removes a pawn which isn't on the destination square
+    dx = j % 8 - i % 8
+    if piece.role is PAWN and dx and not pos.occupied & dst:
+        removed |= 1 << (8 * (i // 8) + j % 8)
+    # castling also moves the rook
+    if piece.role is KING and abs(dx) == 2:
+        y = i // 8
+        removed |= 1 << (8 * y + (7 if dx > 0 else 0))
+        added |= 1 << (8 * y + (5 if dx > 0 else 3))
+
+    occupied = (pos.occupied & ~removed) | added
+    kings = pos.by_role[KING] & pos.by_player[player] & ~src
+    if piece.role is KING:
+        kings |= dst
+    return not any(pos.is_attacked(k, ~player, occupied, removed) for k in bits(kings))
+
+
+def _safe_only(pos: Position, i: int, targets: int) -> int:
+    return sum(1 << j for j in bits(targets) if _is_safe(pos, i, j))
+
+
+def compute_masks(
+    squares: Mapping[Vector, Piece | None],
+    passant: LocPiece | None,
+    *,
+    protect_king: bool = True,
+) -> list[int]:
+    """Targets of the piece on each square, as a mask indexed by square index.
+
+    :param squares: Mapping from every coordinate of the board to it's piece.
+    :param passant: Piece which is vulnerable to en passant (if any).
+    :param protect_king: If set, exclude moves which leave the mover in check.
+    :return: Mask of the targets of each square (zero for empty squares).
+    """
+    pos = Position(squares)
+    masks = [0] * 64
+
+    for i in bits(pos.occupied):
+        piece = pos.pieces[i]
+        assert piece, "Occupied squares should contain a piece."
+        own = pos.by_player[piece.player]
+        if piece.role is PAWN:
+            targets = _pawn_targets(pos, i, piece, passant)
+        elif piece.role is KNIGHT:
+            targets = KNIGHT_ATTACKS[i] & ~own
+        elif piece.role is KING:
+            targets = KING_ATTACKS[i] & ~own
+            if not piece.moved:
+                targets |= _castling_targets(pos, i, piece)
+        else:
+            targets = slider_attacks(i, SLIDER_DIRS[piece.role], pos.occupied) & ~own
+        masks[i] = _safe_only(pos, i, targets) if protect_king else targets
+
+    return masks
+
+
+def compute_targets(
+    squares: Mapping[Vector, Piece | None],
+    passant: LocPiece | None,
+    *,
+    protect_king: bool = True,
+) -> dict[Vector, VectorSet]:
+    """Bitboard equivalent of `Board.update_targets`.
+
+    Takes the same arguments as `compute_masks`.
+
+    :return: Mapping from every coordinate to the set of coordinates it targets.
+    """
+    masks = compute_masks(squares, passant, protect_king=protect_king)
+    return {SQUARES[8 * y + x]: to_vectors(masks[8 * y + x]) for x, y in ORDER}
@@ -1,45 +1,418 @@
-from copy import deepcopy
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from enum import Enum, auto
 from itertools import product
+from typing import Any
 
-from jchess.geometry import V, Vector, VectorSet
+from jchess.bitboard import compute_targets
+from jchess.geometry import SQUARES, V, Vector, VectorSet, neighbors, ray, square
 from jchess.pieces import LocPiece, Piece, Player, Role
+from jchess.profiling import timed
+from jchess.zobrist import SIDE_KEY, castling_key, passant_key, piece_key, zobrist_key
 
 KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN, _ = list(Role)
 
 BACK_ROW_ROLES = (ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK)
 BOARD_TEMPLATE = (
-    *((V(x, 0), Piece(role, Player.TWO)) for x, role in enumerate(BACK_ROW_ROLES)),
-    *((V(x, 1), Piece(PAWN, Player.TWO)) for x in range(8)),
-    *((V(x, y), None) for x, y in product(range(8), range(2, 6))),
-    *((V(x, 6), Piece(PAWN, Player.ONE)) for x in range(8)),
-    *((V(x, 7), Piece(role, Player.ONE)) for x, role in enumerate(BACK_ROW_ROLES)),
+    *((square(x, 0), Piece(role, Player.TWO)) for x, role in enumerate(BACK_ROW_ROLES)),
+    *((square(x, 1), Piece(PAWN, Player.TWO)) for x in range(8)),
+    *((square(x, y), None) for x, y in product(range(8), range(2, 6))),
+    *((square(x, 6), Piece(PAWN, Player.ONE)) for x in range(8)),
+    *((square(x, 7), Piece(role, Player.ONE)) for x, role in enumerate(BACK_ROW_ROLES)),
 )
 
 DIAGONAL_VECS = V(1, 1), V(1, -1), V(-1, 1), V(-1, -1)
 CARDINAL_VECS = V(1, 0), V(0, 1), V(-1, 0), V(0, -1)
 L_VECS = V(-1, -2), V(-1, 2), V(1, -2), V(1, 2), V(-2, -1), V(-2, 1), V(2, -1), V(2, 1)
-DIAGONALS = tuple(tuple(d * v for d in range(1, 8)) for v in DIAGONAL_VECS)
-AXES = tuple(tuple(d * v for d in range(1, 8)) for v in CARDINAL_VECS)
-DELTAS = {KING: DIAGONAL_VECS + CARDINAL_VECS, KNIGHT: L_VECS}
-LINES = {QUEEN: DIAGONALS + AXES, ROOK: AXES, BISHOP: DIAGONALS}
+LINE_VECS = {
+    QUEEN: DIAGONAL_VECS + CARDINAL_VECS,
+    ROOK: CARDINAL_VECS,
+    BISHOP: DIAGONAL_VECS,
+}
+JUMP_VECS = {KING: DIAGONAL_VECS + CARDINAL_VECS, KNIGHT: L_VECS}
+# every coordinate (relative to a pawn) which could affect it's targets
+PAWN_NEIGHBORHOOD = tuple(
+    V(x, y) for x, y in product(range(-1, 2), range(-2, 3)) if x or y
+)
+
+# Tables of interned coordinates (by role & coordinate), so that move generation needs
+# no vector arithmetic. Rays are ordered from the piece outwards.
+RAYS = {
+    role: {v: tuple(ray(v, d) for d in LINE_VECS.get(role, ())) for v in SQUARES}
+    for role in Role
+}
+JUMPS = {
+    role: {v: neighbors(v, JUMP_VECS.get(role, ())) for v in SQUARES} for role in Role
+}
+PAWN_SEEN = {v: neighbors(v, PAWN_NEIGHBORHOOD) for v in SQUARES}
+# coordinates from which a pawn of the player attacks each coordinate
+PAWN_ATTACKERS = {
+    player: {v: neighbors(v, (V(1, -dy), V(-1, -dy))) for v in SQUARES}
+    for player, dy in ((Player.ONE, -1), (Player.TWO, 1))
+}
+
+PROMOTION_ROLES = (QUEEN, ROOK, BISHOP, KNIGHT)
+FILES = "abcdefgh"
+# FEN uses the standard letters, uppercase for Player.ONE (white)
+FEN_ROLES = {"k": KING, "q": QUEEN, "r": ROOK, "b": BISHOP, "n": KNIGHT, "p": PAWN}
+FEN_LETTERS = {role: letter for letter, role in FEN_ROLES.items()}
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+FIFTY_MOVE_PLIES = 100  # without a capture or pawn move, after which the game is drawn
+REPETITION_LIMIT = 3  # occurrences of a position, after which the game is drawn
+# castling right -> coordinates of the unmoved king & rook it requires
+CASTLING_SQUARES = {
+    "K": (V(4, 7), V(7, 7), Player.ONE),
+    "Q": (V(4, 7), V(0, 7), Player.ONE),
+    "k": (V(4, 0), V(7, 0), Player.TWO),
+    "q": (V(4, 0), V(0, 0), Player.TWO),
+}
+
+
+def _fen_piece(char: str, y: int) -> Piece:
+    """Piece for a FEN letter on row `y`; kings & rooks start moved (see castling)."""
+    player = Player.ONE if char.isupper() else Player.TWO
+    role = FEN_ROLES[char.lower()]
+    if role is PAWN:
+        return Piece(role, player, y != (6 if player is Player.ONE else 1))
+    return Piece(role, player, role in (KING, ROOK))
+
+
+def to_algebraic(coord: Vector) -> str:
+    """Name of a coordinate in algebraic notation, eg `V(4, 6)` is 'e2'."""
+    return f"{FILES[coord.x]}{8 - coord.y}"
+
+
+def from_algebraic(name: str) -> Vector:
+    if len(name) != 2 or name[0] not in FILES or name[1] not in "12345678":
+        raise ValueError(f"{name=} isn't a square in algebraic notation.")
+    return square(FILES.index(name[0]), 8 - int(name[1]))
+
+
+class Engine(Enum):
+    """Selects the implementation behind `Board.update_targets`."""
+
+    DICT = auto()
+    BITBOARD = auto()
+
+
+class Ending(Enum):
+    """How a game ended; only checkmate isn't a draw."""
+
+    CHECKMATE = "Checkmate"
+    STALEMATE = "Stalemate"
+    REPETITION = "Threefold repetition"
+    FIFTY_MOVES = "Fifty moves without a capture or pawn move"
+
+
+@dataclass(slots=True)
+class Setup:
+    """Everything needed to construct a `Board` in a given position."""
+
+    squares: dict[Vector, Piece | None]
+    passant: LocPiece | None = None
+    ply: int = 0
+    halfmove: int = 0
+
+
+@dataclass(slots=True, frozen=True)
+class Move:
+    src: Vector
+    dst: Vector
+    promote_to: Role | None = None
+
+    def __str__(self) -> str:
+        """Move in UCI notation, eg 'e7e8q'."""
+        promotion = FEN_LETTERS[self.promote_to] if self.promote_to else ""
+        return to_algebraic(self.src) + to_algebraic(self.dst) + promotion
+
+    def encode(self) -> int:
+        """Pack into 16 bits: the `src` & `dst` indices (`8 * y + x`) & promotion."""
+        promotion = PROMOTION_ROLES.index(self.promote_to) + 1 if self.promote_to else 0
+        src, dst = self.src, self.dst
+        return (8 * src.y + src.x) | (8 * dst.y + dst.x) << 6 | promotion << 12
+
+    @classmethod
+    def decode(cls, code: int) -> "Move":
+        """Unpack a move packed by `encode`."""
+        promotion = code >> 12
+        if code < 0 or promotion > len(PROMOTION_ROLES):
+            raise ValueError(f"{code=} isn't a packed move.")
+        role = PROMOTION_ROLES[promotion - 1] if promotion else None
+        return cls(SQUARES[code & 0x3F], SQUARES[code >> 6 & 0x3F], role)
+
+
+@dataclass(slots=True)
+class KingSafety:
+    """Threats to the king of a player; computed once per position."""
+
+    kings: list[Vector]
+    checkers: int = 0
+    # squares which block (or capture) every checking piece; None if not in check
+    blocks: VectorSet | None = None
+    # pinned piece coordinate -> the squares it may move to without exposing the king
+    pins: dict[Vector, VectorSet] = field(default_factory=dict)
+
+    def add_checker(self, blocks: VectorSet) -> None:
+        self.checkers += 1
+        self.blocks = blocks if self.blocks is None else self.blocks & blocks
+
+
+@dataclass(slots=True)
+class PositionInfo:
+    """Answers to queries about a position, found together when first asked.
+
+    Only valid while `targets` is the `targets_of` of the board, so a new one is found
+    after each move (or undo) without any explicit invalidation.
+    """
+
+    targets: dict[Vector, VectorSet]
+    kings: dict[Player, list[Vector]]
+    # squares the active player can move from, in the iteration order of the board
+    movable: list[Vector]
+    checked: set[Player]
+    moves: list[Move] | None = None  # found when first asked for
+
+
+@dataclass(slots=True)
+class Undo:
+    """Record of a move holding all that's needed to restore the board before it.
+
+    Castling rights aren't stored separately: they're the `moved` flags of the prior
+    pieces kept in `squares`.
+    """
+
+    src: Vector
+    dst: Vector
+    promote_to: Role | None
+    passant: LocPiece | None
+    targets_of: dict[Vector, VectorSet]
+    key: int
+    halfmove: int
+    # each coordinate changed by the move, paired with it's prior piece
+    squares: list[tuple[Vector, Piece | None]] = field(default_factory=list)
+    # role taken by the move (if any)
+    taken: Role | None = None
+
+
+@dataclass(slots=True)
+class History:
+    """Records of the moves made (see `Undo`), indexed by the position before each.
+
+    The index counts the occurrences of each position (by key), so repetitions are
+    found without searching the records. The records may be dropped by `forget`
+    (leaving the index), eg to save memory when moves are never unmade.
+
+    If set, `recorder` is called with each move processed by the board (but not those
+    made & unmade by a search), eg to stream the game to a file (see `jchess.record`).
+    """
+
+    undos: list[Undo] = field(default_factory=list)
+    counts: Counter[int] = field(default_factory=Counter)
+    recorder: Callable[[Move], None] | None = field(default=None, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.undos)
+
+    def __iter__(self) -> Iterator[Undo]:
+        return iter(self.undos)
+
+    def __getitem__(self, i: int) -> Undo:
+        return self.undos[i]
+
+    def push(self, undo: Undo) -> None:
+        self.undos.append(undo)
+        self.counts[undo.key] += 1
+
+    def pop(self) -> Undo:
+        undo = self.undos.pop()
+        self.counts[undo.key] -= 1
+        return undo
+
+    def forget(self) -> None:
+        """Drop the records, so no move can be unmade, but keep the index."""
+        self.undos.clear()
+
+
+@dataclass(slots=True)
+class TargetCache:
+    """Targets of each piece (ignoring check & castling) kept between updates."""
+
+    pseudo_targets: dict[Vector, VectorSet]
+    # coordinates each piece looked at to find it's targets, and the reverse lookup
+    seen: dict[Vector, VectorSet]
+    seen_by: dict[Vector, VectorSet]
+    # threats to each king when the targets were last filtered
+    safety: dict[Player, KingSafety] | None = None
+
+
+def _parse_placement(placement: str) -> dict[Vector, Piece | None]:
+    """Read the pieces from the first field of a FEN."""
+    rows = placement.split("/")
+    if len(rows) != 8:
+        raise ValueError(f"{placement=} should have 8 rows.")
+
+    squares: dict[Vector, Piece | None] = {
+        square(x, y): None for x, y in product(range(8), range(8))
+    }
+    for y, row in enumerate(rows):
+        x = 0
+        for char in row:
+            if char.isdigit():
+                x += int(char)
+                continue
+            if char.lower() not in FEN_ROLES or x > 7:
+                raise ValueError(f"{placement=} has a bad row: {row!r}.")
+            squares[square(x, y)] = _fen_piece(char, y)
+            x += 1
+        if x != 8:
+            raise ValueError(f"{placement=} has a bad row: {row!r}.")
+    return squares
+
+
+def parse_fen(fen: str) -> Setup:
+    """Read a position in Forsyth-Edwards Notation, without constructing a `Board`.
+
+    Player ONE is white. Kings & rooks are only unmoved if a castling right needs them
+    to be, and pawns are only unmoved on their starting row.
+
+    :param fen: Position in FEN; the halfmove clock & move number are optional.
+    :return: Setup to pass to `Board`.
+    """
+    fields = fen.split()
+    if not 4 <= len(fields) <= 6:
+        raise ValueError(f"{fen=} should have between 4 and 6 fields.")
+    placement, side, castling, passant = fields[:4]
+    halfmove = int(fields[4]) if len(fields) >= 5 else 0
+    move_number = int(fields[5]) if len(fields) == 6 else 1
+
+    if side not in ("w", "b") or set(castling) - set("KQkq-"):
+        raise ValueError(f"{fen=} isn't valid.")
+    squares = _parse_placement(placement)
+
+    # unmove the kings & rooks required by each castling right
+    for char in castling.replace("-", ""):
+        king, rook, player = CASTLING_SQUARES[char]
+        for coord, role in ((king, KING), (rook, ROOK)):
+            if squares[coord] not in (Piece(role, player, True), Piece(role, player)):
+                raise ValueError(f"{fen=} has castling rights without pieces.")
+            squares[coord] = Piece(role, player)
+
+    passant_piece = None
+    if passant != "-":
+        target = from_algebraic(passant)
+        if target.y != (5 if side == "b" else 2):
+            raise ValueError(f"{fen=} has an en passant square on the wrong rank.")
+        coord = target + V(0, -1 if side == "b" else 1)
+        if not (pawn := squares[coord]) or pawn.role is not PAWN:
+            raise ValueError(f"{fen=} has an en passant square without a pawn.")
+        passant_piece = LocPiece(pawn, coord)
+
+    ply = 2 * (move_number - 1) + (side == "b")
+    return Setup(squares, passant_piece, ply, halfmove)
 
 
 class Board(dict[Vector, Piece | None]):
     """Represents the state of chess game & implements it's logic."""
 
-    def __init__(self) -> None:
-        self.update(BOARD_TEMPLATE)
-        self.targets_of = {V(x, y): VectorSet() for x, y in product(range(8), range(8))}
-        self.passant: LocPiece | None = None
-        self.ply = 0
-        self.taken_pieces: dict[Player, list[Role]] = {Player.ONE: [], Player.TWO: []}
-        self.protect_king = True
+    # debug switch; if set each incremental update is checked against a full update
+    verify_incremental = False
+    # debug switch; if unset targets may leave the mover in check
+    protect_king = True
+
+    def __init__(
+        self,
+        setup: Setup | None = None,
+        *,
+        engine: Engine = Engine.DICT,
+        incremental: bool = False,
+    ) -> None:
+        """Initialise a `Board`; in the starting position unless `setup` is given.
+
+        :param setup: Position to start in.
+        :param engine: Implementation behind `update_targets`.
+        :param incremental: If set, `make_move` only updates the targets it affects.
+        """
+        if setup is None:
+            self.update(BOARD_TEMPLATE)
+            setup = Setup({})
+        else:
+            self.update(setup.squares)
+        self.targets_of = {
+            square(x, y): VectorSet() for x, y in product(range(8), range(8))
+        }
+        self.passant = setup.passant
+        self.ply = setup.ply
+        self.halfmove = setup.halfmove  # plies since the last capture or pawn move
+        self.engine = engine
+        self.history = History()
+        self.info: PositionInfo | None = None  # see `__info`
+
+        self.incremental = incremental
+        self.cache: TargetCache | None = None
+        self.key = 0  # zobrist key; set by (full) target updates & updated by moves
+
         self.update_targets()
 
+    @classmethod
+    def from_fen(cls, fen: str, **kwargs: Any) -> "Board":
+        """Construct a `Board` from Forsyth-Edwards Notation (see `parse_fen`).
+
+        :param kwargs: Keyword arguments for `Board`.
+        """
+        return cls(parse_fen(fen), **kwargs)
+
+    def to_fen(self) -> str:
+        """Describe the position in Forsyth-Edwards Notation; inverse of `from_fen`."""
+        rows = []
+        for y in range(8):
+            row, empty = "", 0
+            for x in range(8):
+                if piece := self[V(x, y)]:
+                    letter = FEN_LETTERS[piece.role]
+                    row += (str(empty) if empty else "") + (
+                        letter.upper() if piece.player is Player.ONE else letter
+                    )
+                    empty = 0
+                else:
+                    empty += 1
+            rows.append(row + (str(empty) if empty else ""))
+
+        castling = "".join(
+            char
+            for char, (king, rook, player) in CASTLING_SQUARES.items()
+            if self[king] == Piece(KING, player) and self[rook] == Piece(ROOK, player)
+        )
+        passant = "-"
+        if self.passant:
+            dy = 1 if self.passant.piece.player is Player.ONE else -1
+            passant = to_algebraic(self.passant.coord + V(0, dy))
+
+        side = "w" if self.active_player is Player.ONE else "b"
+        return " ".join(
+            [
+                "/".join(rows),
+                side,
+                castling or "-",
+                passant,
+                str(self.halfmove),
+                str(self.ply // 2 + 1),
+            ]
+        )
+
     @property
     def active_player(self) -> Player:
         return list(Player)[self.ply % 2]
 
+    @property
+    def taken_pieces(self) -> dict[Player, list[Role]]:
+        """Roles taken by each player, in the order taken (as recorded in `history`)."""
+        taken: dict[Player, list[Role]] = {Player.ONE: [], Player.TWO: []}
+        for ply, undo in enumerate(self.history, self.ply - len(self.history)):
+            if undo.taken:
+                taken[list(Player)[ply % 2]].append(undo.taken)
+        return taken
+
     # Utility methods ---------------------------------------------------------------- #
 
     def score(self, player: Player) -> int:
@@ -49,64 +422,168 @@ class Board(dict[Vector, Piece | None]):
         piece = self[v]
         return bool(piece and piece.player is self.active_player and self.targets_of[v])
 
+    def movable_squares(self) -> list[Vector]:
+        """Squares the active player can move from, in the order of the board."""
+        return list(self.__info().movable)
+
+    def king_squares(self, player: Player | None = None) -> list[Vector]:
+        return list(self.__info().kings[player or self.active_player])
+
     def in_check(self, player: Player | None = None) -> bool:
-        player = player or self.active_player
-        return any(
-            (attacking_piece and attacking_piece.player is not player)
-            # t = target & tp = target piece.
-            and any((tp := self[t]) and tp.role is KING for t in self.targets_of[v])
-            for v, attacking_piece in self.items()
-        )
+        return (player or self.active_player) in self.__info().checked
 
     def can_move(self) -> bool:
-        return any(self.can_move_from(v) for v in self)
+        return bool(self.__info().movable)
+
+    def repetitions(self) -> int:
+        """Occurrences of the current position in the game so far, including now."""
+        return self.history.counts[self.key] + 1
+
+    def ending(self) -> Ending | None:
+        """How the game has ended, if it has; checkmate takes precedence over draws."""
+        if not self.can_move():
+            return Ending.CHECKMATE if self.in_check() else Ending.STALEMATE
+        if self.repetitions() >= REPETITION_LIMIT:
+            return Ending.REPETITION
+        if self.halfmove >= FIFTY_MOVE_PLIES:
+            return Ending.FIFTY_MOVES
+        return None
+
+    def legal_moves(self) -> list[Move]:
+        """Every legal move of the active player; each promotion is 4 moves."""
+        info = self.__info()
+        if info.moves is None:
+            info.moves = self.__find_moves()
+        return list(info.moves)
+
+    def __info(self) -> PositionInfo:
+        """Answers to queries about the current position; see `PositionInfo`."""
+        if self.info is None or self.info.targets is not self.targets_of:
+            self.info = self.__find_info()
+        return self.info
+
+    def __find_info(self) -> PositionInfo:
+        active = self.active_player
+        kings: dict[Player, list[Vector]] = {Player.ONE: [], Player.TWO: []}
+        movable = []
+        for coord, piece in self.items():
+            if piece and piece.role is KING:
+                kings[piece.player].append(coord)
+            if piece and piece.player is active and self.targets_of[coord]:
+                movable.append(coord)
+
+        checked = set()
+        for coord, targets in self.targets_of.items():
+            if (piece := self[coord]) and not targets.isdisjoint(kings[~piece.player]):
+                checked.add(~piece.player)
+        return PositionInfo(self.targets_of, kings, movable, checked)
+
+    def __find_moves(self) -> list[Move]:
+        moves: list[Move] = []
+        for src, targets in self.targets_of.items():
+            piece = self[src]
+            if piece and piece.player is self.active_player:
+                promotes = piece.role is PAWN
+                for dst in targets:
+                    if promotes and dst.y in (0, 7):
+                        moves.extend(Move(src, dst, role) for role in PROMOTION_ROLES)
+                    else:
+                        moves.append(Move(src, dst))
+        return moves
+
+    def perft(self, depth: int) -> int:
+        """Count the positions reached after `depth` plies, for testing move generation.
+
+        Counts for standard positions are well known, so any difference is a bug.
+        """
+        if depth == 0:
+            return 1
+        if depth == 1:
+            return len(self.legal_moves())  # no need to actually make the moves
+        return sum(self.divide(depth).values())
+
+    def divide(self, depth: int) -> dict[Move, int]:
+        """Perft of each move from this position; used to narrow down a bad count."""
+        if depth < 1:
+            raise ValueError(f"{depth=} should be at least 1.")
+        counts = {}
+        for move in self.legal_moves():
+            self.make_move(move.src, move.dst, promote_to=move.promote_to)
+            try:
+                counts[move] = self.perft(depth - 1)
+            finally:
+                self.unmake_move()
+        return counts
 
     # Core public methods ------------------------------------------------------------ #
 
-    def update_targets(self) -> None:
-        """Update the `targets` attr of each piece."""
+    @timed("Board.update_targets")
+    def update_targets(self, changed: Iterable[Vector] | None = None) -> None:
+        """Update the `targets` attr of each piece.
 
-        for coord, attacker in self.items():
-            if not attacker:
-                self.targets_of[coord] = VectorSet()
-                continue
-            targets = VectorSet()
-
-            if attacker.role is Role.PAWN:
-                targets.update(self.__pawn_targets(coord))
-
-            # the queen, bishop & rook always move along lines
-            for line in LINES.get(attacker.role, []):
-                for delta in line:
-                    target = coord + delta
-                    if target not in self:
-                        continue
-                    defender = self[target]
-                    if not defender:
-                        targets.add(target)
-                        continue
-                    if defender.player is not attacker.player:
-                        targets.add(target)
-                    break
+        :param changed: Coordinates changed since the last update. If `incremental` is
+            set, only pieces which can see these coordinates are fully recomputed.
+            If not given `key` is also recomputed, since any change may have occurred.
+        """
+        if changed is None:
+            self.key = zobrist_key(self, self.ply, self.passant)
+
+        if self.engine is Engine.BITBOARD:
+            self.cache = None
+            self.targets_of = compute_targets(
+                self, self.passant, protect_king=self.protect_king
+            )
+            return
+
+        cache, updated = self.__update_pseudo_targets(
+            changed if self.incremental else None
+        )
 
-            # the king and knight always have fixed potential translations
-            for delta in DELTAS.get(attacker.role, []):
-                target = coord + delta
-                if target in self:
-                    defender = self[target]
-                    if not defender or defender.player != attacker.player:
-                        targets.add(target)
+        # a new dict, so any `Undo` referencing the old one is unaffected
+        previous, self.targets_of = self.targets_of, {}
+        safety = {player: self.__king_safety(player) for player in Player}
 
-            # extra logic for castling
-            if attacker.role is Role.KING and not attacker.moved:
-                targets.update(self.__casting_targets(coord))
+        # a piece's targets only change if it's updated or the threats to it's king do
+        unchanged = {
+            player: cache.safety is not None
+            and cache.safety[player] == safety[player]
+            and len(safety[player].kings) < 2
+            for player in Player
+        }
 
+        for coord, targets in cache.pseudo_targets.items():
+            attacker = self[coord]
+            if (
+                attacker
+                and unchanged[attacker.player]
+                and coord not in updated
+                and attacker.role is not Role.KING
+                and not (attacker.role is Role.PAWN and self.passant)
+            ):
+                self.targets_of[coord] = previous[coord]
+                continue
+            if self.incremental:
+                targets = VectorSet(targets)  # the cached targets are kept unfiltered
+            # extra logic for castling; not cached as the king's entire row is relevant
+            if attacker and attacker.role is KING and not attacker.moved:
+                targets.update(self.__casting_targets(coord))
             # extra logic exclude moves resulting in check/checkmate
-            if self.protect_king:
-                risky_targets = self.__risky_targets(coord, targets)
-                targets = {t for t in targets if t not in risky_targets}
-
+            if attacker and self.protect_king:
+                risky = self.__risky_targets(coord, targets, safety[attacker.player])
+                # built anew (not filtered in place) as they always have been, since the
+                # order of the targets is what a seeded bot chooses from
+                targets = {target for target in targets if target not in risky}
             self.targets_of[coord] = targets
+        cache.safety = safety
+
+        if self.verify_incremental and self.incremental and changed is not None:
+            targets_of, key = self.targets_of, self.key
+            self.update_targets()
+            assert targets_of == self.targets_of, "Incremental targets are wrong."
+            assert key == self.key, "Incremental key is wrong."
+            assert self.cache, "Should be set by previous update."
+            pseudo_targets = self.cache.pseudo_targets
+            assert cache.pseudo_targets == pseudo_targets, "Cached targets are wrong."
 
     def process_move(self, src: V, dst: V, *, promote_to: Role | None = None) -> None:
         """Move piece at `src` to `dst`.
@@ -118,6 +595,17 @@ class Board(dict[Vector, Piece | None]):
         :param dst: Final 'destination' coordinate to move *to*
         :param promote_to: Role to convert piece to after the move (ignored if None)
         """
+        self.make_move(src, dst, promote_to=promote_to)
+        if self.history.recorder:
+            self.history.recorder(Move(src, dst, promote_to))
+
+    def make_move(self, src: V, dst: V, *, promote_to: Role | None = None) -> Undo:
+        """Move piece at `src` to `dst`; as `process_move` but the move can be undone.
+
+        The returned record is also pushed onto `self.history`.
+
+        :return: Record to pass to `unmake_move` to restore the board.
+        """
         attacker = self[src]
         defender = self[dst]
         delta = dst - src
@@ -125,14 +613,22 @@ class Board(dict[Vector, Piece | None]):
         if not attacker:
             raise RuntimeError(f"Move can only be processed when a piece is at {src=}.")
 
-        # remove any previous vulnerability to en passant
-        if self.passant and self.passant.piece.player is self.active_player:
-            self.passant = None
+        undo = Undo(
+            src, dst, promote_to, self.passant, self.targets_of, self.key, self.halfmove
+        )
+        undo.squares.extend(((src, attacker), (dst, defender)))
+        castling = castling_key(self)
+
+        # any previous vulnerability to en passant only lasts a single move
+        self.passant = None
 
         # en passant capture
         if attacker.role is Role.PAWN and not defender and delta in DIAGONAL_VECS:
-            self[src + V(delta.x, 0)] = None
-            self.taken_pieces[self.active_player].append(Role.PAWN)
+            undo.squares.append(
+                (passant_coord := src + V(delta.x, 0), self[passant_coord])
+            )
+            self[passant_coord] = None
+            undo.taken = Role.PAWN
 
         # castling
         if attacker.role is Role.KING and abs(delta.x) == 2:
@@ -140,53 +636,168 @@ class Board(dict[Vector, Piece | None]):
             old_coord = V(7, y_king) if delta.x == 2 else V(0, y_king)
             new_coord = V(5, y_king) if delta.x == 2 else V(3, y_king)
 
+            undo.squares.extend(
+                ((old_coord, self[old_coord]), (new_coord, self[new_coord]))
+            )
             self[new_coord] = Piece(Role.ROOK, attacker.player, moved=True)
             self[old_coord] = None
 
         # execute standard move/capture
         if defender:
-            self.taken_pieces[self.active_player].append(defender.role)
+            undo.taken = defender.role
         self[src] = None
+        self.ply += 1
+        self.halfmove = 0 if undo.taken or attacker.role is PAWN else self.halfmove + 1
         attacker = Piece(promote_to or attacker.role, attacker.player, moved=True)
         self[dst] = attacker
-        self.ply += 1
 
         # add any en passant vulnerability
         if attacker.role is Role.PAWN and abs(delta.y) == 2:
             self.passant = LocPiece(attacker, dst)
 
-        self.update_targets()
+        # update the key with only what's changed
+        self.key ^= SIDE_KEY ^ castling ^ castling_key(self)
+        self.key ^= passant_key(undo.passant) ^ passant_key(self.passant)
+        for coord, piece in undo.squares:
+            self.key ^= piece_key(coord, piece) ^ piece_key(coord, self[coord])
+
+        self.update_targets(self.__changed_by(undo))
+        self.history.push(undo)
+        return undo
+
+    def unmake_move(self, undo: Undo | None = None) -> Undo:
+        """Restore the board to exactly how it was before the last move.
+
+        :param undo: Record returned by `make_move`; must be the last one made.
+        :return: The record of the move which was undone.
+        """
+        if not self.history or (undo and undo is not self.history[-1]):
+            raise RuntimeError("Only the most recent move can be unmade.")
+        undo = self.history.pop()
+        changed = self.__changed_by(undo)
+
+        self.ply -= 1
+        self.halfmove = undo.halfmove
+        for coord, piece in reversed(undo.squares):
+            self[coord] = piece
+        self.passant = undo.passant
+        self.targets_of = undo.targets_of
+        self.key = undo.key
+        if self.incremental and self.cache:
+            self.cache.safety = None
+            self.__update_pseudo_targets(changed)
+        else:
+            self.cache = None
+        return undo
+
+    def __changed_by(self, undo: Undo) -> list[Vector]:
+        """Coordinates whose targets may change because of a move (or it's undoing)."""
+        changed = [coord for coord, _ in undo.squares]
+        if undo.passant != self.passant:
+            changed.extend(p.coord for p in (undo.passant, self.passant) if p)
+        return changed
 
     # Helper methods for `self.update_targets` --------------------------------------- #
 
+    def __update_pseudo_targets(
+        self, changed: Iterable[Vector] | None
+    ) -> tuple[TargetCache, VectorSet]:
+        """Update the targets of each piece, not accounting for check or castling.
+
+        :param changed: If given, only update pieces which could see these coordinates.
+        :return: The (updated) cache & the coordinates updated.
+        """
+        cache = self.cache
+        if changed is None or cache is None:
+            cache = self.cache = TargetCache(
+                {}, {}, {coord: VectorSet() for coord in self}
+            )
+            coords = VectorSet(self)
+        else:
+            coords = VectorSet(changed)
+            coords = coords.union(*(cache.seen_by[coord] for coord in coords))
+
+        for coord in coords:
+            for seen in cache.seen.pop(coord, ()):
+                cache.seen_by[seen].discard(coord)
+            if not self[coord]:
+                cache.pseudo_targets[coord] = VectorSet()
+                continue
+            targets, seen_coords = self.__pieces_targets(coord)
+            cache.pseudo_targets[coord] = targets
+            cache.seen[coord] = seen_coords
+            for seen in seen_coords:
+                cache.seen_by[seen].add(coord)
+
+        return cache, coords
+
+    def __pieces_targets(self, coord: Vector) -> tuple[VectorSet, VectorSet]:
+        """Find the targets of a piece, not accounting for check or castling.
+
+        :return: The targets & every coordinate looked at to find them.
+        """
+        attacker = self[coord]
+        assert attacker, f"Only call if there is a piece at {coord=}"
+        targets, seen = VectorSet(), VectorSet()
+
+        if attacker.role is Role.PAWN:
+            targets.update(self.__pawn_targets(coord))
+            seen.update(PAWN_SEEN[coord])
+
+        # the queen, bishop & rook always move along lines
+        for line in RAYS[attacker.role][coord]:
+            for target in line:
+                seen.add(target)
+                defender = self[target]
+                if not defender:
+                    targets.add(target)
+                    continue
+                if defender.player is not attacker.player:
+                    targets.add(target)
+                break
+
+        # the king and knight always have fixed potential translations
+        for target in JUMPS[attacker.role][coord]:
+            seen.add(target)
+            defender = self[target]
+            if not defender or defender.player != attacker.player:
+                targets.add(target)
+
+        return targets, seen
+
     def __pawn_targets(self, pawn_coord: Vector) -> VectorSet:
 
         pawn = self[pawn_coord]
         assert pawn and pawn.role is Role.PAWN, "Only call this function on a PAWN."
         dy = -1 if pawn.player is Player.ONE else 1
+        x, y = pawn_coord.x, pawn_coord.y
         targets = VectorSet()
 
         # standard forward step
-        step_target = pawn_coord + V(0, dy)
+        step_target = square(x, y + dy)
         if step_target in self and not self[step_target]:
             targets.add(step_target)
 
         # double step (aka jump) move
-        jump_target = pawn_coord + 2 * V(0, dy)
+        jump_target = square(x, y + 2 * dy)
         can_jump = not pawn.moved and not self[step_target] and not self[jump_target]
         if can_jump:
             targets.add(jump_target)
 
         # standard and en passant captures
         for dx in [1, -1]:
-            capture_target = pawn_coord + V(dx, dy)
-            passant_coord = pawn_coord + V(dx, 0)
+            capture_target = square(x + dx, y + dy)
+            passant_coord = square(x + dx, y)
 
             defender = self.get(capture_target, None)
             neighbor = self.get(passant_coord, None)
 
             can_std_capture = defender and defender.player is not pawn.player
-            can_passant = neighbor and self.passant == LocPiece(neighbor, passant_coord)
+            can_passant = (
+                neighbor
+                and neighbor.player is not pawn.player
+                and self.passant == LocPiece(neighbor, passant_coord)
+            )
             if can_std_capture or can_passant:
                 targets.add(capture_target)
 
@@ -200,42 +811,142 @@ class Board(dict[Vector, Piece | None]):
         targets = VectorSet()
         for x_rook, sign in zip((0, 7), (1, -1)):
             rook = self[V(x_rook, y_king)]
-            path_xvals = range(x_rook + sign, 4 + sign, sign)
             if (
                 # unmoved rook
-                (rook and rook.role is Role.ROOK and not rook.moved)
-                # empty path
-                and all(not self[V(x, y_king)] for x in path_xvals[:-1])
-                # safe path
-                and all(
-                    V(x, y_king) not in self.targets_of[v]
-                    for (v, p), x in product(self.items(), path_xvals)
-                    if p and p.player is not king.player
+                rook == Piece(ROOK, king.player)
+                # empty between the king & rook
+                and all(not self[V(x, y_king)] for x in range(x_rook + sign, 4, sign))
+                # the king isn't in, passing through or moving into check
+                and not any(
+                    self.__attacked(V(x, y_king), ~king.player, self)
+                    for x in (4, 4 - sign, 4 - 2 * sign)
                 )
             ):
                 targets.add(coord - sign * V(2, 0))
         return targets
 
-    def __risky_targets(self, source: Vector, current_targets: VectorSet) -> VectorSet:
+    def __king_safety(self, player: Player) -> KingSafety:
+        """Find the pieces checking & pinned against the king of `player`."""
+        kings = [
+            v for v, p in self.items() if p and p.role is KING and p.player is player
+        ]
+        safety = KingSafety(kings)
+        if len(kings) != 1:
+            return safety  # each move is tried out by `__exposes_king` instead
+        king = kings[0]
+
+        # sliding pieces either check the king or pin the first piece in their way
+        for line, sliders in [
+            *((line, (BISHOP, QUEEN)) for line in RAYS[BISHOP][king]),
+            *((line, (ROOK, QUEEN)) for line in RAYS[ROOK][king]),
+        ]:
+            path = VectorSet()
+            shield: Vector | None = None
+            for coord in line:
+                path.add(coord)
+                piece = self[coord]
+                if not piece:
+                    continue
+                if piece.player is player and not shield:
+                    shield = coord
+                    continue
+                if piece.player is not player and piece.role in sliders:
+                    if shield:
+                        safety.pins[shield] = path
+                    else:
+                        safety.add_checker(path)
+                break
+
+        # pieces which attack without a line of sight
+        jumpers = [
+            *((coord, KNIGHT) for coord in JUMPS[KNIGHT][king]),
+            *((coord, KING) for coord in JUMPS[KING][king]),
+            *((coord, PAWN) for coord in PAWN_ATTACKERS[~player][king]),
+        ]
+        for coord, role in jumpers:
+            piece = self[coord]
+            if piece and piece.player is not player and piece.role is role:
+                safety.add_checker({coord})
+
+        return safety
+
+    @timed("Board.__risky_targets")
+    def __risky_targets(
+        self, source: Vector, current_targets: VectorSet, safety: KingSafety
+    ) -> VectorSet:
         attacker = self[source]
         risky_targets = VectorSet()
 
         assert attacker, f"Only call if there is a piece at {source=}"
 
+        if not safety.kings:
+            return risky_targets
+
         for current_target in current_targets:
-            # try out the attack without concern for check/checkmate
-            board_copy = deepcopy(self)
-            board_copy.protect_king = False
-            board_copy.update_targets()
-            board_copy.process_move(source, current_target)
-
-            # note if the move caused check/checkmate
-            if board_copy.in_check(attacker.player):
+            # moves which pins & checks don't describe are simply tried out
+            passant = attacker.role is PAWN and not self[current_target]
+            if (
+                len(safety.kings) > 1
+                or attacker.role is KING
+                or (passant and current_target.x != source.x)
+            ):
+                if self.__exposes_king(source, current_target, safety):
+                    risky_targets.add(current_target)
+            elif (
+                safety.checkers > 1
+                or (safety.blocks is not None and current_target not in safety.blocks)
+                or (source in safety.pins and current_target not in safety.pins[source])
+            ):
                 risky_targets.add(current_target)
-                continue
 
         return risky_targets
 
+    def __exposes_king(self, src: Vector, dst: Vector, safety: KingSafety) -> bool:
+        """Check if moving `src` to `dst` leaves the king attacked, without moving."""
+        attacker = self[src]
+        assert attacker, f"Only call if there is a piece at {src=}"
+        delta = dst - src
+
+        # the changes `process_move` would make to the board
+        changes: dict[Vector, Piece | None] = {src: None, dst: attacker}
+        if attacker.role is PAWN and not self[dst] and delta.x:
+            changes[src + V(delta.x, 0)] = None
+        if attacker.role is KING and abs(delta.x) == 2:
+            changes[V(7 if delta.x == 2 else 0, src.y)] = None
+            changes[V(5 if delta.x == 2 else 3, src.y)] = Piece(ROOK, attacker.player)
+
+        kings = [v for v in safety.kings if v != src]
+        if attacker.role is KING:
+            kings.append(dst)
+
+        squares = self | changes  # cheaper than a ChainMap overlay for repeat lookups
+        return any(self.__attacked(king, ~attacker.player, squares) for king in kings)
+
+    @staticmethod
+    def __attacked(
+        coord: Vector, player: Player, squares: Mapping[Vector, Piece | None]
+    ) -> bool:
+        """Check if any piece belonging to `player` attacks `coord`."""
+        for line, sliders in [
+            *((line, (BISHOP, QUEEN)) for line in RAYS[BISHOP][coord]),
+            *((line, (ROOK, QUEEN)) for line in RAYS[ROOK][coord]),
+        ]:
+            for target in line:
+                if piece := squares[target]:
+                    if piece.player is player and piece.role in sliders:
+                        return True
+                    break
+
+        jumpers = [
+            *((target, KNIGHT) for target in JUMPS[KNIGHT][coord]),
+            *((target, KING) for target in JUMPS[KING][coord]),
+            *((target, PAWN) for target in PAWN_ATTACKERS[player][coord]),
+        ]
+        return any(
+            (piece := squares[target]) and piece.player is player and piece.role is role
+            for target, role in jumpers
+        )
+
     # Developer tools ---------------------------------------------------------------- #
 
     def __repr__(self) -> str:
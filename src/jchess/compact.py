@@ -0,0 +1,132 @@
+"""Compact, immutable storage of a position; small enough to keep millions in memory.
+
+A `CompactBoard` packs a position into a single `bytes` object: one byte per square
+(the mailbox) followed by the en passant square, halfmove clock & ply. Each square's
+byte encodes the role, player & `moved` flag of it's piece (zero if empty).
+
+It's a read-only `Mapping` from coordinate to piece (like `Board`), so code which only
+reads the squares (eg `zobrist_key`, `testutils.board_to_ssv`) accepts either. Targets
+aren't stored but computed as 64-bit masks on demand; use `to_board` to play moves.
+"""
+
+import struct
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from jchess.bitboard import compute_masks
+from jchess.board import Board, Setup
+from jchess.geometry import SQUARES, Vector
+from jchess.pieces import LocPiece, Piece, Player, Role
+
+ROLES: tuple[Role, ...] = tuple(role for role in Role if role is not Role.BLANK)
+TWO_BIT = 0x08  # set if the piece belongs to `Player.TWO`
+MOVED_BIT = 0x10
+NO_PASSANT = 0xFF
+# en passant square index, halfmove clock & ply; stored after the mailbox
+TAIL = struct.Struct("<BHH")
+SIZE = 64 + TAIL.size
+
+
+def encode(piece: Piece | None) -> int:
+    """Byte representing `piece` (zero for an empty square)."""
+    if not piece:
+        return 0
+    return (
+        ROLES.index(piece.role)
+        + 1
+        + (TWO_BIT if piece.player is Player.TWO else 0)
+        + (MOVED_BIT if piece.moved else 0)
+    )
+
+
+# every piece a byte can represent, indexed by that byte; shared by every board
+PIECES: tuple[Piece | None, ...] = tuple(
+    None
+    if not byte & 0x07 or byte & 0x07 > len(ROLES)
+    else Piece(
+        ROLES[(byte & 0x07) - 1],
+        Player.TWO if byte & TWO_BIT else Player.ONE,
+        bool(byte & MOVED_BIT),
+    )
+    for byte in range(2 * MOVED_BIT)
+)
+
+
+class CompactBoard(Mapping[Vector, Piece | None]):
+    """Read-only position packed into `SIZE` bytes; hashable, so boards can be deduped.
+
+    The taken pieces & move history of a `Board` aren't kept.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes) -> None:
+        if len(data) != SIZE or any(
+            b >= len(PIECES) or PIECES[b] is None for b in data[:64] if b
+        ):
+            raise ValueError(f"{data=} isn't a packed board.")
+        # only a pawn just moved 2 squares (to the 4th or 5th rank) is vulnerable
+        if data[64] != NO_PASSANT and not 24 <= data[64] < 40:
+            raise ValueError(f"{data=} has an invalid en passant square.")
+        self.data = data
+
+    @classmethod
+    def from_board(cls, board: Board) -> "CompactBoard":
+        """Pack the position of `board`; inverse of `to_board`."""
+        mailbox = bytes(encode(board[coord]) for coord in SQUARES)
+        passant = board.passant
+        i = 8 * passant.coord.y + passant.coord.x if passant else NO_PASSANT
+        return cls(mailbox + TAIL.pack(i, board.halfmove, board.ply))
+
+    def to_board(self, **kwargs: Any) -> Board:
+        """Unpack into a full `Board`; `kwargs` are passed to `Board`."""
+        setup = Setup(dict(self), self.passant, self.ply, self.halfmove)
+        return Board(setup, **kwargs)
+
+    def target_masks(self, *, protect_king: bool = True) -> list[int]:
+        """Targets of the piece on each square, as a mask indexed by `8 * y + x`."""
+        return compute_masks(self, self.passant, protect_king=protect_king)
+
+    @property
+    def passant(self) -> LocPiece | None:
+        i = self.data[64]
+        piece = PIECES[self.data[i]] if i != NO_PASSANT else None
+        return LocPiece(piece, SQUARES[i]) if piece else None
+
+    @property
+    def halfmove(self) -> int:
+        halfmove: int = TAIL.unpack_from(self.data, 64)[1]
+        return halfmove
+
+    @property
+    def ply(self) -> int:
+        ply: int = TAIL.unpack_from(self.data, 64)[2]
+        return ply
+
+    @property
+    def active_player(self) -> Player:
+        return list(Player)[self.ply % 2]
+
+    # Mapping methods ---------------------------------------------------------------- #
+
+    def __getitem__(self, coord: Vector) -> Piece | None:
+        if not (0 <= coord.x < 8 and 0 <= coord.y < 8):
+            raise KeyError(coord)
+        return PIECES[self.data[8 * coord.y + coord.x]]
+
+    def __iter__(self) -> Iterator[Vector]:
+        return iter(SQUARES)
+
+    def __len__(self) -> int:
+        return 64
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactBoard):
+            return self.data == other.data
+        return super().__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash(self.data)
+
+    def __repr__(self) -> str:
+        return f"{CompactBoard.__name__}({self.data!r})"
@@ -0,0 +1,176 @@
+"""On-disk table of positions & how the games reaching them ended, for opening analysis.
+
+A database file is a `HEADER`, then the zobrist key of each position (as 64-bit words,
+sorted) & then a fixed size record of each position (in the same order): it's packed
+`CompactBoard` & it's `Stats`. Words are in the machine's byte order (little-endian on
+every supported platform).
+
+A `Database` memory maps the file, so opening it reads nothing & each lookup reads only
+the few pages a binary search of the keys touches. Entries view the mapped file, rather
+than copying their record out of it.
+
+Databases are built in bulk by a `Builder` (in memory), from games replayed by
+`jchess.record.replay` or `jchess.pgn.PgnGame.replay`; see `build`.
+"""
+
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+from jchess import pgn, record
+from jchess.board import Board
+from jchess.compact import SIZE, CompactBoard
+
+MAGIC = b"JCDB"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")  # magic, version & number of positions
+STATS = struct.Struct("<4I")
+RECORD_SIZE = SIZE + STATS.size
+# the column of `Stats` counting each result, besides `games`
+RESULT_COLUMNS = {"1-0": 1, "0-1": 2, "1/2-1/2": 3}
+
+
+@dataclass(slots=True, frozen=True)
+class Stats:
+    """Games reaching a position, by how they ended (unfinished games aren't split)."""
+
+    games: int = 0
+    one_wins: int = 0
+    two_wins: int = 0
+    draws: int = 0
+
+
+@dataclass(slots=True, frozen=True)
+class Entry:
+    """A position in a `Database`; only valid while the database is open."""
+
+    key: int
+    record: memoryview  # of the mapped file
+
+    @property
+    def position(self) -> CompactBoard:
+        return CompactBoard(bytes(self.record[:SIZE]))
+
+    @property
+    def stats(self) -> Stats:
+        return Stats(*STATS.unpack_from(self.record, SIZE))
+
+
+class Database:
+    """A database file opened for lookups; see the module docstring.
+
+    Entries found must be released (eg go out of scope) before closing the database.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count = HEADER.unpack_from(self.map)
+        except struct.error:
+            magic, version, count = b"", 0, 0
+        keys_end = HEADER.size + 8 * count
+        if (magic, version) != (MAGIC, VERSION) or len(self.map) != keys_end + (
+            count * RECORD_SIZE
+        ):
+            self.map.close()
+            raise ValueError(f"{path} isn't a position database.")
+        view = memoryview(self.map)
+        self.keys = view[HEADER.size : keys_end].cast("Q")
+        self.records = view[keys_end:]
+
+    def __enter__(self) -> "Database":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, key: int) -> Entry | None:
+        """Find the position with the zobrist key `key` (eg `Board.key`), if present."""
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        return Entry(key, self.records[i * RECORD_SIZE : (i + 1) * RECORD_SIZE])
+
+    def close(self) -> None:
+        self.keys.release()
+        self.records.release()
+        self.map.close()
+
+
+class Builder:
+    """Collects the positions of many games in memory, then writes them as a database.
+
+    Each position takes a couple of hundred bytes until written, so a few million
+    positions can be built at once.
+    """
+
+    def __init__(self) -> None:
+        # key -> the packed position & the columns of it's `Stats`
+        self.entries: dict[int, tuple[bytes, list[int]]] = {}
+
+    def add_game(self, boards: Iterable[Board], result: str | None = None) -> None:
+        """Add the positions of a game, as it's replayed.
+
+        :param boards: The board after each move, eg as yielded by `record.replay`.
+        :param result: Of the game as written in PGN, eg '1-0'; by default it's found
+            from the final position.
+        """
+        keys = set()  # so a repeated position counts the game once
+        board = None
+        for board in boards:
+            if board.key not in self.entries:
+                packed = CompactBoard.from_board(board).data
+                self.entries[board.key] = packed, [0] * len(fields(Stats))
+            keys.add(board.key)
+        if result is None:
+            result = pgn.game_result(board) if board else "*"
+        column = RESULT_COLUMNS.get(result)
+        for key in keys:
+            stats = self.entries[key][1]
+            stats[0] += 1
+            if column:
+                stats[column] += 1
+
+    def write(self, path: str | Path) -> int:
+        """Write the positions added so far as a database; returns their number."""
+        keys = array("Q", sorted(self.entries))
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+            file.write(keys.tobytes())
+            for key in keys:
+                packed, stats = self.entries[key]
+                file.write(packed + STATS.pack(*stats))
+        return len(keys)
+
+
+def build(
+    path: str | Path,
+    *,
+    records: Iterable[str | Path] = (),
+    pgns: Iterable[str | Path] = (),
+) -> int:
+    """Build a database at `path` by replaying every game of some files.
+
+    :param records: Paths of binary game records (see `jchess.record`).
+    :param pgns: Paths of PGN files, whose games are added with the result in their
+        headers.
+    :return: Number of positions in the database.
+    """
+    builder = Builder()
+    for name in records:
+        with open(name, "rb") as file:
+            for codes in record.read_games(file):
+                builder.add_game(record.replay(codes))
+    for name in pgns:
+        with open(name, encoding="utf-8") as file:
+            for game in pgn.read_games(file):
+                builder.add_game(game.replay(), game.result)
+    return builder.write(path)
@@ -1,4 +1,5 @@
 import os
+from contextlib import AbstractContextManager, nullcontext
 from dataclasses import dataclass
 from itertools import product
 from textwrap import fill
@@ -9,171 +10,180 @@ import colorama
 
 from jchess import __author__, __version__, terminal
 from jchess.action import ExitGame
-from jchess.game import MAX_PLY_COUNT, PROMOTION_OPTIONS, Game, Mode, Status
-from jchess.geometry import V
-from jchess.pieces import Player
-from jchess.terminal import ctrlseq
+from jchess.board import Ending
+from jchess.db import Database
+from jchess.game import PROMOTION_OPTIONS, Game, Mode, Status
+from jchess.geometry import SQUARES, V
+from jchess.pieces import Player, Role
+from jchess.profiling import timed
 
 from ._configs import Pallet, SymbolDict
 from ._constants import MODE_STRINGS, H, Loc, Templates, W
+from ._frame import FrameBuffer
 
 TypeExc = Type[BaseException]
 
 UNINITIALIZED, START_MENU, PROMOTING, BOARD_FOCUS, GAME_OVER = list(Status)
 
+# where each square of the board is shown on the screen
+SQUARE_LOCS = {v: Loc.BOARD + V((W.TILE + 1) * v.x, 2 * v.y) for v in SQUARES}
+
 
 @dataclass()
 class Display:
-    """Simple context manager to manipulate a terminal display showing a `Game`."""
+    """Simple context manager to manipulate a terminal display showing a `Game`.
+
+    Each refresh draws to a `FrameBuffer` and only writes the cells which changed; see
+    `frame.frame_bytes` for the number of bytes written by the latest refresh.
+    """
 
     game: Game
     pallet: Pallet
     symbol: SymbolDict
+    database: Database | None = None  # of positions, whose stats are shown if found
 
     def __post_init__(self) -> None:
         self.original_terminal_size = (-1, -1)  # set in __enter__
+        self.shown_status = UNINITIALIZED  # as of the latest refresh
+        self.frame = FrameBuffer(W.MAIN + 2, H.MAIN + 2)  # +2 to account for boarder
+        self.out = terminal.Writer()
+        self.input_mode: AbstractContextManager[None] = nullcontext()  # see __enter__
+        # text & colour of each piece (or `None` for no piece) as shown on a square
+        self.squares: dict[tuple[Role, Player] | None, tuple[str, str]] = {
+            (role, player): (f" {self.symbol[role]} ", self.pallet.piece[player])
+            for role, player in product(Role, Player)
+        }
+        self.squares[None] = ("   ", "")
 
     def __enter__(self) -> "Display":
         self.original_terminal_size = os.get_terminal_size()
-        colorama.init()
-        terminal.clear()
-        terminal.resize(W.MAIN + 2, H.MAIN + 2)  # +2 to account for boarder
-        terminal.reset_cursor()
-        terminal.hide_cursor()
+        colorama.just_fix_windows_console()  # output bypasses `sys.stdout`
+        self.out.clear()
+        self.frame = FrameBuffer(W.MAIN + 2, H.MAIN + 2)  # the screen is now blank
+        self.out.resize(W.MAIN + 2, H.MAIN + 2)  # +2 to account for boarder
+        self.out.reset_cursor()
+        self.out.hide_cursor()
+        self.out.flush()
+        self.input_mode = terminal.raw_mode()
+        self.input_mode.__enter__()
         return self
 
     def __exit__(self, exc_type: TypeExc, exc_val: TypeExc, exc_tb: TbType) -> bool:
-        terminal.clear()
-        terminal.show_cursor()
-        terminal.resize(*self.original_terminal_size)
+        self.input_mode.__exit__(None, None, None)
+        self.out.clear()
+        self.out.show_cursor()
+        self.out.resize(*self.original_terminal_size)
+        self.out.flush()
         return exc_type is ExitGame
 
+    @timed("Display.refresh")
     def refresh(self) -> None:
         """Update and re-show the display."""
-        status, status_prev = self.game.status, self.game.status_prev
-        parts = []
+        status, status_prev = self.game.status, self.shown_status
+        self.shown_status = status
 
-        # adjust for previous status of game
+        # adjust for previous status of game (several actions may have been taken since)
         if status is not status_prev:
-            if status_prev is UNINITIALIZED:
-                pass  # should clear start menu, but it's overridden by main board
-            elif status_prev is START_MENU:
-                parts.extend(self.__init_main())
+            if status is START_MENU:
+                pass  # shown on a blank screen
+            elif status_prev in (UNINITIALIZED, START_MENU):
+                # the start menu is overridden by the main board (or skipped, if remote)
+                self.__init_main()
             elif status_prev is PROMOTING:
-                parts.extend(self.__clear_promotion())
+                self.__clear_promotion()
 
         if status is START_MENU:
-            parts.extend(self.__refresh_start())
+            self.__refresh_start()
         elif status is BOARD_FOCUS:
-            parts.extend(self.__refresh_main())
+            self.__refresh_main()
         elif status is PROMOTING:
-            parts.extend(self.__refresh_promotion())
+            self.__refresh_promotion()
         elif status is GAME_OVER:
-            parts.extend(self.__init_game_over())
+            self.__init_game_over()
 
-        print("".join(parts))
+        self.out.write(self.frame.flush())
+        self.out.flush()
 
     # Helper methods for `Display.refresh` ------------------------------------------- #
 
-    def __init_main(self) -> list[str]:
-        quit_msg = "spam CTRL+C." if self.game.mode is Mode.TDB else "hit escape."
-        headline = "Welcome to J-Chess! To quit " + quit_msg
-
-        mode = self.game.mode
-        assert mode, "Mode should be set by this point in the game."
+    def __init_main(self) -> None:
+        headline = "Welcome to J-Chess! To quit hit escape."
 
         taken_blank = "\n".join([" " * W.SIDE] * H.SIDE_SMALL)
-
-        return [
-            # parts same each run - but __init_main is only run once so not wasteful
-            ctrlseq(__version__.center(W.SIDE), at=Loc.VERSION, edge=True),
-            ctrlseq(__author__.center(W.SIDE), at=Loc.AUTHOR, edge=True),
-            ctrlseq(" " * W.GUTTER, at=Loc.GUTTER, edge=True),
-            *[  # board
-                ctrlseq(
-                    " " * W.TILE,
-                    at=V(*Loc.BOARD) + V((W.TILE + 1) * x, 2 * y),
-                    edge=True,
-                )
-                for x, y in product(range(8), range(8))
-            ],
-            # dynamic parts
-            ctrlseq(headline.center(W.MAIN), at=Loc.HEADLINE, edge=True),
-            ctrlseq(taken_blank, clr=self.pallet.board[1], at=Loc.LH_TAKEN, edge=True),
-            ctrlseq(taken_blank, clr=self.pallet.board[0], at=Loc.RH_TAKEN, edge=True),
-            ctrlseq(Templates.README[Player.ONE][mode], at=Loc.LH_README, edge=True),
-            ctrlseq(Templates.README[Player.TWO][mode], at=Loc.RH_README, edge=True),
-            ctrlseq(Templates.COL_LABELS, at=Loc.COL_LABELS1),
-            ctrlseq(Templates.ROW_LABELS, at=Loc.ROW_LABELS1),
-            ctrlseq(Templates.COL_LABELS, at=Loc.COL_LABELS2),
-            ctrlseq(Templates.ROW_LABELS, at=Loc.ROW_LABELS2),
-        ]
-
-    def __clear_promotion(self) -> list[str]:
+        draw = self.frame.draw
+
+        # parts same each run - but __init_main is only run once so not wasteful
+        draw(__version__.center(W.SIDE), at=Loc.VERSION, edge=True)
+        draw(__author__.center(W.SIDE), at=Loc.AUTHOR, edge=True)
+        draw(" " * W.GUTTER, at=Loc.GUTTER, edge=True)
+        for x, y in product(range(8), range(8)):  # board
+            draw(" " * W.TILE, at=V(*Loc.BOARD) + V((W.TILE + 1) * x, 2 * y), edge=True)
+        # dynamic parts
+        draw(headline.center(W.MAIN), at=Loc.HEADLINE, edge=True)
+        draw(taken_blank, clr=self.pallet.board[1], at=Loc.LH_TAKEN, edge=True)
+        draw(taken_blank, clr=self.pallet.board[0], at=Loc.RH_TAKEN, edge=True)
+        draw(self.__readme(Player.ONE), at=Loc.LH_README, edge=True)
+        draw(self.__readme(Player.TWO), at=Loc.RH_README, edge=True)
+        draw(Templates.COL_LABELS, at=Loc.COL_LABELS1)
+        draw(Templates.ROW_LABELS, at=Loc.ROW_LABELS1)
+        draw(Templates.COL_LABELS, at=Loc.COL_LABELS2)
+        draw(Templates.ROW_LABELS, at=Loc.ROW_LABELS2)
+
+    def __readme(self, player: Player) -> str:
         mode = self.game.mode
         assert mode, "Mode should be set by this point in the game."
-        return [
-            ctrlseq(Templates.README[Player.ONE][mode], at=Loc.LH_README, edge=True),
-            ctrlseq(Templates.README[Player.TWO][mode], at=Loc.RH_README, edge=True),
-        ]
+        if mode is Mode.RMP and player is self.game.local_player:
+            return Templates.LOCAL_README
+        return Templates.README[player][mode]
 
-    def __init_game_over(self) -> list[str]:
+    def __clear_promotion(self) -> None:
+        self.frame.draw(self.__readme(Player.ONE), at=Loc.LH_README, edge=True)
+        self.frame.draw(self.__readme(Player.TWO), at=Loc.RH_README, edge=True)
+
+    def __init_game_over(self) -> None:
         board = self.game.board
-        if board.ply >= MAX_PLY_COUNT:
-            msg = f"Draw: {MAX_PLY_COUNT // 2} turn limit reached."
-        elif not board.can_move() and board.in_check():
-            msg = f"Player {board.active_player} wins by checkmate!"
-        elif not board.can_move() and not board.in_check():
-            msg = "Draw: Stalemate."
+        if (ending := board.ending()) is Ending.CHECKMATE:
+            msg = f"Player {~board.active_player} wins by checkmate!"
+        elif ending:
+            msg = f"Draw: {ending.value}."
         else:
             msg = f"Player {~board.active_player} wins by forfeit."
         msg += " Hit any key to quit."
-        return [ctrlseq(msg.center(W.GUTTER), clr=self.pallet.focus, at=Loc.GUTTER)]
+        self.frame.draw(msg.center(W.GUTTER), clr=self.pallet.focus, at=Loc.GUTTER)
 
-    def __refresh_start(self) -> list[str]:
+    def __refresh_start(self) -> None:
         mode_str = MODE_STRINGS[self.game.scursor]
         coord = (Loc.START[0], Loc.START[1] + 2 + self.game.scursor)
-        return [
-            ctrlseq(Templates.START, at=Loc.START, edge=True),
-            ctrlseq(mode_str, clr=self.pallet.cursor, at=coord),
-        ]
+        self.frame.draw(Templates.START, at=Loc.START, edge=True)
+        self.frame.draw(mode_str, clr=self.pallet.cursor, at=coord)
 
-    def __refresh_main(self) -> list[str]:
+    def __refresh_main(self) -> None:
         pallet = self.pallet
         board = self.game.board
 
-        s = board.score(Player.ONE), board.score(Player.TWO)
+        draw = self.frame.draw
 
-        parts = []
+        s = board.score(Player.ONE), board.score(Player.TWO)
 
         # taken pieces & scores
         for i, player in enumerate(Player):
             # scores
             coord = Loc.LH_SCORE if player is Player.ONE else Loc.RH_SCORE
-            parts.append(
-                ctrlseq(
-                    Templates.INFO.format(player, s[i]),
-                    clr=pallet.text[player],
-                    at=coord,
-                    edge=True,
-                )
+            draw(
+                Templates.INFO.format(player, s[i]),
+                clr=pallet.text[player],
+                at=coord,
+                edge=True,
             )
             # taken pieces
             taken_pieces = self.game.board.taken_pieces[player]
             color = self.pallet.piece[~player] + self.pallet.board[player.value % 2]
             text = fill(" ".join(self.symbol[role] for role in taken_pieces), W.SIDE)
             coord = Loc.LH_TAKEN if player is Player.ONE else Loc.RH_TAKEN
-            parts.append(ctrlseq(text, clr=color, at=coord))
+            draw(text, clr=color, at=coord)
 
         # gutter message
-        msg = f"Turn {board.ply // 2 + 1} of {MAX_PLY_COUNT // 2}. "
-        if s[0] > s[1]:
-            msg += f"Player ONE leads by {s[0] - s[1]} point(s)."
-        elif s[1] > s[0]:
-            msg += f"Player TWO leads by {s[1] - s[0]} point(s)."
-        else:
-            msg += "Players ONE & TWO are equal in score."
-        parts.append(ctrlseq(msg.center(W.GUTTER), at=Loc.GUTTER))
+        draw(self.__gutter_message().center(W.GUTTER), at=Loc.GUTTER)
 
         # update board:
         cursor = self.game.bcursor
@@ -190,25 +200,39 @@ class Display:
                 or (attacker and coord in board.targets_of[attacker.coord])
             )
 
-            color_parts = []
             if coord == cursor:
-                color_parts.append(pallet.cursor)
+                background = pallet.cursor
             elif attacker and coord == attacker.coord:
-                color_parts.append(pallet.focus)
+                background = pallet.focus
             elif show_targets:
-                color_parts.append(pallet.target)
+                background = pallet.target
             else:
-                color_parts.append(pallet.board[sum(coord) % 2])
+                background = pallet.board[(coord.x + coord.y) % 2]
 
-            color_parts.append(pallet.piece[piece.player] if piece else "")
-            square = f" {self.symbol[piece.role]} " if piece else "   "
+            text, color = self.squares[(piece.role, piece.player) if piece else None]
+            draw(text, clr=background + color, at=SQUARE_LOCS[coord])
 
-            display_loc = Loc.BOARD + V((W.TILE + 1) * coord.x, 2 * coord.y)
-            parts.append(ctrlseq(square, clr="".join(color_parts), at=display_loc))
-
-        return parts
+    def __gutter_message(self) -> str:
+        board = self.game.board
+        s = board.score(Player.ONE), board.score(Player.TWO)
+        msg = f"Turn {board.ply // 2 + 1}. "
+        if (result := self.game.searcher.result) and self.game.mode is Mode.VAI:
+            msg += f"AI searched {result.depth} ply at {result.nps:.0f} nodes/s."
+        elif self.game.mode is Mode.RMP:
+            msg += f"You are Player {self.game.local_player}."
+        elif self.database and (entry := self.database.lookup(board.key)):
+            stats = entry.stats
+            one, two = stats.one_wins / stats.games, stats.two_wins / stats.games
+            msg += f"Seen in {stats.games:,} game(s); ONE won {one:.0%}, TWO {two:.0%}."
+        elif s[0] > s[1]:
+            msg += f"Player ONE leads by {s[0] - s[1]} point(s)."
+        elif s[1] > s[0]:
+            msg += f"Player TWO leads by {s[1] - s[0]} point(s)."
+        else:
+            msg += "Players ONE & TWO are equal in score."
+        return msg
 
-    def __refresh_promotion(self) -> list[str]:
+    def __refresh_promotion(self) -> None:
         xp, yp = (
             Loc.LH_PROMOTION
             if self.game.board.active_player is Player.ONE
@@ -217,7 +241,5 @@ class Display:
         role = PROMOTION_OPTIONS[self.game.pcursor]
         color = self.pallet.cursor
         option_str = f"({role.symbol}) {role}"
-        return [
-            ctrlseq(Templates.PROMOTION, at=(xp, yp)),
-            ctrlseq(option_str, clr=color, at=(xp, yp + 4 + self.game.pcursor)),
-        ]
+        self.frame.draw(Templates.PROMOTION, at=(xp, yp))
+        self.frame.draw(option_str, clr=color, at=(xp, yp + 4 + self.game.pcursor))
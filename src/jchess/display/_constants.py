@@ -12,7 +12,7 @@ from enum import IntEnum
 from textwrap import wrap
 from typing import Literal
 
-from jchess.game import PROMOTION_OPTIONS, Mode
+from jchess.game import MENU_MODES, PROMOTION_OPTIONS, Mode
 from jchess.geometry import V
 from jchess.pieces import Player
 
@@ -24,7 +24,7 @@ class H(IntEnum):
     SIDE_SMALL = 3
     SIDE_LARGE = MAIN - 2 * SIDE_SMALL - 6
     README = 11
-    START = 7
+    START = 8
     PROMOTION = SIDE_LARGE
 
 
@@ -69,7 +69,7 @@ class Loc:
     ROW_LABELS2 = (62, 6)
 
 
-def _make_readme(flag: Literal["rhs", "lhs", "bot"]) -> str:
+def _make_readme(flag: Literal["rhs", "lhs", "bot", "ai", "remote"]) -> str:
     if flag in ["rhs", "lhs"]:
         msg_parts = [
             "Arrow keys" if flag == "rhs" else "WASD keys",
@@ -79,9 +79,15 @@ def _make_readme(flag: Literal["rhs", "lhs", "bot"]) -> str:
             "F12" if flag == "rhs" else "F1 ",
             "(forfeit)",
         ]
-    else:  # flag is bot
+    elif flag == "bot":
         text = "This player is a 'dumb bot': it randomly selects each next move."
         msg_parts = wrap(text, W.SIDE)
+    elif flag == "ai":
+        text = "This player is an AI: it searches ahead for the best next move."
+        msg_parts = wrap(text, W.SIDE)
+    else:  # flag is remote
+        text = "This player is remote: their moves arrive over the network."
+        msg_parts = wrap(text, W.SIDE)
     msg_parts = ["README:", "=" * W.SIDE, *msg_parts]
     missing_rows = H.SIDE_LARGE - len(msg_parts)
     msg_parts = (
@@ -111,7 +117,7 @@ def _make_start_menu() -> str:
     lines = [
         "Pick a game mode:",
         "=" * W.START,
-        *[f"{m.value}" for m in Mode],
+        *[f"{m.value}" for m in MENU_MODES],
         "=" * W.START,
         "[esc: quit, space: pick]",
     ]
@@ -127,6 +133,7 @@ class Templates:
             "SCORE = {:0>3}",
         ]
     )
+    LOCAL_README = _make_readme("rhs")  # for the user's player in `Mode.RMP`
     START = _make_start_menu()
     PROMOTION = _make_promotion()
     README = {
@@ -134,15 +141,19 @@ class Templates:
             Mode.TDB: _make_readme("bot"),
             Mode.VDB: _make_readme("rhs"),
             Mode.LTP: _make_readme("lhs"),
+            Mode.VAI: _make_readme("rhs"),
+            Mode.RMP: _make_readme("remote"),
         },
         Player.TWO: {
             Mode.TDB: _make_readme("bot"),
             Mode.VDB: _make_readme("bot"),
             Mode.LTP: _make_readme("rhs"),
+            Mode.VAI: _make_readme("ai"),
+            Mode.RMP: _make_readme("remote"),
         },
     }
     ROW_LABELS = "\n \n".join(str(s) for s in range(8, 0, -1))
     COL_LABELS = "   ".join("abcdefgh")
 
 
-MODE_STRINGS = [f"{m.value: ^{W.START}}" for m in Mode]
+MODE_STRINGS = [f"{m.value: ^{W.START}}" for m in MENU_MODES]
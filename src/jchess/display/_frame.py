@@ -0,0 +1,97 @@
+"""Frame buffer so `Display` only rewrites the cells of the screen which changed."""
+
+from functools import lru_cache
+
+from colorama import Style
+
+from jchess.geometry import V
+from jchess.terminal import CSI
+
+Cell = tuple[str, str]  # a character & the colour it's shown in
+Span = tuple[int, int, tuple[Cell, ...]]  # cells in a row, from the given x & y
+BLANK: Cell = (" ", "")
+LAYOUT_CACHE_SIZE = 4096  # enough for every panel & square shown in a game
+# unchanged cells between two changed ones are rewritten if there are at most this many,
+# since moving the cursor past them would take about as many bytes
+MAX_GAP = 6
+
+
+def _runs(changed: list[int]) -> list[tuple[int, int]]:
+    """Group column indices into `[start, end)` runs, bridging short gaps."""
+    runs: list[tuple[int, int]] = []
+    for col in changed:
+        if runs and col - runs[-1][1] <= MAX_GAP:
+            runs[-1] = (runs[-1][0], col + 1)
+        else:
+            runs.append((col, col + 1))
+    return runs
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def layout(s: str, clr: str, at: tuple[int, int] | V, edge: bool) -> tuple[Span, ...]:
+    """Cells drawn by `FrameBuffer.draw`; memoised, as most panels are static."""
+    lines = s.split("\n")
+    w, h = len(lines[0]), len(lines)
+    x, y = at
+
+    spans = [
+        (x, y + i, tuple((char, clr) for char in line)) for i, line in enumerate(lines)
+    ]
+    if edge:
+        side = (("|", ""),)
+        border = tuple((char, "") for char in "+" + "-" * w + "+")
+        spans.extend((x - 1, y + i, side) for i in range(h))
+        spans.extend((x + w, y + i, side) for i in range(h))
+        spans.extend([(x - 1, y - 1, border), (x - 1, y + h, border)])
+    return tuple(spans)
+
+
+class FrameBuffer:
+    """The cells of the screen as last shown (front) & as they should be shown (back).
+
+    Drawing only changes the back buffer; `flush` returns the control sequences which
+    turn the front into the back, moving the cursor only to the runs of changed cells.
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width, self.height = width, height
+        self.front = [[BLANK] * width for _ in range(height)]  # assumes a clear screen
+        self.back = [[BLANK] * width for _ in range(height)]
+        self.frame_bytes = 0  # written by the latest `flush`
+        self.total_bytes = 0
+        self.frames = 0
+
+    def draw(
+        self, s: str, *, clr: str = "", at: tuple[int, int] | V, edge: bool = False
+    ) -> None:
+        """Draw to the back buffer; arguments are as for `terminal.ctrlseq`."""
+        for x, y, cells in layout(s, clr, at, edge):
+            # clip to the screen; coordinates are 1-based
+            start, end = max(x, 1), min(x + len(cells), self.width + 1)
+            if 1 <= y <= self.height and start < end:
+                self.back[y - 1][start - 1 : end - 1] = cells[start - x : end - x]
+
+    def flush(self) -> str:
+        """Control sequences to show the back buffer, given the front is on screen."""
+        parts = []
+        style = ""
+        for y, (front, back) in enumerate(zip(self.front, self.back)):
+            if front == back:
+                continue
+            changed = [x for x, (old, new) in enumerate(zip(front, back)) if old != new]
+            for start, end in _runs(changed):
+                parts.append(f"{CSI}{y + 1};{start + 1}H")  # 1-based coordinates
+                for char, clr in back[start:end]:
+                    if clr != style:
+                        parts.append(Style.RESET_ALL + clr)
+                        style = clr
+                    parts.append(char)
+            front[:] = back
+        if style:
+            parts.append(Style.RESET_ALL)
+
+        frame = "".join(parts)
+        self.frame_bytes = len(frame.encode())
+        self.total_bytes += self.frame_bytes
+        self.frames += 1
+        return frame
@@ -1,7 +1,8 @@
 """Interface layer between the player and chess game.
 
-`Mode` is set by the user early in `Game`'s lifecycle and doesn't change. `Status` is
-internally controlled by `Game`. Both aid `Game`'s logic flow.
+`Mode` is set by the user early in `Game`'s lifecycle and doesn't change (`Mode.RMP` is
+set by `play_remotely` instead). `Status` is internally controlled by `Game`. Both aid
+`Game`'s logic flow.
 """
 import random
 from collections.abc import Iterator
@@ -9,16 +10,26 @@ from enum import Enum, auto
 from time import sleep
 from typing import Any
 
-from jchess.action import Action, ExitGame, get_action, get_action_lhs, get_action_rhs
-from jchess.board import Board
+from jchess.action import (
+    ACTION_LOOKUP_GENERIC,
+    ACTION_LOOKUP_LHS,
+    ACTION_LOOKUP_RHS,
+    Action,
+    ExitGame,
+    to_action,
+)
+from jchess.board import Board, Move
 from jchess.geometry import V, Vector
 from jchess.pieces import LocPiece, Player, Role
+from jchess.profiling import timed
+from jchess.search import Budget, Searcher
+from jchess.terminal import get_input
 
 SELECT, UP, DOWN, RIGHT, LEFT, IGNORE, QUIT = list(Action)
 AXIS_LOOKUP = {UP: V(0, -1), DOWN: V(0, +1), LEFT: V(-1, 0), RIGHT: V(+1, 0)}
 ROTATE = {UP: LEFT, DOWN: RIGHT, RIGHT: UP, LEFT: DOWN}
 PROMOTION_OPTIONS = (Role.QUEEN, Role.KNIGHT, Role.ROOK, Role.BISHOP)
-MAX_PLY_COUNT = 100
+BOT_DELAY = 0.2  # seconds between each action of a bot, when paced in real time
 
 
 class Mode(Enum):
@@ -27,8 +38,20 @@ class Mode(Enum):
     VDB = "Versus Dumb Bot"
     LTP = "Local Two-Player"
     TDB = "Two Dumb Bots"
-    # RMP = "Remote Multi-Player"
-    # VAI = "Versus AI"
+    VAI = "Versus AI"
+    RMP = "Remote Multi-Player"
+
+
+# modes picked from the start menu; a remote game is joined with `jchess connect`
+MENU_MODES = (Mode.VDB, Mode.LTP, Mode.TDB, Mode.VAI)
+
+
+class Pacing(Enum):
+    """How quickly bots act - user set."""
+
+    REALTIME = "realtime"  # pause before each action, so the cursor is seen to move
+    FRAME = "frame"  # act without pausing; the caller limits the rate of refreshes
+    INSTANT = "instant"  # jump the cursor straight to each selection, without pausing
 
 
 class Status(Enum):
@@ -44,8 +67,14 @@ class Status(Enum):
 class Game:
     """Interface layer between the player and chess game."""
 
-    def __init__(self) -> None:
-        """Initialise a `GameState`."""
+    def __init__(
+        self, *, budget: Budget = Budget(), pacing: Pacing = Pacing.REALTIME
+    ) -> None:
+        """Initialise a `GameState`.
+
+        :param budget: Limits on each search made by the AI (in `Mode.VAI`).
+        :param pacing: How quickly bots act; doesn't affect the moves they choose.
+        """
         self.board = Board()
 
         self.attacker: LocPiece | None = None
@@ -55,11 +84,12 @@ class Game:
         self.bcursor = V(4, 7)
         self.pcursor = 0
 
-        self.status_prev = Status.UNINITIALIZED
         self.status = Status.START_MENU
 
         self.mode: Mode | None = None
-        self.bot_action = self.__action_generator()
+        self.local_player: Player | None = None  # the user's player, in `Mode.RMP`
+        self.bot_action = self.__action_generator(pacing)
+        self.searcher = Searcher(budget)
 
     def __setattr__(self, name: str, value: Any) -> None:
         # ensures user can 'cycle' through options
@@ -68,18 +98,21 @@ class Game:
         elif name == "pcursor":
             value %= len(PROMOTION_OPTIONS)
         elif name == "scursor":
-            value %= len(Mode)
+            value %= len(MENU_MODES)
         super().__setattr__(name, value)
 
     def evolve_state(self) -> None:
         """Get next action and update the game accordingly."""
+        self.apply_action(self.get_action())
 
-        action = self.get_action()
+    @timed("Game.apply_action")
+    def apply_action(self, action: Action) -> None:
+        """Update the game according to an action of the user or bot."""
         if self.status is Status.GAME_OVER:
             raise ExitGame
 
         board = self.board
-        status = self.status_prev = self.status
+        status = self.status
         attacker = self.attacker
 
         if action is QUIT and self.mode is not None:
@@ -88,7 +121,7 @@ class Game:
         elif status is Status.START_MENU:
             self.scursor += AXIS_LOOKUP.get(action, V(0, 0)).y
             if action is SELECT:
-                self.mode = list(Mode)[self.scursor]
+                self.mode = MENU_MODES[self.scursor]
                 self.status = Status.BOARD_FOCUS
 
         elif status is Status.PROMOTING:
@@ -117,52 +150,97 @@ class Game:
                         and attacker.piece.moved
                     ):
                         self.status = Status.PROMOTING
+                        self.pcursor = 0  # bots count their presses from the queen
                     else:
                         board.process_move(attacker.coord, self.bcursor)
                         self.attacker = None
 
-        if board.ply >= MAX_PLY_COUNT or not board.can_move():
+        if board.ending():
             self.status = Status.GAME_OVER
 
+    def play_remotely(self, player: Player) -> None:
+        """Skip the start menu to play as `player`, against a remote opponent."""
+        self.mode = Mode.RMP
+        self.local_player = player
+        self.status = Status.BOARD_FOCUS
+
     def get_action(self) -> Action:
         """Get next action from user or bot."""
+        lookup = self.key_lookup()
+        return (
+            next(self.bot_action) if lookup is None else to_action(get_input(), lookup)
+        )
 
+    def key_lookup(self) -> dict[str, Action] | None:
+        """Keys the user acts with next, or `None` if a bot acts next."""
         player = self.board.active_player
+        if self.mode is None or self.status is Status.GAME_OVER:
+            return ACTION_LOOKUP_GENERIC
         if self.mode is Mode.TDB:
-            return next(self.bot_action)
-        if self.mode is Mode.VDB:
-            return get_action_rhs() if player is Player.ONE else next(self.bot_action)
-        if self.mode is Mode.LTP:
-            return get_action_lhs() if player is Player.ONE else get_action_rhs()
-        # else mode unset, so in the start menu
-        return get_action()
-
-    def __action_generator(self) -> Iterator[Action]:
-        """Generate a sequence of `Action`s forming a valid (but random) chess move."""
-        board = self.board
+            return None
+        if self.mode in (Mode.VDB, Mode.VAI):
+            return ACTION_LOOKUP_RHS if player is Player.ONE else None
+        if self.mode is Mode.RMP:
+            return ACTION_LOOKUP_RHS if player is self.local_player else None
+        # else local two-player
+        return ACTION_LOOKUP_LHS if player is Player.ONE else ACTION_LOOKUP_RHS
+
+    def __action_generator(self, pacing: Pacing) -> Iterator[Action]:
+        """Generate a sequence of `Action`s forming each move chosen by a bot."""
         while True:
-
-            attacker_coord = random.choice([v for v in board if board.can_move_from(v)])
-            yield from self.__path_to(attacker_coord)
-
-            assert self.attacker, "Attacker should have been set by previous moves."
-            target = random.choice(list(board.targets_of[self.attacker.coord]))
-            yield from self.__path_to(target)
-
-            if self.status is Status.PROMOTING:
-                for _ in range(random.randint(0, 3)):
-                    yield Action.DOWN
-                yield Action.SELECT
-
-    def __path_to(self, destination: Vector) -> Iterator[Action]:
+            if self.mode is Mode.VAI:
+                move = self.__searched_move()
+            else:
+                move = self.__random_move()
+            yield from self.move_actions(move, pacing)
+
+    def move_actions(self, move: Move, pacing: Pacing) -> Iterator[Action]:
+        """Generate the sequence of `Action`s which make `move`, as a bot would."""
+        yield from self.__path_to(move.src, pacing)
+
+        assert self.attacker, "Attacker should have been set by previous moves."
+        yield from self.__path_to(move.dst, pacing)
+
+        if self.status is Status.PROMOTING:
+            assert move.promote_to, "Promoting moves should specify a role."
+            for _ in range(PROMOTION_OPTIONS.index(move.promote_to)):
+                yield Action.DOWN
+            yield Action.SELECT
+
+    def __random_move(self) -> Move:
+        """Choose a valid (but random) chess move."""
+        board = self.board
+        src = random.choice(board.movable_squares())
+        dst = random.choice(list(board.targets_of[src]))
+        piece = board[src]
+        # only drawn when needed, so a seed gives the same moves as it always has
+        promotes = piece and piece.role is Role.PAWN and dst.y in (0, 7)
+        return Move(src, dst, random.choice(PROMOTION_OPTIONS) if promotes else None)
+
+    def __searched_move(self) -> Move:
+        """Choose the best move found by searching within the searcher's budget."""
+        move = self.searcher.search(self.board).move
+        assert move, "Only called when the active player can move."
+        return move
+
+    def __path_to(self, destination: Vector, pacing: Pacing) -> Iterator[Action]:
         """Generate sequence of `Action`s to move `bcursor` to `destination`."""
+        if pacing is Pacing.INSTANT:
+            self.bcursor = destination
+            yield Action.SELECT
+            return
+
         dx, dy = destination - self.bcursor
-        secs = 0.2
         for _ in range(abs(dy)):
-            sleep(secs)
+            self.__pause(pacing)
             yield Action.UP if dy < 0 else Action.DOWN
         for _ in range(abs(dx)):
-            sleep(secs)
+            self.__pause(pacing)
             yield Action.RIGHT if dx > 0 else Action.LEFT
-        sleep(secs)
+        self.__pause(pacing)
         yield Action.SELECT
+
+    @staticmethod
+    def __pause(pacing: Pacing) -> None:
+        if pacing is Pacing.REALTIME:
+            sleep(BOT_DELAY)
@@ -2,10 +2,13 @@
 
 Primarily used to facilitate easy coordinate translation. Supports expected operations
 (+, -, *, //, ==) as well as some other convenience (indexing, unpacking and %).
+
+Every coordinate of the board also has an interned instance in `SQUARES`; code which
+would otherwise create many vectors (eg move generation) can look these up instead.
 """
 
-from dataclasses import dataclass
-from typing import Iterator, TypeAlias
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, TypeAlias
 
 
 @dataclass(slots=True, frozen=True)
@@ -14,6 +17,21 @@ class V:
 
     x: int
     y: int
+    # vectors are hashed far more often than they're created, so cache the hash
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_hash", hash((self.x, self.y)))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    # vectors are immutable, so copies can share (interned) instances
+    def __deepcopy__(self, memo: dict[int, object]) -> "V":
+        return self
+
+    def __reduce__(self) -> tuple[Callable[[int, int], "V"], tuple[int, int]]:
+        return _unpickle, (self.x, self.y)
 
     def __add__(self, other: "V") -> "V":
         return V(self.x + other.x, self.y + other.y)
@@ -47,3 +65,28 @@ class V:
 # Conveniences for typing
 Vector: TypeAlias = "V"
 VectorSet = set[V]
+
+# interned coordinates of the board; `V(x, y)` is at index `8 * y + x`
+SQUARES = tuple(V(i % 8, i // 8) for i in range(64))
+OFF_BOARD = V(-1, -1)  # stands in for every coordinate which isn't on the board
+
+
+def _unpickle(x: int, y: int) -> V:
+    coord = square(x, y)
+    return V(x, y) if coord is OFF_BOARD else coord
+
+
+def square(x: int, y: int) -> V:
+    """Interned vector of a coordinate, or `OFF_BOARD` if it isn't on the board."""
+    return SQUARES[8 * y + x] if 0 <= x < 8 and 0 <= y < 8 else OFF_BOARD
+
+
+def neighbors(start: V, deltas: tuple[V, ...]) -> tuple[V, ...]:
+    """Interned coordinates `start + delta` of each delta which stays on the board."""
+    found = (square(start.x + d.x, start.y + d.y) for d in deltas)
+    return tuple(v for v in found if v is not OFF_BOARD)
+
+
+def ray(start: V, direction: V) -> tuple[V, ...]:
+    """Interned coordinates from `start` (exclusive) along `direction` to the edge."""
+    return neighbors(start, tuple(d * direction for d in range(1, 8)))
@@ -0,0 +1,255 @@
+"""Remote games over TCP: an asyncio server hosting many games at once, & it's clients.
+
+Every message is `MESSAGE.size` bytes: a `Kind` & a 16-bit value. A client sends `JOIN`
+and is sent `START` (with the index of it's player) once paired with an opponent. Then
+each player sends the moves they make (packed by `Move.encode`), which the server
+checks & passes on to the opponent, or else sends back as `REJECT`ed. Both players are
+sent `OVER` when the game ends or either of them leaves.
+
+Each client is served by a coroutine rather than a thread, & each game's `Board` keeps
+no records of it's moves (just the index of it's positions), so a single process can
+host thousands of games.
+"""
+
+import asyncio
+import random
+import struct
+from collections.abc import AsyncIterator
+from contextlib import suppress
+from dataclasses import dataclass, field
+from enum import IntEnum
+from time import perf_counter
+
+from jchess.board import Board, Engine, Move
+from jchess.pieces import Player
+from jchess.selfplay import random_move
+
+DEFAULT_HOST = "localhost"
+DEFAULT_PORT = 7420
+BACKLOG = 1024  # connections waiting to be accepted, eg from a load generator
+MESSAGE = struct.Struct(">BH")
+
+
+class Kind(IntEnum):
+    """Type of a message; the meaning of it's value depends on it."""
+
+    JOIN = 0  # from a client, to be paired with an opponent
+    START = 1  # the game has started; the value is the index of the client's player
+    MOVE = 2  # a packed move
+    REJECT = 3  # the move (value) sent by the client isn't legal
+    OVER = 4  # the game has ended
+
+
+class Connection:
+    """One end of a connection; sends & receives whole messages."""
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, kind: Kind, value: int = 0) -> None:
+        """Send a message; it's buffered, so this never waits for the network."""
+        self.writer.write(MESSAGE.pack(kind, value))
+
+    async def receive(self) -> tuple[Kind, int] | None:
+        """Wait for the next message; `None` once the connection closes (or errs)."""
+        try:
+            kind, value = MESSAGE.unpack(await self.reader.readexactly(MESSAGE.size))
+            return Kind(kind), value
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            return None
+
+    async def close(self) -> None:
+        self.writer.close()
+        with suppress(ConnectionError):
+            await self.writer.wait_closed()
+
+
+@dataclass(eq=False)
+class Match:
+    """A game between two connected players; `players[i]` plays `list(Player)[i]`."""
+
+    players: tuple[Connection, Connection]
+    board: Board = field(default_factory=lambda: Board(engine=Engine.BITBOARD))
+
+
+class Server:
+    """Hosts games between pairs of clients, paired in the order they join."""
+
+    def __init__(self) -> None:
+        self.waiting: tuple[Connection, asyncio.Future[Match]] | None = None
+        self.matches: set[Match] = set()  # games in progress
+        self.moves = 0  # made in every game so far
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> asyncio.Server:
+        """Start accepting clients; with `port` 0 any free port is used."""
+        return await asyncio.start_server(self.serve, host, port, backlog=BACKLOG)
+
+    async def serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a single client, from it joining until it's game ends."""
+        connection = Connection(reader, writer)
+        match = None
+        try:
+            if await connection.receive() != (Kind.JOIN, 0):
+                return
+            match = await self.pair(connection)
+            player = match.players.index(connection)
+            connection.send(Kind.START, player)
+            while match in self.matches and (message := await connection.receive()):
+                kind, value = message
+                if kind is not Kind.MOVE:
+                    break
+                self.play(match, player, value)
+        finally:
+            if self.waiting and self.waiting[0] is connection:
+                self.waiting = None
+            if match in self.matches:
+                self.end(match)  # the client left (or misbehaved)
+            await connection.close()
+
+    async def pair(self, connection: Connection) -> Match:
+        """Wait for an opponent of `connection`; the first to join plays first."""
+        if self.waiting is None:
+            future: asyncio.Future[Match] = asyncio.get_running_loop().create_future()
+            self.waiting = connection, future
+            return await future
+        opponent, future = self.waiting
+        self.waiting = None
+        match = Match((opponent, connection))
+        self.matches.add(match)
+        future.set_result(match)
+        return match
+
+    def play(self, match: Match, player: int, code: int) -> None:
+        """Make the move `code` sent by a player of `match`, if it's legal."""
+        board = match.board
+        try:
+            move = Move.decode(code)
+        except ValueError:
+            move = None
+        if move is None or board.ply % 2 != player or move not in board.legal_moves():
+            match.players[player].send(Kind.REJECT, code)
+            return
+
+        board.process_move(move.src, move.dst, promote_to=move.promote_to)
+        board.history.forget()  # moves are never unmade, so their records aren't kept
+        match.players[1 - player].send(Kind.MOVE, code)
+        self.moves += 1
+        if board.ending():
+            self.end(match)
+
+    def end(self, match: Match) -> None:
+        self.matches.discard(match)
+        for connection in match.players:
+            connection.send(Kind.OVER)
+
+
+class Client:
+    """The client end of a remote game; see `join`."""
+
+    def __init__(self, connection: Connection, player: Player) -> None:
+        self.connection = connection
+        self.player = player  # played by this client
+
+    @classmethod
+    async def join(cls, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> "Client":
+        """Connect to a server & wait for it to start a game against an opponent."""
+        connection = Connection(*await asyncio.open_connection(host, port))
+        connection.send(Kind.JOIN)
+        message = await connection.receive()
+        if message is None or message[0] is not Kind.START:
+            await connection.close()
+            raise ConnectionError(f"{host}:{port} didn't start a game.")
+        return cls(connection, list(Player)[message[1]])
+
+    def send_move(self, move: Move) -> None:
+        self.connection.send(Kind.MOVE, move.encode())
+
+    async def moves(self) -> AsyncIterator[Move]:
+        """Yield each move of the opponent; ends when the game does (for any reason)."""
+        while message := await self.connection.receive():
+            kind, value = message
+            if kind is not Kind.MOVE:
+                return  # the game is over, or this client's move was rejected
+            yield Move.decode(value)
+
+    async def close(self) -> None:
+        await self.connection.close()
+
+
+@dataclass(slots=True)
+class LoadSummary:
+    """Totals over the games played by `load`."""
+
+    games: int = 0
+    moves: int = 0
+    seconds: float = 0.0
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return "\n".join(
+            [
+                f"Games: {self.games} in {self.seconds:.2f}s",
+                f"Moves: {self.moves} ({self.moves_per_second:,.0f} moves/s)",
+            ]
+        )
+
+
+async def load(
+    games: int,
+    *,
+    plies: int | None = None,
+    seed: int = 0,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+) -> LoadSummary:
+    """Play many concurrent games of random moves against a server, for load testing.
+
+    :param games: Number of games; twice as many clients join at once.
+    :param plies: Plies after which each game is left, if it hasn't ended already
+        (otherwise games are played to their end).
+    :param seed: Seeds the random moves of the n-th client by `seed + n`.
+    :return: Totals over every game.
+    """
+    start = perf_counter()
+    summary = LoadSummary(games=games)
+    clients = [
+        _load_client(plies, random.Random(seed + n), host, port)
+        for n in range(2 * games)
+    ]
+    summary.moves = sum(await asyncio.gather(*clients))
+    summary.seconds = perf_counter() - start
+    return summary
+
+
+async def _load_client(
+    plies: int | None, rng: random.Random, host: str, port: int
+) -> int:
+    """Join a game & play random moves until it ends; returns the moves made."""
+    client = await Client.join(host, port)
+    board = Board(engine=Engine.BITBOARD)
+    opponent = client.moves()
+    move: Move | None
+    moves = 0
+    try:
+        while (plies is None or board.ply < plies) and not board.ending():
+            if board.active_player is client.player:
+                move = random_move(board, rng)
+                client.send_move(move)
+                moves += 1
+            elif (move := await anext(opponent, None)) is None:
+                break
+            board.process_move(move.src, move.dst, promote_to=move.promote_to)
+            board.history.forget()
+    finally:
+        await client.close()
+    return moves
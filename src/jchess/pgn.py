@@ -0,0 +1,281 @@
+"""Portable Game Notation: export of played games & a streaming reader of PGN files.
+
+Moves are written in standard algebraic notation (SAN), eg 'Nbd7', 'exd5' or 'e8=Q#',
+disambiguated by the other pieces which target the same square (in `targets_of`).
+
+`read_games` yields the games of a file one at a time, reading it a line at a time, so
+files of any size can be scanned. Only the headers are parsed as they're read; the
+moves are kept as text until a game is `PgnGame.replay`ed (or skipped entirely with
+`moves=False`, for the fastest scans of the headers).
+"""
+
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import date
+from textwrap import fill
+
+from jchess.board import (
+    FEN_LETTERS,
+    FEN_ROLES,
+    FILES,
+    START_FEN,
+    Board,
+    Ending,
+    Engine,
+    Move,
+    to_algebraic,
+)
+from jchess.game import Game, Mode
+from jchess.geometry import V
+from jchess.pieces import Player, Role
+
+LINE_WIDTH = 80  # of the moves, as recommended by the standard
+TAG = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+SAN = re.compile(r"([KQRBN])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([QRBN]))?")
+# comments, variations, annotations & move numbers are skipped; anything else is a move
+TOKEN = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+|\d+\.+|[()]|[^\s{}();$]+")
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+CASTLES = {"O-O": 2, "O-O-O": -2, "0-0": 2, "0-0-0": -2}  # -> the king's step in x
+# names of (white, black) in each mode; the user plays white, except maybe remotely
+PLAYER_NAMES: dict[Mode | None, tuple[str, str]] = {
+    Mode.VDB: ("Player", "Dumb Bot"),
+    Mode.LTP: ("Player ONE", "Player TWO"),
+    Mode.TDB: ("Dumb Bot", "Dumb Bot"),
+    Mode.VAI: ("Player", "AI"),
+    Mode.RMP: ("Player", "Remote Player"),
+}
+
+
+@dataclass(slots=True)
+class PgnGame:
+    """A game read from a PGN file; it's moves are only parsed by `sans` & `replay`."""
+
+    headers: dict[str, str] = field(default_factory=dict)
+    movetext: str = ""  # empty if read with `moves=False`
+
+    @property
+    def result(self) -> str:
+        return self.headers.get("Result", "*")
+
+    def sans(self) -> list[str]:
+        """Split the main line into it's moves, in SAN as written (eg with any '+')."""
+        sans = []
+        depth = 0  # of variations
+        for token in TOKEN.findall(self.movetext):
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+            elif depth or token[0] in "{;$" or token in RESULTS:
+                continue
+            elif not token[0].isdigit() or token in CASTLES:  # not a move number
+                sans.append(token)
+        return sans
+
+    def replay(self, engine: Engine = Engine.BITBOARD) -> Iterator[Board]:
+        """Play the moves on a new board, yielding it after each move.
+
+        The same board is yielded each time, so copy it to keep a position.
+
+        :raises ValueError: If a move isn't legal (or isn't SAN).
+        """
+        fen = self.headers.get("FEN", START_FEN)
+        board = Board.from_fen(fen, engine=engine)
+        for text in self.sans():
+            move = parse_san(board, text)
+            board.process_move(move.src, move.dst, promote_to=move.promote_to)
+            yield board
+
+
+def san(board: Board, move: Move) -> str:
+    """Name of a legal move of the position on `board`, in SAN."""
+    piece = board[move.src]
+    assert piece, "A move is made by a piece."
+    src, dst = move.src, move.dst
+
+    if piece.role is Role.KING and abs(dst.x - src.x) == 2:
+        text = "O-O" if dst.x > src.x else "O-O-O"
+    else:
+        capture = bool(board[dst]) or piece.role is Role.PAWN and src.x != dst.x
+        if piece.role is Role.PAWN:
+            prefix = FILES[src.x] if capture else ""
+        else:
+            prefix = FEN_LETTERS[piece.role].upper() + _disambiguation(board, move)
+        promotion = (
+            f"={FEN_LETTERS[move.promote_to].upper()}" if move.promote_to else ""
+        )
+        text = prefix + ("x" if capture else "") + to_algebraic(dst) + promotion
+
+    board.make_move(src, dst, promote_to=move.promote_to)
+    if board.ending() is Ending.CHECKMATE:
+        text += "#"
+    elif board.in_check():
+        text += "+"
+    board.unmake_move()
+    return text
+
+
+def _disambiguation(board: Board, move: Move) -> str:
+    """File, rank or square of `move.src` if other such pieces target `move.dst`."""
+    piece = board[move.src]
+    assert piece, "A move is made by a piece."
+    rivals = [
+        src
+        for src, targets in board.targets_of.items()
+        if src != move.src
+        and (rival := board[src])
+        and (rival.role, rival.player) == (piece.role, piece.player)
+        and move.dst in targets
+    ]
+    if not rivals:
+        return ""
+    name = to_algebraic(move.src)
+    if all(src.x != move.src.x for src in rivals):
+        return name[0]
+    if all(src.y != move.src.y for src in rivals):
+        return name[1]
+    return name
+
+
+def parse_san(board: Board, text: str) -> Move:
+    """Legal move of the position on `board` named by `text` (in SAN).
+
+    :raises ValueError: If `text` doesn't name exactly one legal move.
+    """
+    name = text.rstrip("+#!?")
+    file: int | None
+    rank: int | None
+    promote_to: Role | None
+    if name in CASTLES:
+        kings = board.king_squares()
+        if not kings:
+            raise ValueError(f"{text!r} can't be played without a king.")
+        role, file, rank, promote_to = Role.KING, kings[0].x, kings[0].y, None
+        dst = kings[0] + V(CASTLES[name], 0)
+    elif match := SAN.fullmatch(name):
+        letter, file_name, rank_name, square_name, promotion = match.groups()
+        role = FEN_ROLES[letter.lower()] if letter else Role.PAWN
+        file = FILES.index(file_name) if file_name else None
+        rank = 8 - int(rank_name) if rank_name else None
+        promote_to = FEN_ROLES[promotion.lower()] if promotion else None
+        dst = V(FILES.index(square_name[0]), 8 - int(square_name[1]))
+    else:
+        raise ValueError(f"{text!r} isn't a move in SAN.")
+
+    moves = [
+        move
+        for move in board.legal_moves()
+        if move.dst == dst
+        and move.promote_to is promote_to
+        and (piece := board[move.src])
+        and piece.role is role
+        and file in (None, move.src.x)
+        and rank in (None, move.src.y)
+    ]
+    if len(moves) != 1:
+        raise ValueError(f"{text!r} isn't a legal move at ply {board.ply}.")
+    return moves[0]
+
+
+def to_pgn(board: Board, headers: Mapping[str, str] | None = None) -> str:
+    """Game played on `board` (as recorded in it's history) in PGN.
+
+    The board is taken back to the start of it's history & the moves remade, so it's
+    left as it was. A game starting elsewhere (or whose history was forgotten) is given
+    the 'FEN' of it's start.
+
+    :param headers: Tags of the game; 'Result' & any of the seven required tags not
+        given are filled in.
+    """
+    moves = [Move(undo.src, undo.dst, undo.promote_to) for undo in board.history]
+    for _ in moves:
+        board.unmake_move()
+    start = board.ply
+    tags = {
+        "Event": "?",
+        "Site": "?",
+        "Date": "????.??.??",
+        "Round": "?",
+        "White": "?",
+        "Black": "?",
+        **(headers or {}),
+    }
+    if (fen := board.to_fen()) != START_FEN:
+        tags |= {"SetUp": "1", "FEN": fen}
+
+    tokens = []
+    for move in moves:
+        if board.ply % 2 == 0:
+            tokens.append(f"{board.ply // 2 + 1}.")
+        elif board.ply == start:
+            tokens.append(f"{board.ply // 2 + 1}...")
+        tokens.append(san(board, move))
+        board.make_move(move.src, move.dst, promote_to=move.promote_to)
+
+    tags["Result"] = game_result(board)
+    tokens.append(tags["Result"])
+    lines = [f'[{name} "{_escape(value)}"]' for name, value in tags.items()]
+    movetext = fill(" ".join(tokens), LINE_WIDTH, break_on_hyphens=False)
+    return "\n".join(lines) + "\n\n" + movetext + "\n"
+
+
+def export(game: Game) -> str:
+    """Game played in `game` (finished or not) in PGN, naming it's players."""
+    white, black = PLAYER_NAMES.get(game.mode, ("?", "?"))
+    if game.mode is Mode.RMP and game.local_player is Player.TWO:
+        white, black = black, white
+    headers = {
+        "Event": f"J-Chess ({game.mode.value})" if game.mode else "J-Chess",
+        "Date": date.today().strftime("%Y.%m.%d"),
+        "White": white,
+        "Black": black,
+    }
+    return to_pgn(game.board, headers)
+
+
+def read_games(lines: Iterable[str], *, moves: bool = True) -> Iterator[PgnGame]:
+    """Yield each game of a PGN file (or any lines), as it's read.
+
+    :param lines: Lines of the file, eg an open text file.
+    :param moves: If not set, the moves of each game are skipped (not kept).
+    """
+    game: PgnGame | None = None
+    movetext: list[str] = []
+    in_moves = False  # whether the moves of `game` have started
+    for line in lines:
+        if line.startswith("["):
+            if game is None or in_moves:
+                if game:
+                    game.movetext = "".join(movetext)
+                    yield game
+                game, movetext, in_moves = PgnGame(), [], False
+            if tag := TAG.match(line):
+                game.headers[tag[1]] = _unescape(tag[2])
+        elif line.strip() and not line.startswith("%"):  # (escaped lines are skipped)
+            if game is None:
+                game = PgnGame()  # a game without headers
+            in_moves = True
+            if moves:
+                movetext.append(line)
+    if game:
+        game.movetext = "".join(movetext)
+        yield game
+
+
+def game_result(board: Board) -> str:
+    """Find the result of the game on `board` as in PGN, eg '1-0' ('*' if not over)."""
+    ending = board.ending()
+    if ending is None:
+        return "*"
+    if ending is not Ending.CHECKMATE:
+        return "1/2-1/2"
+    return "1-0" if board.active_player is Player.TWO else "0-1"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value)
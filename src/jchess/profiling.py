@@ -0,0 +1,108 @@
+"""Opt-in instrumentation of the hot paths, to see where the time of a session goes.
+
+Functions decorated with `timed` count their calls & the time spent in them, but only
+while a `session` is active (otherwise they cost a single check). A session is started
+by `jchess --profile [PATH]` or by setting the `JCHESS_PROFILE` environment variable to
+the path. On exit a summary is printed to stderr & the whole session, as recorded by
+`cProfile`, is dumped to the path (view it with `python -m pstats PATH`).
+
+Calls made by bots in other threads are timed too, but aren't seen by `cProfile`.
+"""
+
+import sys
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from cProfile import Profile
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import ParamSpec, TypeVar
+
+PROFILE_ENV = "JCHESS_PROFILE"
+DEFAULT_PATH = "jchess.prof"
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+@dataclass(slots=True)
+class Stat:
+    """Totals of a timed function, or of a counted amount (eg bytes written)."""
+
+    calls: int = 0
+    seconds: float = 0.0
+    amount: int = 0
+
+
+@dataclass(slots=True)
+class Profiler:
+    """Stats of each timed function & counted amount, by name."""
+
+    enabled: bool = False
+    stats: dict[str, Stat] = field(default_factory=dict)
+
+    def add(self, name: str, amount: int) -> None:
+        """Count `amount` towards the total of `name`, if enabled."""
+        if self.enabled:
+            stat = self.stats.setdefault(name, Stat())
+            stat.calls += 1
+            stat.amount += amount
+
+    def summary(self) -> str:
+        lines = []
+        for name, stat in sorted(self.stats.items(), key=lambda i: -i[1].seconds):
+            if stat.amount:
+                lines.append(f"  {name:<28} {stat.amount:>12,} in {stat.calls:,}")
+            else:
+                mean = 1000 * stat.seconds / stat.calls if stat.calls else 0.0
+                lines.append(
+                    f"  {name:<28} {stat.calls:>12,} calls {stat.seconds:>9.3f}s"
+                    f" ({mean:.3f}ms each)"
+                )
+        return "\n".join(lines)
+
+
+PROFILER = Profiler()
+
+
+def timed(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorate a function so it's calls are timed, while `PROFILER` is enabled."""
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stat = PROFILER.stats.setdefault(name, Stat())
+                stat.calls += 1
+                stat.seconds += perf_counter() - start
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def session(path: str = DEFAULT_PATH) -> Iterator[Profiler]:
+    """Enable `PROFILER` (& `cProfile`) within the block; see the module docstring."""
+    PROFILER.enabled = True
+    PROFILER.stats.clear()
+    profile = Profile()
+    start = perf_counter()
+    profile.enable()
+    try:
+        yield PROFILER
+    finally:
+        profile.disable()
+        PROFILER.enabled = False
+        profile.dump_stats(path)
+        print(
+            f"Profile of {perf_counter() - start:.2f}s (cProfile stats in {path}):",
+            PROFILER.summary(),
+            sep="\n",
+            file=sys.stderr,
+        )
@@ -0,0 +1,118 @@
+"""Compact binary records of games, for archiving (& scanning) very many of them.
+
+A record is a sequence of games, each a sequence of moves packed by `Move.encode` into
+little-endian 16-bit words & ended by `END`. No move is packed as `END`, since it's
+source & destination would be the same square. Every game starts from the standard
+position, so a game of 80 plies takes 162 bytes: a fraction of it's algebraic notation.
+
+`RecordWriter` streams the moves of a `Board` into a record as they're processed, and
+`read_games` scans a record a chunk at a time, yielding the packed moves of each game
+without decoding them (which is all counting games or plies needs). `replay` decodes &
+plays them on a `Board`, one move at a time.
+"""
+
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+
+from jchess.board import Board, Engine, Move
+
+END = 0
+MOVE = struct.Struct("<H")
+CHUNK_SIZE = 1 << 16  # bytes read at once
+
+
+class RecordWriter:
+    """Writes games to a binary file (opened by the caller), one move at a time.
+
+    Use `attach` to record the moves processed by a board, or `write_game` to write the
+    moves of a whole game at once. The game in progress is ended on leaving a `with`
+    block.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.board: Board | None = None  # whose game is in progress
+        self.games = 0  # ended so far
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.end_game()
+
+    def attach(self, board: Board) -> None:
+        """Record each move processed by `board` as a new game, ending any other."""
+        self.end_game()
+        board.history.recorder = self.write_move
+        self.board = board
+
+    def write_move(self, move: Move) -> None:
+        self.file.write(MOVE.pack(move.encode()))
+
+    def end_game(self) -> None:
+        """End the game of the attached board (if any), which is then detached."""
+        if self.board is None:
+            return
+        self.board.history.recorder = None
+        self.board = None
+        self.file.write(MOVE.pack(END))
+        self.games += 1
+
+    def write_game(self, moves: Iterable[Move]) -> None:
+        """Write a whole game, ending any game of an attached board first."""
+        self.end_game()
+        codes = array("H", (move.encode() for move in moves))
+        codes.append(END)
+        if sys.byteorder == "big":
+            codes.byteswap()
+        self.file.write(codes.tobytes())
+        self.games += 1
+
+
+def read_games(file: BinaryIO) -> Iterator["array[int]"]:
+    """Yield the packed moves of each game in a record, as they're read from `file`.
+
+    A game left unended at the end of the file (eg by a writer which was interrupted) is
+    yielded too.
+
+    :raises ValueError: If the file ends part way through a move.
+    """
+    game = array("H")
+    while chunk := file.read(CHUNK_SIZE):
+        if len(chunk) % 2 and len(chunk := chunk + file.read(1)) % 2:
+            raise ValueError("The record ends part way through a move.")
+        codes = array("H", chunk)
+        if sys.byteorder == "big":
+            codes.byteswap()
+        start = 0
+        while True:
+            try:
+                end = codes.index(END, start)
+            except ValueError:
+                game.extend(codes[start:])
+                break
+            game.extend(codes[start:end])
+            yield game
+            game = array("H")
+            start = end + 1
+    if game:
+        yield game
+
+
+def replay(codes: Iterable[int], engine: Engine = Engine.BITBOARD) -> Iterator[Board]:
+    """Play the packed moves of a game on a new board, yielding it after each move.
+
+    The same board is yielded each time, so copy it to keep a position.
+
+    :raises ValueError: If a move isn't legal (so the record is corrupt).
+    """
+    board = Board(engine=engine)
+    for code in codes:
+        move = Move.decode(code)
+        if move not in board.legal_moves():
+            raise ValueError(f"{move} isn't legal at ply {board.ply}.")
+        board.process_move(move.src, move.dst, promote_to=move.promote_to)
+        yield board
@@ -1,14 +1,339 @@
 """Program entry point; run `jchess` in the command line."""
 
+import asyncio
+import os
+from argparse import ArgumentParser, Namespace
+from asyncio import FIRST_COMPLETED
+from collections.abc import AsyncIterator, Sequence
+from contextlib import ExitStack, nullcontext
+from time import perf_counter
+
+from jchess import terminal
+from jchess.action import Action, to_action
+from jchess.board import START_FEN, Board, Engine, Move
+from jchess.db import Database, build
 from jchess.display import DEFAULT_PALLET, DEFAULT_SYMBOLS, Display
-from jchess.game import Game
+from jchess.game import Game, Pacing
+from jchess.net import DEFAULT_HOST, DEFAULT_PORT, Client, Server, load
+from jchess.pgn import export
+from jchess.profiling import DEFAULT_PATH, PROFILE_ENV, session
+from jchess.selfplay import Bot, Settings, play_games
+
+FRAME_RATE = 30  # maximum refreshes per second
+
+
+def run(
+    pacing: Pacing = Pacing.REALTIME, pgn: str | None = None, db: str | None = None
+) -> None:
+    """Entry point to begin game - game state then visuals updated with each input.
+
+    :param pacing: How quickly bots act.
+    :param pgn: Path of a PGN file to append the game to, when it's left.
+    :param db: Path of a position database (see `jchess.db`) to look positions up in.
+    """
+
+    game = Game(pacing=pacing)
+    try:
+        with ExitStack() as stack:
+            database = stack.enter_context(Database(db)) if db else None
+            display = Display(game, DEFAULT_PALLET, DEFAULT_SYMBOLS, database)
+            with display:
+                asyncio.run(play(game, display, terminal.read_keys()))
+    finally:
+        if pgn:
+            save_game(game, pgn)
+
+
+def run_remote(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    pacing: Pacing = Pacing.REALTIME,
+    pgn: str | None = None,
+) -> None:
+    """Join a game hosted by `jchess serve`, then play it as `run` does.
+
+    :param host: Host of the server.
+    :param port: Port of the server.
+    :param pacing: How quickly bots act.
+    :param pgn: Path of a PGN file to append the game to, when it's left.
+    """
+    asyncio.run(_run_remote(host, port, pacing, pgn))
+
 
+async def _run_remote(host: str, port: int, pacing: Pacing, pgn: str | None) -> None:
+    print(f"Waiting for an opponent on {host}:{port}...")
+    client = await Client.join(host, port)
+    game = Game(pacing=pacing)
+    game.play_remotely(client.player)
+    try:
+        with Display(game, DEFAULT_PALLET, DEFAULT_SYMBOLS) as display:
+            await play(game, display, terminal.read_keys(), client)
+    finally:
+        await client.close()
+        if pgn:
+            save_game(game, pgn)
 
-def run() -> None:
-    """Entry point to begin game - game state then visuals updated with each input."""
 
-    game = Game()
-    with Display(game, DEFAULT_PALLET, DEFAULT_SYMBOLS) as display:
+def save_game(game: Game, path: str) -> None:
+    """Append `game` to the PGN file at `path`, unless no move was made."""
+    if game.board.history:
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(export(game) + "\n")
+
+
+async def play(
+    game: Game,
+    display: Display,
+    keys: AsyncIterator[str],
+    client: Client | None = None,
+) -> None:
+    """Update `game` with each key & bot action, until `ExitGame` is raised.
+
+    Bots choose their actions in another thread, so keys (escape, at least) are acted on
+    while they think; `display` is refreshed separately, at most `FRAME_RATE` times a
+    second.
+
+    :param game: Game to play.
+    :param display: Display to show the game on.
+    :param keys: Keystrokes of the user, as from `terminal.get_input`.
+    :param client: Connection to the opponent, if the game is remote.
+    """
+    loop = asyncio.get_running_loop()
+    opponent = _remote_actions(game, client) if client else None
+    changed = asyncio.Event()
+    render = asyncio.create_task(_render(display, changed))
+    key: asyncio.Future[str] | None = None
+    bot: asyncio.Future[Action] | None = None
+    changed.set()  # show the start menu
+
+    try:
         while True:
-            display.refresh()
-            game.evolve_state()
+            lookup = game.key_lookup()
+            if lookup is None and bot is None:
+                bot = (
+                    asyncio.ensure_future(anext(opponent))
+                    if opponent
+                    else loop.run_in_executor(None, next, game.bot_action)
+                )
+            if key is None:
+                key = asyncio.ensure_future(anext(keys))
+            pending = [future for future in (key, bot) if future]
+            await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+
+            if key.done():
+                action = to_action(key.result(), lookup or {})  # bots ignore keys
+                key = None
+                if lookup is not None:
+                    ply = game.board.ply
+                    game.apply_action(action)
+                    if client and game.board.ply > ply:
+                        undo = game.board.history[-1]
+                        client.send_move(Move(undo.src, undo.dst, undo.promote_to))
+            elif bot and bot.done():
+                game.apply_action(bot.result())
+                bot = None
+            changed.set()
+    finally:
+        render.cancel()
+        if key:
+            key.cancel()
+        if bot:
+            bot.cancel()
+            game.searcher.stop()  # rather than wait for its move when exiting
+
+
+async def _remote_actions(game: Game, client: Client) -> AsyncIterator[Action]:
+    """Actions making each move of the remote opponent, as they're received."""
+    async for move in client.moves():
+        for action in game.move_actions(move, Pacing.INSTANT):
+            yield action
+    yield Action.FORFEIT  # they left (a game which ended is already over)
+
+
+async def _render(display: Display, changed: asyncio.Event) -> None:
+    """Refresh `display` when the game has changed, at most `FRAME_RATE` per second."""
+    while True:
+        await changed.wait()
+        changed.clear()
+        display.refresh()
+        await asyncio.sleep(1 / FRAME_RATE)
+
+
+def perft(board: Board, depth: int, *, divide: bool = False) -> None:
+    """Print the perft count of a position & how quickly it was found.
+
+    :param board: Position to count from.
+    :param depth: Number of plies to count to.
+    :param divide: If set, also print the count after each first move.
+    """
+    start = perf_counter()
+    if divide:
+        counts = board.divide(depth)
+        for move, count in sorted(counts.items(), key=lambda item: str(item[0])):
+            print(f"{move}: {count}")
+        nodes = sum(counts.values())
+    else:
+        nodes = board.perft(depth)
+    seconds = perf_counter() - start
+
+    print(f"Nodes: {nodes}")
+    print(f"Time: {seconds:.3f}s ({nodes / seconds if seconds else 0:,.0f} nodes/s)")
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    """Host remote games (see `jchess.net`) until interrupted."""
+
+    async def serve_forever() -> None:
+        async with await Server().start(host, port) as server:
+            print(f"Serving games on {host}:{port}")
+            await server.serve_forever()
+
+    asyncio.run(serve_forever())
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command line entry point; plays a game unless a sub-command is given."""
+    parser = ArgumentParser(prog="jchess", description="Play chess in the console.")
+    parser.add_argument(
+        "--pacing",
+        choices=[pacing.value for pacing in Pacing],
+        default=Pacing.REALTIME.value,
+        help="how quickly bots act",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DEFAULT_PATH,
+        default=os.environ.get(PROFILE_ENV),
+        metavar="PATH",
+        help=f"time the hot paths & dump cProfile stats to PATH (or ${PROFILE_ENV})",
+    )
+    parser.add_argument(
+        "--pgn", metavar="PATH", help="append the game played to a PGN file at PATH"
+    )
+    parser.add_argument(
+        "--db", metavar="PATH", help="show the stats of each position found in PATH"
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    perft_parser = commands.add_parser("perft", help="count the positions reachable")
+    perft_parser.add_argument("--depth", type=int, default=3, help="plies to count")
+    perft_parser.add_argument("--fen", default=START_FEN, help="position to count from")
+    perft_parser.add_argument(
+        "--engine",
+        choices=[engine.name.lower() for engine in Engine],
+        default=Engine.BITBOARD.name.lower(),
+        help="move generation engine",
+    )
+    perft_parser.add_argument(
+        "--divide", action="store_true", help="show the count after each first move"
+    )
+
+    selfplay_parser = commands.add_parser("selfplay", help="play headless bot games")
+    selfplay_parser.add_argument("--games", type=int, default=100, help="games to play")
+    selfplay_parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="processes to use"
+    )
+    selfplay_parser.add_argument("--seed", type=int, default=0, help="first seed")
+    for player in ("one", "two"):
+        selfplay_parser.add_argument(
+            f"--{player}",
+            choices=[bot.value for bot in Bot],
+            default=Bot.RANDOM.value,
+            help=f"bot playing as player {player.upper()}",
+        )
+    selfplay_parser.add_argument(
+        "--engine",
+        choices=[engine.name.lower() for engine in Engine],
+        default=Engine.BITBOARD.name.lower(),
+        help="move generation engine",
+    )
+    selfplay_parser.add_argument(
+        "--max-plies", type=int, help="plies before a game is cut short (no limit)"
+    )
+    selfplay_parser.add_argument(
+        "--nodes", type=int, default=200, help="nodes searched per move by the ai"
+    )
+    selfplay_parser.add_argument(
+        "--record", metavar="PATH", help="write the games to a binary record at PATH"
+    )
+
+    db_parser = commands.add_parser("db", help="build a database of positions")
+    db_parser.add_argument("path", help="where to write the database")
+    db_parser.add_argument(
+        "--record", nargs="+", default=[], help="binary records of games to add"
+    )
+    db_parser.add_argument("--pgn", nargs="+", default=[], help="PGN files to add")
+
+    net_parsers = {
+        name: commands.add_parser(name, help=text)
+        for name, text in [
+            ("serve", "host remote games"),
+            ("connect", "join a remote game"),
+            ("load", "load test a server with games of random moves"),
+        ]
+    }
+    for net_parser in net_parsers.values():
+        net_parser.add_argument("--host", default=DEFAULT_HOST, help="server host")
+        net_parser.add_argument(
+            "--port", type=int, default=DEFAULT_PORT, help="server port"
+        )
+    load_parser = net_parsers["load"]
+    load_parser.add_argument("--games", type=int, default=1000, help="games to play")
+    load_parser.add_argument(
+        "--plies", type=int, help="plies before leaving a game (no limit)"
+    )
+    load_parser.add_argument("--seed", type=int, default=0, help="first seed")
+
+    args = parser.parse_args(argv)
+    with session(args.profile) if args.profile else nullcontext():
+        _run_command(parser, args)
+
+
+def _run_command(parser: ArgumentParser, args: Namespace) -> None:
+    if args.command == "perft":
+        if args.depth < 1:
+            parser.error("--depth should be at least 1")
+        try:
+            board = Board.from_fen(args.fen, engine=Engine[args.engine.upper()])
+        except ValueError as exc:
+            parser.error(str(exc))
+        perft(board, args.depth, divide=args.divide)
+    elif args.command == "selfplay":
+        if args.games < 1 or args.workers < 1:
+            parser.error("--games & --workers should be at least 1")
+        settings = Settings(
+            bots=(Bot(args.one), Bot(args.two)),
+            engine=Engine[args.engine.upper()],
+            max_plies=args.max_plies,
+            nodes=args.nodes,
+        )
+        with ExitStack() as stack:
+            record = (
+                stack.enter_context(open(args.record, "wb")) if args.record else None
+            )
+            summary = play_games(
+                args.games,
+                workers=args.workers,
+                seed=args.seed,
+                settings=settings,
+                record=record,
+            )
+        print(summary)
+    elif args.command == "db":
+        start = perf_counter()
+        positions = build(args.path, records=args.record, pgns=args.pgn)
+        print(f"Positions: {positions} in {perf_counter() - start:.2f}s")
+    elif args.command == "serve":
+        serve(args.host, args.port)
+    elif args.command == "connect":
+        run_remote(args.host, args.port, Pacing(args.pacing), args.pgn)
+    elif args.command == "load":
+        if args.games < 1:
+            parser.error("--games should be at least 1")
+        games = load(
+            args.games, plies=args.plies, seed=args.seed, host=args.host, port=args.port
+        )
+        print(asyncio.run(games))
+    else:
+        run(Pacing(args.pacing), args.pgn, args.db)
@@ -0,0 +1,308 @@
+"""Alpha-beta search used by the "Versus AI" bot.
+
+`Searcher.search` runs an iterative deepening negamax search with alpha-beta pruning
+(plus a quiescence search over captures so positions are only evaluated once they are
+quiet). Moves are ordered by the transposition table's best move, then by captures
+(most valuable victim, least valuable attacker).
+
+The search stops as soon as it's `Budget` runs out, returning the best move of the
+deepest fully searched iteration, so a caller can bound how long the UI is blocked.
+"""
+
+from dataclasses import dataclass
+from enum import Enum, auto
+from threading import Event
+from time import perf_counter
+
+from jchess.board import Board, Engine, Move, Setup
+from jchess.pieces import Role
+
+MATE = 100_000  # score of a checkmate, less the number of plies needed to deliver it
+INFINITY = MATE + 1
+MAX_DEPTH = 64
+MOBILITY_WEIGHT = 5  # per legal target, compared to 100 per point of material
+
+
+@dataclass(slots=True, frozen=True)
+class Budget:
+    """Limits on a single search; `None` disables a limit."""
+
+    seconds: float | None = 1.0
+    nodes: int | None = None
+    depth: int = MAX_DEPTH
+
+
+@dataclass(slots=True, frozen=True)
+class SearchResult:
+    move: Move | None
+    score: int
+    depth: int
+    nodes: int
+    seconds: float
+
+    @property
+    def nps(self) -> float:
+        """Nodes searched per second."""
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+class Bound(Enum):
+    """How a stored score relates to the true score of the position."""
+
+    EXACT = auto()
+    LOWER = auto()  # search failed high; true score >= stored score
+    UPPER = auto()  # search failed low; true score <= stored score
+
+
+@dataclass(slots=True)
+class Entry:
+    key: int
+    depth: int
+    score: int
+    bound: Bound
+    move: Move | None
+    generation: int = 0  # set by `TranspositionTable.store`
+
+
+class TranspositionTable:
+    """Fixed size hash table of search results, indexed by zobrist key.
+
+    Each key maps to a single slot. A slot is overwritten unless it holds a deeper
+    result from the current search (results from previous searches are always replaced)
+    so memory use never grows and the most useful entries are kept.
+    """
+
+    def __init__(self, size: int = 1 << 16) -> None:
+        if size <= 0 or size & (size - 1):
+            raise ValueError(f"Table size must be a power of 2 ({size=}).")
+        self.entries: list[Entry | None] = [None] * size
+        self.mask = size - 1
+        self.generation = 0
+
+    def new_search(self) -> None:
+        self.generation += 1
+
+    def probe(self, key: int) -> Entry | None:
+        entry = self.entries[key & self.mask]
+        return entry if entry and entry.key == key else None
+
+    def store(self, entry: Entry) -> None:
+        index = entry.key & self.mask
+        old = self.entries[index]
+        if (
+            old is None
+            or old.key == entry.key
+            or old.generation != self.generation
+            or entry.depth >= old.depth
+        ):
+            entry.generation = self.generation
+            self.entries[index] = entry
+
+
+class OutOfBudget(Exception):
+    """Raised within a search to unwind it once the budget is spent."""
+
+
+def legal_moves(board: Board) -> list[Move]:
+    """Every legal move of the active player; pawns only ever promote to queens."""
+    return [m for m in board.legal_moves() if m.promote_to in (None, Role.QUEEN)]
+
+
+def capture_value(board: Board, move: Move) -> int:
+    """Ordering score of a move; zero unless it's a capture or a promotion."""
+    attacker = board[move.src]
+    assert attacker, f"Only call if there is a piece at {move.src=}"
+    victim = board[move.dst]
+    if victim:
+        value = 10 * victim.role.worth - attacker.role.worth
+    elif attacker.role is Role.PAWN and move.src.x != move.dst.x:
+        value = 10 * Role.PAWN.worth - Role.PAWN.worth  # en passant
+    else:
+        value = 0
+    return value + (10 * Role.QUEEN.worth if move.promote_to else 0)
+
+
+def evaluate(board: Board) -> int:
+    """Score the board from the perspective of the active player."""
+    score = 0
+    for coord, piece in board.items():
+        if piece and piece.role is not Role.KING:
+            value = 100 * piece.role.worth + MOBILITY_WEIGHT * len(
+                board.targets_of[coord]
+            )
+            score += value if piece.player is board.active_player else -value
+    return score
+
+
+class Searcher:
+    """Searches for the best move, keeping it's transposition table between searches."""
+
+    def __init__(self, budget: Budget = Budget(), table_size: int = 1 << 16) -> None:
+        self.budget = budget
+        self.table = TranspositionTable(table_size)
+        self.result: SearchResult | None = None  # of the latest search
+        self.board = Board()
+        self.root_ply = 0
+        self.nodes = 0
+        self.deadline: float | None = None
+        self.max_nodes: int | None = None
+        self.stopped = Event()  # see `stop`
+
+    def search(self, board: Board, budget: Budget | None = None) -> SearchResult:
+        """Find the best move for the active player of `board` (which is unchanged).
+
+        :param board: Position to search.
+        :param budget: Limits on time, nodes & depth (defaults to `self.budget`).
+        :return: Best move found (`None` if there are no legal moves) & statistics.
+        """
+        start = perf_counter()
+        budget = budget or self.budget
+        # the search plays moves on it's own copy of the position (not the history)
+        setup = Setup(dict(board), board.passant, board.ply, board.halfmove)
+        self.board = Board(setup, engine=Engine.BITBOARD)
+        self.root_ply = board.ply
+        self.nodes = 0
+        self.deadline = None if budget.seconds is None else start + budget.seconds
+        self.max_nodes = budget.nodes
+        self.table.new_search()
+
+        moves = self.__ordered(legal_moves(self.board), None)
+        best = moves[0] if moves else None
+        score, depth = evaluate(self.board), 0
+        for iteration in range(1, budget.depth + 1):
+            if not moves:
+                break
+            try:
+                score, best = self.__root(moves, iteration)
+            except OutOfBudget:
+                break
+            depth = iteration
+            # search the previous best move first in the next iteration
+            moves.remove(best)
+            moves.insert(0, best)
+            if abs(score) >= MATE - MAX_DEPTH:
+                break
+
+        self.result = SearchResult(
+            best, score, depth, self.nodes, perf_counter() - start
+        )
+        return self.result
+
+    def stop(self) -> None:
+        """Make the search in progress (in another thread) & any later ones return asap.
+
+        Unlike the budget, this isn't reset by `search`, so it can't be missed by a
+        thread which has yet to start searching.
+        """
+        self.stopped.set()
+
+    # Helper methods for `Searcher.search` ------------------------------------------- #
+
+    def __root(self, moves: list[Move], depth: int) -> tuple[int, Move]:
+        alpha, best = -INFINITY, moves[0]
+        for move in moves:
+            score = -self.__visit(move, depth - 1, -INFINITY, -alpha)
+            if score > alpha:
+                alpha, best = score, move
+        self.table.store(Entry(self.board.key, depth, alpha, Bound.EXACT, best))
+        return alpha, best
+
+    def __visit(self, move: Move, depth: int, alpha: int, beta: int) -> int:
+        """Score `move` by playing it, searching the resulting position & undoing it."""
+        self.board.make_move(move.src, move.dst, promote_to=move.promote_to)
+        try:
+            if depth > 0:
+                return self.__negamax(depth, alpha, beta)
+            return self.__quiesce(alpha, beta)
+        finally:
+            self.board.unmake_move()
+
+    def __negamax(self, depth: int, alpha: int, beta: int) -> int:
+        self.__count_node()
+        board = self.board
+        ply = board.ply - self.root_ply
+        entry = self.table.probe(board.key)
+        if entry and entry.depth >= depth:
+            score = entry.score
+            if score >= MATE - MAX_DEPTH:
+                score -= ply
+            elif score <= -(MATE - MAX_DEPTH):
+                score += ply
+            if (
+                entry.bound is Bound.EXACT
+                or (entry.bound is Bound.LOWER and score >= beta)
+                or (entry.bound is Bound.UPPER and score <= alpha)
+            ):
+                return score
+
+        moves = legal_moves(board)
+        if not moves:
+            return -(MATE - ply) if board.in_check() else 0
+
+        alpha_orig, best_score, best_move = alpha, -INFINITY, None
+        for move in self.__ordered(moves, entry.move if entry else None):
+            score = -self.__visit(move, depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score >= beta:
+            bound = Bound.LOWER
+        elif best_score <= alpha_orig:
+            bound = Bound.UPPER
+        else:
+            bound = Bound.EXACT
+        # mate scores are stored relative to this position rather than the root
+        stored = best_score
+        if stored >= MATE - MAX_DEPTH:
+            stored += ply
+        elif stored <= -(MATE - MAX_DEPTH):
+            stored -= ply
+        self.table.store(Entry(board.key, depth, stored, bound, best_move))
+        return best_score
+
+    def __quiesce(self, alpha: int, beta: int) -> int:
+        """Search captures only, so the evaluated positions are quiet."""
+        self.__count_node()
+        board = self.board
+        ply = board.ply - self.root_ply
+        moves = legal_moves(board)
+        if not moves:
+            return -(MATE - ply) if board.in_check() else 0
+
+        stand_pat = evaluate(board)
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        captures = [m for m in moves if capture_value(board, m) > 0]
+        for move in sorted(captures, key=lambda m: -capture_value(board, m)):
+            self.board.make_move(move.src, move.dst, promote_to=move.promote_to)
+            try:
+                score = -self.__quiesce(-beta, -alpha)
+            finally:
+                self.board.unmake_move()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def __ordered(self, moves: list[Move], first: Move | None) -> list[Move]:
+        board = self.board
+        ordered = sorted(moves, key=lambda m: -capture_value(board, m))
+        # the stored move may not be legal here if two positions share a key
+        if first is not None and first in ordered:
+            ordered.remove(first)
+            ordered.insert(0, first)
+        return ordered
+
+    def __count_node(self) -> None:
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise OutOfBudget
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise OutOfBudget
+        if self.stopped.is_set():
+            raise OutOfBudget
@@ -0,0 +1,178 @@
+"""Headless bot-vs-bot games, played directly on a `Board` & spread across processes.
+
+Unlike `Mode.TDB` there is no `Display`, no cursor to steer and no sleeping, so many
+games can be played quickly for soak testing or to compare bots & engines. Each game is
+seeded, so any interesting game can be replayed exactly.
+"""
+
+import random
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from io import BytesIO
+from itertools import repeat
+from time import perf_counter
+from typing import BinaryIO
+
+from jchess.board import PROMOTION_ROLES, Board, Ending, Engine, Move
+from jchess.pieces import Player, Role
+from jchess.record import RecordWriter
+from jchess.search import Budget, Searcher
+
+
+class Bot(Enum):
+    """How a player chooses it's moves."""
+
+    RANDOM = "random"  # as the "dumb bot" of `Game`
+    AI = "ai"  # as the AI of `Game`, but limited by nodes so games are reproducible
+
+
+class Outcome(Enum):
+    ONE_WINS = "Player ONE wins"
+    TWO_WINS = "Player TWO wins"
+    STALEMATE = "Stalemate"
+    REPETITION = "Repetition"
+    FIFTY_MOVES = "Fifty moves"
+    PLY_LIMIT = "Ply limit"
+
+
+DRAWS = {
+    Ending.STALEMATE: Outcome.STALEMATE,
+    Ending.REPETITION: Outcome.REPETITION,
+    Ending.FIFTY_MOVES: Outcome.FIFTY_MOVES,
+}
+
+
+@dataclass(slots=True, frozen=True)
+class Settings:
+    """Everything (except the seed) which determines how a game is played."""
+
+    bots: tuple[Bot, Bot] = (Bot.RANDOM, Bot.RANDOM)
+    engine: Engine = Engine.BITBOARD
+    max_plies: int | None = None  # games are otherwise bounded by the drawing rules
+    nodes: int = 200  # budget for each move of `Bot.AI`
+    record: bool = False  # keep the moves of each game, packed as by `jchess.record`
+
+
+@dataclass(slots=True, frozen=True)
+class GameResult:
+    seed: int
+    outcome: Outcome
+    plies: int
+    record: bytes = b""  # if `Settings.record` is set
+
+
+@dataclass(slots=True)
+class Summary:
+    """Aggregated results of many games."""
+
+    outcomes: Counter[Outcome] = field(default_factory=Counter)
+    games: int = 0
+    plies: int = 0
+    seconds: float = 0.0
+
+    def add(self, result: GameResult) -> None:
+        self.outcomes[result.outcome] += 1
+        self.games += 1
+        self.plies += result.plies
+
+    @property
+    def average_plies(self) -> float:
+        return self.plies / self.games if self.games else 0.0
+
+    def __str__(self) -> str:
+        lines = [f"Games: {self.games} in {self.seconds:.2f}s"]
+        for outcome in Outcome:
+            lines.append(f"  {outcome.value + ':':<16} {self.outcomes[outcome]}")
+        lines.append(f"Average plies: {self.average_plies:.1f}")
+        return "\n".join(lines)
+
+
+def random_move(board: Board, rng: random.Random) -> Move:
+    """Choose a move the same way as the "dumb bot" of `Game`."""
+    src = rng.choice(board.movable_squares())
+    dst = rng.choice(list(board.targets_of[src]))
+    piece = board[src]
+    promotes = piece and piece.role is Role.PAWN and dst.y in (0, 7)
+    return Move(src, dst, rng.choice(PROMOTION_ROLES) if promotes else None)
+
+
+def play_game(seed: int, settings: Settings = Settings()) -> GameResult:
+    """Play a single game to it's end (or the ply limit, if any).
+
+    :param seed: Seeds the random choices of the bots.
+    :param settings: Bots, engine & limits of the game.
+    :return: How the game ended.
+    """
+    rng = random.Random(seed)
+    board = Board(engine=settings.engine)
+    searcher = Searcher(Budget(seconds=None, nodes=settings.nodes))
+
+    buffer = BytesIO()
+    writer = RecordWriter(buffer)
+    if settings.record:
+        writer.attach(board)
+
+    ending = board.ending()
+    while not ending and (settings.max_plies is None or board.ply < settings.max_plies):
+        if settings.bots[board.ply % 2] is Bot.AI:
+            move = searcher.search(board).move
+            assert move, "The active player can move."
+        else:
+            move = random_move(board, rng)
+        board.process_move(move.src, move.dst, promote_to=move.promote_to)
+        ending = board.ending()
+    writer.end_game()
+
+    if ending is None:
+        outcome = Outcome.PLY_LIMIT
+    elif ending is not Ending.CHECKMATE:
+        outcome = DRAWS[ending]
+    elif board.active_player is Player.ONE:
+        outcome = Outcome.TWO_WINS
+    else:
+        outcome = Outcome.ONE_WINS
+    return GameResult(seed, outcome, board.ply, buffer.getvalue())
+
+
+def play_games(
+    games: int,
+    *,
+    workers: int = 1,
+    seed: int = 0,
+    settings: Settings = Settings(),
+    record: BinaryIO | None = None,
+) -> Summary:
+    """Play many games, spread across `workers` processes.
+
+    :param games: Number of games to play; the n-th game is seeded by `seed + n`.
+    :param workers: Number of processes to use (1 plays every game in this process).
+    :param seed: Seed of the first game.
+    :param settings: Bots, engine & limits of every game.
+    :param record: Binary file to write the games to (see `jchess.record`), in order.
+    :return: Aggregated results of the games.
+    """
+    start = perf_counter()
+    summary = Summary()
+    seeds = range(seed, seed + games)
+    if record:
+        settings = replace(settings, record=True)
+    results: Iterator[GameResult]
+    with ExitStack() as stack:
+        if workers == 1:
+            results = map(play_game, seeds, repeat(settings))
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            chunksize = max(1, games // (4 * workers))
+            results = pool.map(
+                play_game, seeds, [settings] * games, chunksize=chunksize
+            )
+        for result in results:
+            summary.add(result)
+            if record:
+                record.write(result.record)
+    summary.seconds = perf_counter() - start
+    return summary
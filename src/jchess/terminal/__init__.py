@@ -4,15 +4,34 @@ Designed to abstract away all os/terminal dependencies from the rest of the code
 including the collection of player input.
 """
 import sys
+from functools import lru_cache
 
 from colorama import Style
 
 from jchess.geometry import V
 
+from ._writer import CSI, RESET_CURSOR, STDOUT, Writer, write_all
+
 if sys.platform == "win32":
-    from ._windows import clear, get_input, hide_cursor, resize, show_cursor
+    from ._windows import (
+        clear,
+        get_input,
+        hide_cursor,
+        raw_mode,
+        read_keys,
+        resize,
+        show_cursor,
+    )
 else:
-    from ._linux import clear, get_input, hide_cursor, resize, show_cursor
+    from ._linux import (
+        clear,
+        get_input,
+        hide_cursor,
+        raw_mode,
+        read_keys,
+        resize,
+        show_cursor,
+    )
 
 __all__ = [
     "clear",
@@ -22,19 +41,24 @@ __all__ = [
     "ctrlseq",
     "reset_cursor",
     "get_input",
+    "raw_mode",
+    "read_keys",
+    "Writer",
+    "CSI",
 ]
 
-CSI = "\x1b["
+CTRLSEQ_CACHE_SIZE = 1024
 
 
 def reset_cursor() -> None:
-    print(f"{CSI}H", end="")
+    write_all(STDOUT, RESET_CURSOR.encode())
 
 
+@lru_cache(maxsize=CTRLSEQ_CACHE_SIZE)
 def ctrlseq(
     s: str, *, clr: str = "", at: tuple[int, int] | V, edge: bool = False
 ) -> str:
-    """Convert a string to a control sequence."""
+    """Convert a string to a control sequence; memoised, as most are static panels."""
     lines = s.split("\n")
     w, h = len(lines[0]), len(lines)
     x, y = at
@@ -4,87 +4,199 @@ import sys
 
 assert sys.platform != "win32"
 
+import asyncio
 import os
-from termios import TCSADRAIN, tcgetattr, tcsetattr  # pylint: disable=import-error
-from tty import setraw
+from codecs import getincrementaldecoder
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from functools import cache
+from select import select
+
+# pylint: disable-next=import-error
+from termios import ISIG, TCSADRAIN, TCSANOW, tcgetattr, tcsetattr
+from tty import LFLAG, setraw
+from typing import Any
+
+from ._writer import CLEAR, CSI, HIDE_CURSOR, SHOW_CURSOR, STDOUT, write_all
 
 ESC = "\x1b"
-CSI = "\x1b["
+SS3 = "\x1bO"
+ESC_TIMEOUT = 0.05  # seconds to wait for the rest of a sequence after an escape
+READ_SIZE = 1024
+
+KEYS = {
+    # direction keys in vscode
+    "\x00H": "UP",
+    "\x00P": "DOWN",
+    "\x00M": "RIGHT",
+    "\x00K": "LEFT",
+    # direction keys in usual console, in both normal & application cursor mode
+    CSI + "A": "UP",
+    CSI + "B": "DOWN",
+    CSI + "C": "RIGHT",
+    CSI + "D": "LEFT",
+    SS3 + "A": "UP",
+    SS3 + "B": "DOWN",
+    SS3 + "C": "RIGHT",
+    SS3 + "D": "LEFT",
+    SS3 + "P": "F1",
+    CSI + "11~": "F1",
+    CSI + "24~": "F12",
+}
 
 
 def clear() -> None:
-    os.system("clear")
+    write_all(STDOUT, CLEAR.encode())
 
 
 def resize(w: int, h: int) -> None:
-    print(f"{CSI}8;{h};{w}t")
-
-
-def reset_cursor() -> None:
-    print(CSI + "H")
+    write_all(STDOUT, f"{CSI}8;{h};{w}t".encode())
 
 
 def show_cursor() -> None:
-    print(CSI + "?25h", end="")
+    write_all(STDOUT, SHOW_CURSOR.encode())
 
 
 def hide_cursor() -> None:
-    print(CSI + "?25l", end="")
-
-
-def getch() -> str:
-    """Get a single character string from the user - linux-compatible version."""
-    # taken from https://stackoverflow.com/questions/71548267/
-
-    sys.stdout.flush()
-    ch = ""
-    fd = sys.stdin.fileno()
-    old_settings = tcgetattr(fd)
-    try:
-        setraw(sys.stdin.fileno())
-        ch = sys.stdin.read(1)
-    finally:
-        tcsetattr(fd, TCSADRAIN, old_settings)
-    return ch
+    write_all(STDOUT, HIDE_CURSOR.encode())
+
+
+def parse_key(buffer: str, *, final: bool) -> tuple[str, str] | None:
+    """Split the first keystroke from `buffer`, returning it & the rest of `buffer`.
+
+    Returns `None` if `buffer` may hold only the start of a sequence, unless `final` is
+    set (no more input arrived in time), in which case a leading escape is taken alone.
+    Unrecognised sequences are returned as they are.
+    """
+    if not buffer:
+        return None
+    n = len(buffer)
+    key: str | None = None  # unless the key is named by the sequence it's split from
+
+    if buffer[0] == "\x00":
+        end = 2
+    elif buffer[0] != ESC:
+        end = 1
+    elif buffer.startswith(ESC + ESC) and n > 2 and buffer[2] in "[O":
+        # an escape prefixing a sequence, eg alt + arrow
+        inner = parse_key(buffer[1:], final=final)
+        end = n + 1 if inner is None else n - len(inner[1])
+    elif buffer.startswith(ESC + ESC):
+        end = 2 if n > 2 else 3  # a double tapped escape, unless a sequence follows
+        key = ESC
+    elif buffer.startswith(SS3):
+        end = 3
+    elif buffer.startswith(CSI):
+        # parameters & intermediates are followed by a final char in "@" to "~"
+        end = next((i + 1 for i in range(2, n) if "@" <= buffer[i] <= "~"), n + 1)
+    else:
+        end = 2  # eg alt + key
+
+    if end > n:
+        return (buffer[0], buffer[1:]) if final else None
+    named = KEYS.get(buffer[:end], buffer[:end])
+    return key or named, buffer[end:]
+
+
+class KeyReader:
+    """Reads keystrokes from a terminal, which is kept in raw mode while entered.
+
+    Everything available is read at once, so the rest of an escape sequence (or any
+    keys typed ahead) is parsed from the buffer rather than read separately.
+    """
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.buffer = ""
+        self.decoder = getincrementaldecoder("utf-8")(errors="replace")
+        self.depth = 0  # of nested `with` blocks
+        self.settings: list[Any] = []  # of the terminal before entering raw mode
+
+    def __enter__(self) -> "KeyReader":
+        if self.depth == 0:
+            self.settings = tcgetattr(self.fd)
+            setraw(self.fd)
+            # but keep CTRL+C (etc) as signals, so bots can be interrupted
+            attributes = tcgetattr(self.fd)
+            attributes[LFLAG] |= ISIG
+            tcsetattr(self.fd, TCSANOW, attributes)
+        self.depth += 1
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.depth -= 1
+        if self.depth == 0:
+            tcsetattr(self.fd, TCSADRAIN, self.settings)
+
+    def pop_key(self, *, final: bool = False) -> str | None:
+        """Take the first keystroke from the buffer (see `parse_key`), if it's whole."""
+        if (parsed := parse_key(self.buffer, final=final)) is None:
+            return None
+        key, self.buffer = parsed
+        return key
+
+    def fill(self) -> bool:
+        """Add the available input to the buffer; `False` at the end of input."""
+        data = os.read(self.fd, READ_SIZE)
+        self.buffer += self.decoder.decode(data)
+        return bool(data)
+
+    def read_key(self) -> str:
+        """Wait for the next keystroke; the end of input is read as escape."""
+        while (key := self.pop_key()) is None:
+            # wait briefly for the rest of a sequence, or indefinitely for a new key
+            timeout = ESC_TIMEOUT if self.buffer else None
+            if not select([self.fd], [], [], timeout)[0]:
+                return self.pop_key(final=True) or ESC
+            if not self.fill():
+                return ESC
+        return key
+
+    async def read_keys(self) -> AsyncIterator[str]:
+        """As `read_key`, but waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        loop.add_reader(self.fd, readable.set)
+        try:
+            while True:
+                while (key := self.pop_key()) is None:
+                    readable.clear()
+                    timeout = ESC_TIMEOUT if self.buffer else None
+                    try:
+                        await asyncio.wait_for(readable.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        key = self.pop_key(final=True) or ESC
+                        break
+                    if not select([self.fd], [], [], 0)[0]:
+                        continue  # woken for input which `fill` has already read
+                    if not self.fill():
+                        key = ESC
+                        break
+                yield key
+        finally:
+            loop.remove_reader(self.fd)
+
+
+@cache
+def key_reader() -> KeyReader:
+    return KeyReader(sys.stdin.fileno())
+
+
+@contextmanager
+def raw_mode() -> Iterator[None]:
+    """Keep the terminal in raw mode, rather than entering it for each keystroke."""
+    with key_reader():
+        yield
+
+
+async def read_keys() -> AsyncIterator[str]:
+    """Yield keystrokes as they're typed; the terminal should be in `raw_mode`."""
+    async for key in key_reader().read_keys():
+        yield key
 
 
 def get_input() -> str:
     """Convert keystroke into a game action - linux-compatible version."""
-    # only checked to work with keystrokes repr by 1 char, and the direction arrows
-
-    user_input = getch()
-
-    # Direction keys in vscode
-    if user_input == "\x00":
-        return {
-            "H": "UP",
-            "P": "DOWN",
-            "M": "RIGHT",
-            "K": "LEFT",
-        }[getch()]
-
-    if user_input != ESC:
-        return user_input
-
-    next_part = getch()
-
-    # double tapped escape (this is why escape must be hit twice on linux)
-    if next_part == ESC:
-        return ESC
-
-    final_part = getch()
-
-    if user_input + next_part + final_part == ESC + "OP":
-        return "F1"
-
-    # Direction keys in usual console
-    if user_input + next_part == CSI:
-        return {
-            "A": "UP",
-            "B": "DOWN",
-            "C": "RIGHT",
-            "D": "LEFT",
-            "2": "F12",
-        }[final_part]
-
-    raise RuntimeError(f"Unrecognized input: {user_input + next_part + final_part}")
+    sys.stdout.flush()
+    with key_reader() as reader:
+        return reader.read_key()
@@ -4,9 +4,13 @@ import sys
 
 assert sys.platform == "win32"
 
+import asyncio
 import ctypes
 import os
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
 from msvcrt import getch
+from threading import Thread
 
 KERNEL32 = ctypes.windll.kernel32
 
@@ -42,6 +46,12 @@ def hide_cursor() -> None:
     _show_cursor(False)
 
 
+@contextmanager
+def raw_mode() -> Iterator[None]:
+    """Nothing to do, as `getch` reads the console unbuffered anyway."""
+    yield
+
+
 def get_input() -> str:
     """Convert keystroke into a char - windows-compatible version."""
     # only checked to work with keystrokes represented by 1 char and a few others
@@ -61,3 +71,21 @@ def get_input() -> str:
 
     # Anything else is assumed to be a represented by a single decodable char
     return user_input.decode()
+
+
+async def read_keys() -> AsyncIterator[str]:
+    """Yield keystrokes as they're typed, as read by `get_input` in another thread."""
+    loop = asyncio.get_running_loop()
+    keys: asyncio.Queue[str] = asyncio.Queue()
+
+    def read() -> None:
+        try:
+            while True:
+                loop.call_soon_threadsafe(keys.put_nowait, get_input())
+        except RuntimeError:
+            pass  # the loop has closed
+
+    # a daemon, so it can be left waiting for a key once the game is over
+    Thread(target=read, daemon=True).start()
+    while True:
+        yield await keys.get()
@@ -0,0 +1,69 @@
+"""Buffered terminal output, written to the terminal with a single system call."""
+
+import os
+import sys
+
+from jchess.profiling import PROFILER
+
+CSI = "\x1b["
+STDOUT = 1  # the fd of the terminal, regardless of any `sys.stdout` redirection
+
+CLEAR = CSI + "2J" + CSI + "H"
+RESET_CURSOR = CSI + "H"
+SHOW_CURSOR = CSI + "?25h"
+HIDE_CURSOR = CSI + "?25l"
+
+
+def write_all(fd: int, data: bytes) -> None:
+    """Write all of `data` to `fd`; a terminal may accept only part of it per call."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+class Writer:
+    """Accumulates text & control sequences until `flush` writes them all at once.
+
+    Unlike `print`, nothing reaches the terminal mid-frame, so each frame costs one
+    round trip over a remote terminal.
+    """
+
+    def __init__(self, fd: int = STDOUT) -> None:
+        self.fd = fd
+        self.parts: list[str] = []
+        self.flushes = 0  # only those which wrote anything
+
+    def write(self, s: str) -> None:
+        self.parts.append(s)
+
+    def clear(self) -> None:
+        self.write(CLEAR)
+
+    def reset_cursor(self) -> None:
+        self.write(RESET_CURSOR)
+
+    def show_cursor(self) -> None:
+        self.write(SHOW_CURSOR)
+
+    def hide_cursor(self) -> None:
+        self.write(HIDE_CURSOR)
+
+    def resize(self, w: int, h: int) -> None:
+        if sys.platform == "win32":
+            # the windows console ignores the control sequence
+            from ._windows import resize  # pylint: disable=import-outside-toplevel
+
+            self.flush()
+            resize(w, h)
+        else:
+            self.write(f"{CSI}8;{h};{w}t")
+
+    def flush(self) -> int:
+        """Write everything accumulated so far, returning the number of bytes."""
+        data = "".join(self.parts).encode()
+        self.parts.clear()
+        if data:
+            write_all(self.fd, data)
+            self.flushes += 1
+            PROFILER.add("Writer.flush bytes", len(data))
+        return len(data)
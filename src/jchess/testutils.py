@@ -4,6 +4,8 @@
 import csv
 import functools
 import re
+from collections.abc import Mapping
+from copy import deepcopy
 from itertools import product
 from pathlib import Path
 from typing import Any, Callable
@@ -11,7 +13,7 @@ from unittest.mock import Mock, patch
 
 import jchess.game
 from jchess.action import Action
-from jchess.board import Board
+from jchess.board import Board, Setup
 from jchess.game import Game
 from jchess.geometry import V, VectorSet
 from jchess.pieces import Piece, Player, Role
@@ -73,8 +75,7 @@ def board_from_ssv(path: Path) -> tuple[Board, VectorSet]:
     :return: `Board` described by file & set with vector for each cell marked by 'x'.
     """
 
-    # initializes with pieces in default position, but these are all overridden
-    board = Board()
+    squares: dict[V, Piece | None] = {}
     targets = VectorSet()
 
     with open(path, encoding="utf-8") as csvfh:
@@ -94,7 +95,7 @@ def board_from_ssv(path: Path) -> tuple[Board, VectorSet]:
                     msg = f"Bad vals: {sym=}, {target_flag1=}, {num=}, {target_flag2=}"
                     assert (all(a) and not b) or (not any(a) and b), msg
 
-                board[coord] = (
+                squares[coord] = (
                     Piece(ROLE_LOOKUP[sym], PLAYER_LOOKUP[num], moved == "T")
                     if target_flag1
                     else None
@@ -103,14 +104,13 @@ def board_from_ssv(path: Path) -> tuple[Board, VectorSet]:
                 if "x" in [target_flag1, target_flag2]:
                     targets.add(coord)
 
-    board.update_targets()
-    return board, targets
+    return Board(Setup(squares)), targets
 
 
-def board_to_ssv(board: Board, targets: VectorSet) -> str:
+def board_to_ssv(board: Mapping[V, Piece | None], targets: VectorSet) -> str:
     """Create text for a '.ssv' file.
 
-    :param board: Cells are filled to correspond
+    :param board: Cells are filled to correspond (eg a `Board` or `CompactBoard`)
     :return: Text to fill a '.ssv' file.
     """
     parts = []
@@ -126,3 +126,24 @@ def board_to_ssv(board: Board, targets: VectorSet) -> str:
             parts.append(f"--{flag}--")
         parts.append(" " if coord.x != 7 else "\n")
     return "".join(parts)
+
+
+def exposes_king_by_copy(board: Board, source: V, target: V) -> bool:
+    """Check if a move would leave the mover in check by trying it on a copy.
+
+    This is how `Board` used to exclude risky targets - it is far too slow to use in
+    game but is kept as a simple reference for the pin & check based filtering.
+
+    :param board: Board to try the move on (which is left unchanged).
+    :param source: Coordinate of the piece to move.
+    :param target: Coordinate to move the piece to.
+    :return: True if the player owning the moved piece would be in check.
+    """
+    piece = board[source]
+    assert piece, f"Only call if there is a piece at {source=}"
+
+    board_copy = deepcopy(board)
+    board_copy.protect_king = False
+    board_copy.update_targets()
+    board_copy.process_move(source, target)
+    return board_copy.in_check(piece.player)
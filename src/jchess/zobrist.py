@@ -0,0 +1,71 @@
+"""Zobrist hashing; cheap 64-bit keys identifying a position.
+
+A key is the XOR of a random number for each feature of the position: each piece on
+it's coordinate, the player to move, castling rights and the file of any pawn
+vulnerable to en passant. Since XOR is it's own inverse, a move only needs to XOR out
+the features it removes and XOR in those it adds.
+
+Castling rights are derived from the `moved` flag of each king & rook still on it's
+starting coordinate, so the `moved` flag of other pieces doesn't affect the key.
+"""
+
+import random
+from collections.abc import Mapping
+from itertools import product
+
+from jchess.geometry import V, Vector
+from jchess.pieces import LocPiece, Piece, Player, Role
+
+_RNG = random.Random(0x4A43)  # fixed seed so keys are the same in every process
+
+
+def _rand() -> int:
+    return _RNG.getrandbits(64)
+
+
+PIECE_KEYS = {
+    (role, player): {V(x, y): _rand() for x, y in product(range(8), range(8))}
+    for role, player in product(Role, Player)
+}
+SIDE_KEY = _rand()  # included when `Player.TWO` is to move
+PASSANT_KEYS = tuple(_rand() for _ in range(8))
+
+HOME_ROW = {Player.ONE: 7, Player.TWO: 0}
+# the king & rook coordinates which determine each castling right
+CASTLING_RIGHTS = tuple(
+    (V(4, HOME_ROW[player]), V(x_rook, HOME_ROW[player]), player, _rand())
+    for player, x_rook in product(Player, (0, 7))
+)
+
+
+def piece_key(coord: Vector, piece: Piece | None) -> int:
+    return PIECE_KEYS[piece.role, piece.player][coord] if piece else 0
+
+
+def passant_key(passant: LocPiece | None) -> int:
+    return PASSANT_KEYS[passant.coord.x] if passant else 0
+
+
+def side_key(ply: int) -> int:
+    return SIDE_KEY if ply % 2 else 0
+
+
+def castling_key(squares: Mapping[Vector, Piece | None]) -> int:
+    key = 0
+    for king_coord, rook_coord, player, right_key in CASTLING_RIGHTS:
+        king = Piece(Role.KING, player)
+        rook = Piece(Role.ROOK, player)
+        # unmoved pieces compare equal only if `moved` is False
+        if squares.get(king_coord) == king and squares.get(rook_coord) == rook:
+            key ^= right_key
+    return key
+
+
+def zobrist_key(
+    squares: Mapping[Vector, Piece | None], ply: int, passant: LocPiece | None
+) -> int:
+    """Compute a key from scratch; prefer updating an existing key where possible."""
+    key = side_key(ply) ^ passant_key(passant) ^ castling_key(squares)
+    for coord, piece in squares.items():
+        key ^= piece_key(coord, piece)
+    return key
@@ -0,0 +1,64 @@
+"""Tests for `batch.py`; skipped unless the optional `numpy` dependency is installed."""
+import random
+from pathlib import Path
+
+from pytest import importorskip
+
+from jchess.board import START_FEN, Board
+from jchess.compact import CompactBoard
+from jchess.testutils import board_from_ssv
+
+importorskip("numpy")
+# pylint: disable-next=wrong-import-position
+from jchess.batch import generate_targets  # noqa: E402
+
+DATA_DIR = Path(__file__).parent / "data"
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+FENS = [
+    START_FEN,
+    KIWIPETE,
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "8/8/8/KPp4r/8/8/8/7k w - c6 0 2",  # en passant would expose the king
+]
+
+
+def as_masks(board: Board) -> list[int]:
+    return [sum(1 << (8 * v.y + v.x) for v in board.targets_of[c]) for c in board]
+
+
+def assert_agrees(boards: list[Board]) -> None:
+    result = generate_targets(boards)
+    assert result.shape == (len(boards), 64)
+    for board, masks in zip(boards, result):
+        expected = dict(zip(board, as_masks(board)))
+        assert {c: int(masks[8 * c.y + c.x]) for c in board} == expected
+
+
+def test_positions() -> None:
+    assert_agrees([Board.from_fen(fen) for fen in FENS])
+
+
+def test_random_games() -> None:
+    rng = random.Random(0)
+    boards = []
+    for _ in range(10):
+        board = Board()
+        while (moves := board.legal_moves()) and board.ply < 150:
+            move = rng.choice(moves)
+            board.process_move(move.src, move.dst, promote_to=move.promote_to)
+            boards.append(Board.from_fen(board.to_fen()))
+    assert_agrees(boards)
+
+
+def test_irregular() -> None:
+    # positions without exactly one king per player fall back to the bitboard engine
+    assert_agrees([board_from_ssv(path)[0] for path in DATA_DIR.glob("*.ssv")])
+
+
+def test_compact() -> None:
+    board = Board.from_fen(KIWIPETE)
+    compact = CompactBoard.from_board(board)
+    assert (generate_targets([compact]) == generate_targets([board])).all()
+    assert generate_targets([]).shape == (0, 64)
@@ -0,0 +1,63 @@
+"""Cross-check the bitboard engine against the dict engine of `Board`."""
+import random
+from copy import deepcopy
+from pathlib import Path
+
+from pytest import mark
+
+from jchess.bitboard import bits, slider_attacks, to_vectors
+from jchess.board import Board, Engine
+from jchess.geometry import V
+from jchess.testutils import board_from_ssv
+
+DATA = Path(__file__).parent / "data"
+SSV_PATHS = sorted(DATA.glob("*.ssv"))
+
+
+def bitboard_copy(board: Board) -> Board:
+    board = deepcopy(board)
+    board.engine = Engine.BITBOARD
+    board.update_targets()
+    return board
+
+
+def test_bits() -> None:
+    assert list(bits(0b1010_0001)) == [0, 5, 7]
+    assert to_vectors(1 << 63 | 1 << 8) == {V(7, 7), V(0, 1)}
+
+
+def test_slider_attacks() -> None:
+    # rook on a1 (index 56) blocked on a4 and c1
+    occupied = 1 << 32 | 1 << 58
+    expected = {V(0, 6), V(0, 5), V(0, 4), V(1, 7), V(2, 7)}
+    assert to_vectors(slider_attacks(56, ((1, 0), (0, -1)), occupied)) == expected
+
+
+def test_init() -> None:
+    assert Board(engine=Engine.BITBOARD).targets_of == Board().targets_of
+
+
+@mark.parametrize("path", SSV_PATHS, ids=[p.stem for p in SSV_PATHS])
+def test_ssv_positions(path: Path) -> None:
+    board, _ = board_from_ssv(path)
+    assert bitboard_copy(board).targets_of == board.targets_of
+
+
+def test_stalemate() -> None:
+    board, _ = board_from_ssv(DATA / "stalemate.ssv")
+    board.ply = 11
+    board.update_targets()
+    bboard = bitboard_copy(board)
+    assert bboard.targets_of == board.targets_of
+    assert not bboard.can_move() and not bboard.in_check()
+
+
+def test_random_game() -> None:
+    rng = random.Random(0)
+    board, bboard = Board(), Board(engine=Engine.BITBOARD)
+    for _ in range(12):
+        src = rng.choice([v for v in board if board.can_move_from(v)])
+        dst = rng.choice(sorted(board.targets_of[src], key=tuple))
+        board.process_move(src, dst)
+        bboard.process_move(src, dst)
+        assert bboard.targets_of == board.targets_of
@@ -1,11 +1,28 @@
+import random
+from copy import deepcopy
 from pathlib import Path
 
-from jchess.board import Board
+from pytest import mark, raises
+
+from jchess.board import START_FEN, Board, Ending, Setup, from_algebraic
 from jchess.geometry import V
 from jchess.pieces import Piece, Player, Role
-from jchess.testutils import board_from_ssv
+from jchess.testutils import board_from_ssv, exposes_king_by_copy
 
 DATA = Path(__file__).parent / "data"
+SSV_PATHS = sorted(DATA.glob("*.ssv"))
+
+
+def assert_protects_king(board: Board) -> None:
+    """Compare `board.targets_of` with those found by trying each move on a copy."""
+    pseudo_board = deepcopy(board)
+    pseudo_board.protect_king = False
+    pseudo_board.update_targets()
+
+    for coord, pseudo_targets in pseudo_board.targets_of.items():
+        targets = board.targets_of[coord]
+        for target in pseudo_targets | targets:
+            assert (target in targets) is not exposes_king_by_copy(board, coord, target)
 
 
 def test_init() -> None:
@@ -76,8 +93,156 @@ def test_check_prevention() -> None:
     assert expected_targets == board.targets_of[coord]
 
 
+def test_pin() -> None:
+    board, expected_targets = board_from_ssv(DATA / "pin.ssv")
+    coord = V(4, 5)
+    assert board[coord] == Piece(Role.ROOK, Player.ONE, moved=True)
+    assert expected_targets == board.targets_of[coord]
+
+
+@mark.parametrize("path", SSV_PATHS, ids=[p.stem for p in SSV_PATHS])
+def test_protect_king(path: Path) -> None:
+    board, _ = board_from_ssv(path)
+    assert_protects_king(board)
+
+
+def test_protect_king_random_game() -> None:
+    rng = random.Random(1)
+    board = Board()
+    for ply in range(30):
+        src = rng.choice([v for v in board if board.can_move_from(v)])
+        board.process_move(src, rng.choice(sorted(board.targets_of[src], key=tuple)))
+        if ply % 10 == 9:  # the reference is slow, so only check a few positions
+            assert_protects_king(board)
+
+
 def test_stalemate() -> None:
     board, _ = board_from_ssv(DATA / "stalemate.ssv")
     board.ply = 11
     board.update_targets()
     print(not board.can_move() and not board.in_check())
+
+
+def test_make_unmake() -> None:
+    rng = random.Random(2)
+    board = Board()
+    for _ in range(40):
+        before = deepcopy(board)
+        src = rng.choice([v for v in board if board.can_move_from(v)])
+        dst = rng.choice(sorted(board.targets_of[src], key=tuple))
+        piece = board[src]
+        promote = piece and piece.role is Role.PAWN and dst.y in [0, 7]
+        undo = board.make_move(src, dst, promote_to=Role.QUEEN if promote else None)
+
+        after = deepcopy(board)
+        assert board.unmake_move(undo) is undo
+        assert board == before and board.targets_of == before.targets_of
+        assert (board.ply, board.passant) == (before.ply, before.passant)
+        assert board.halfmove == before.halfmove
+        assert board.taken_pieces == before.taken_pieces
+        assert board.history == before.history
+
+        board.make_move(src, dst, promote_to=Role.QUEEN if promote else None)
+        assert board == after and board.targets_of == after.targets_of
+
+
+def test_unmake_out_of_order() -> None:
+    board = Board()
+    first = board.make_move(V(4, 6), V(4, 4))
+    board.make_move(V(4, 1), V(4, 3))
+    with raises(RuntimeError):
+        board.unmake_move(first)
+    board.unmake_move()
+    board.unmake_move(first)
+    with raises(RuntimeError):
+        board.unmake_move()
+
+
+def test_incremental() -> None:
+    rng = random.Random(3)
+    board = Board(incremental=True)
+    board.verify_incremental = True
+    for _ in range(60):
+        src = rng.choice([v for v in board if board.can_move_from(v)])
+        dst = rng.choice(sorted(board.targets_of[src], key=tuple))
+        piece = board[src]
+        promote = piece and piece.role is Role.PAWN and dst.y in [0, 7]
+        board.make_move(src, dst, promote_to=Role.QUEEN if promote else None)
+        if rng.random() < 0.3:
+            board.unmake_move()
+            board.update_targets([])
+
+
+def test_fen() -> None:
+    assert Board().to_fen() == START_FEN
+    board = Board()
+    for src, dst in [(V(4, 6), V(4, 4)), (V(6, 0), V(5, 2)), (V(6, 7), V(5, 5))]:
+        board.process_move(src, dst)
+    fen = "rnbqkb1r/pppppppp/5n2/8/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 2 2"
+    assert board.to_fen() == fen
+
+    copy = Board.from_fen(fen)
+    assert copy.to_fen() == fen
+    assert copy.key == board.key and copy.targets_of == board.targets_of
+
+
+def test_position_info() -> None:
+    board = Board()
+    moves = board.legal_moves()
+    assert board.info and board.info.moves == moves and len(moves) == 20
+    assert board.king_squares() == [V(4, 7)] and not board.in_check()
+    assert board.movable_squares() == [v for v in board if board.can_move_from(v)]
+
+    # fool's mate; each move finds the answers anew
+    for src, dst in [("f2", "f3"), ("e7", "e5"), ("g2", "g4"), ("d8", "h4")]:
+        board.process_move(from_algebraic(src), from_algebraic(dst))
+        assert board.can_move() is (board.ending() is None)
+    assert board.in_check() and not board.in_check(Player.TWO)
+    assert board.legal_moves() == [] and board.ending() is Ending.CHECKMATE
+    board.unmake_move()
+    assert not board.in_check() and board.can_move()
+
+
+def test_repetition() -> None:
+    board = Board()
+    shuffle = [("g1", "f3"), ("g8", "f6"), ("f3", "g1"), ("f6", "g8")]
+    for src, dst in 2 * shuffle:
+        assert board.ending() is None
+        board.process_move(from_algebraic(src), from_algebraic(dst))
+    assert board.repetitions() == 3 and board.ending() is Ending.REPETITION
+
+    board.history.forget()  # the records go, but the positions are still counted
+    assert len(board.history) == 0 and board.ending() is Ending.REPETITION
+    board.process_move(from_algebraic("e2"), from_algebraic("e4"))
+    assert board.repetitions() == 1 and board.ending() is None
+
+
+def test_fifty_moves() -> None:
+    board = Board.from_fen("4k3/8/8/8/8/8/4P3/R3K3 w Q - 99 80")
+    board.process_move(from_algebraic("a1"), from_algebraic("a2"))
+    assert board.ending() is Ending.FIFTY_MOVES
+    board.unmake_move()
+    board.process_move(from_algebraic("e2"), from_algebraic("e3"))  # a pawn moved
+    assert board.halfmove == 0 and board.ending() is None
+
+
+def test_fen_promotion() -> None:
+    board = Board.from_fen("8/P6k/8/8/8/8/8/K7 w - - 5 40")
+    board.make_move(V(0, 1), V(0, 0), promote_to=Role.QUEEN)
+    assert board.to_fen() == "Q7/7k/8/8/8/8/8/K7 b - - 0 40"  # a pawn moved
+
+
+def test_fen_invalid() -> None:
+    for fen in [
+        "8/8/8/8/8/8/8/8 w - a1 0 1",  # en passant off the third & sixth ranks
+        "4k3/8/8/8/4P3/8/8/4K3 w - e3 0 1",  # the square of the side to move
+        "8/8/8/8/8/8/8/8 x - - 0 1",
+    ]:
+        with raises(ValueError):
+            Board.from_fen(fen)
+
+
+def test_setup() -> None:
+    board = Board(Setup({V(x, y): None for x in range(8) for y in range(8)}, ply=3))
+    assert not any(board.values()) and board.active_player is Player.TWO
+    assert board.to_fen() == "8/8/8/8/8/8/8/8 b - - 0 2"
@@ -0,0 +1,65 @@
+"""Tests for `compact.py`."""
+import pickle
+import random
+import sys
+
+from pytest import raises
+
+from jchess.bitboard import compute_masks
+from jchess.board import Board
+from jchess.compact import SIZE, CompactBoard
+from jchess.geometry import V
+from jchess.testutils import board_to_ssv
+from jchess.zobrist import zobrist_key
+
+PASSANT_FEN = "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+
+
+def test_round_trip() -> None:
+    rng = random.Random(0)
+    board = Board()
+    for _ in range(60):
+        if not (moves := board.legal_moves()):
+            break
+        move = rng.choice(moves)
+        board.process_move(move.src, move.dst, promote_to=move.promote_to)
+
+        compact = CompactBoard.from_board(board)
+        assert dict(compact) == dict(board)
+        assert compact.to_board().to_fen() == board.to_fen()
+        assert compact.target_masks() == compute_masks(board, board.passant)
+        assert zobrist_key(compact, compact.ply, compact.passant) == board.key
+
+
+def test_mapping() -> None:
+    board = Board.from_fen(PASSANT_FEN)
+    compact = CompactBoard.from_board(board)
+    assert set(compact) == set(board)
+    assert compact[V(4, 3)] == board[V(4, 3)]
+    assert compact == board
+    assert (compact.passant, compact.ply, compact.halfmove) == (board.passant, 4, 0)
+    assert board_to_ssv(compact, set()) == board_to_ssv(board, set())
+    with raises(KeyError):
+        _ = compact[V(8, 0)]
+
+
+def test_size() -> None:
+    compact = CompactBoard.from_board(Board())
+    assert len(compact.data) == SIZE
+    assert sys.getsizeof(compact) + sys.getsizeof(compact.data) < 200
+    assert not hasattr(compact, "__dict__")
+
+
+def test_value_semantics() -> None:
+    compact = CompactBoard.from_board(Board())
+    assert compact == CompactBoard(bytes(compact.data))
+    assert len({compact, CompactBoard.from_board(Board())}) == 1
+    assert pickle.loads(pickle.dumps(compact)) == compact
+    with raises(ValueError):
+        CompactBoard(bytes(SIZE - 1))
+    with raises(ValueError):
+        CompactBoard(b"\x07" + bytes(SIZE - 1))
+    with raises(ValueError):
+        CompactBoard(bytes(64) + bytes([100]) + bytes(SIZE - 65))
+    with raises(ValueError):
+        CompactBoard(bytes(64) + bytes([8]) + bytes(SIZE - 65))  # on the 7th rank
@@ -0,0 +1,96 @@
+from collections.abc import Iterator
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import DEFAULT, Mock, patch
+
+from pytest import raises
+
+import jchess.terminal._writer
+from jchess.board import Board, from_algebraic
+from jchess.compact import CompactBoard
+from jchess.db import Builder, Database, Stats, build
+from jchess.display import DEFAULT_PALLET, DEFAULT_SYMBOLS, Display
+from jchess.game import Game, Mode, Status
+from jchess.pgn import to_pgn
+from jchess.selfplay import Settings, play_games
+
+FOOLS_MATE = [("f2", "f3"), ("e7", "e5"), ("g2", "g4"), ("d8", "h4")]
+
+
+def fools_mate() -> Board:
+    board = Board()
+    for src, dst in FOOLS_MATE:
+        board.process_move(from_algebraic(src), from_algebraic(dst))
+    return board
+
+
+def test_build(tmp_path: Path) -> None:
+    records = BytesIO()
+    summary = play_games(3, settings=Settings(max_plies=20), record=records)
+    (tmp_path / "games.jcr").write_bytes(records.getvalue())
+    (tmp_path / "games.pgn").write_text(2 * (to_pgn(fools_mate()) + "\n"))
+
+    path = tmp_path / "positions.db"
+    records_path, pgn_path = tmp_path / "games.jcr", tmp_path / "games.pgn"
+    positions = build(path, records=[records_path], pgns=[pgn_path])
+    assert 4 <= positions <= summary.plies + 4
+
+    with Database(path) as database:
+        assert len(database) == positions
+        assert list(database.keys) == sorted(database.keys)
+
+        board = fools_mate()
+        entry = database.lookup(board.key)
+        assert entry and entry.stats == Stats(games=2, two_wins=2)
+        assert entry.position == CompactBoard.from_board(board)
+        assert entry.record.obj is database.keys.obj  # a view, not a copy
+        del entry  # so the database can be closed
+
+        assert database.lookup(Board().key) is None  # only positions after a move
+        assert database.lookup(0) is None and database.lookup(2**64 - 1) is None
+
+
+def test_repetition_counted_once(tmp_path: Path) -> None:
+    def shuffle() -> Iterator[Board]:
+        board = Board()
+        for src, dst in 2 * [("g1", "f3"), ("g8", "f6"), ("f3", "g1"), ("f6", "g8")]:
+            board.process_move(from_algebraic(src), from_algebraic(dst))
+            yield board
+
+    builder = Builder()
+    builder.add_game(shuffle())  # drawn by repetition
+    assert builder.write(tmp_path / "positions.db") == 4
+
+    with Database(tmp_path / "positions.db") as database:
+        for key in database.keys:
+            entry = database.lookup(key)
+            assert entry and entry.stats == Stats(games=1, draws=1)
+        del entry
+
+
+def test_invalid(tmp_path: Path) -> None:
+    for data in [b"JCDB", b"JCDB" + bytes(20), b"not a database at all"]:
+        (path := tmp_path / "invalid.db").write_bytes(data)
+        with raises(ValueError):
+            Database(path)
+
+
+@patch.multiple(jchess.terminal._writer, os=DEFAULT)
+def _test_display_stats(tmp_path: Path, os: Mock) -> None:
+    os.write.side_effect = lambda fd, data: len(data)
+    builder = Builder()
+    builder.add_game([fools_mate()], "0-1")
+    builder.write(tmp_path / "positions.db")
+
+    game = Game()
+    game.mode, game.status = Mode.LTP, Status.BOARD_FOCUS
+    game.board = fools_mate()
+    with Database(tmp_path / "positions.db") as database:
+        display = Display(game, DEFAULT_PALLET, DEFAULT_SYMBOLS, database)
+        display.refresh()
+    screen = "\n".join("".join(char for char, _ in row) for row in display.frame.back)
+    assert "Seen in 1 game(s); ONE won 0%, TWO 100%." in screen
+
+
+def test_display_stats(tmp_path: Path) -> None:
+    _test_display_stats(tmp_path)  # pylint: disable=no-value-for-parameter
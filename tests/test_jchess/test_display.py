@@ -0,0 +1,89 @@
+"""Tests for `jchess.display`."""
+from unittest.mock import DEFAULT, Mock, patch
+
+import jchess.terminal._writer
+from jchess.action import Action
+from jchess.display import DEFAULT_PALLET, DEFAULT_SYMBOLS, Display
+from jchess.display._frame import FrameBuffer, layout
+from jchess.game import Game
+from jchess.pieces import Player
+
+
+def test_frame_buffer() -> None:
+    frame = FrameBuffer(10, 3)
+    frame.draw("ab", clr="*", at=(2, 2))
+    first = "\x1b[2;2H\x1b[0m*ab\x1b[0m"
+    assert frame.flush() == first
+    assert frame.flush() == ""
+    assert frame.frame_bytes == 0
+
+    # nearby changes are coalesced into one run, distant ones are not
+    frame.draw("x", at=(1, 1))
+    frame.draw("y", at=(4, 1))
+    frame.draw("z", at=(10, 3))
+    last = "\x1b[1;1Hx  y\x1b[3;10Hz"
+    assert frame.flush() == last
+    assert (frame.frames, frame.total_bytes) == (3, len(first) + len(last))
+
+
+def test_frame_buffer_edge() -> None:
+    frame = FrameBuffer(5, 4)
+    frame.draw("ab\ncd", at=(2, 2), edge=True)
+    frame.draw("out of bounds", at=(4, 4))
+    assert ["".join(char for char, _ in row) for row in frame.back] == [
+        "+--+ ",
+        "|ab| ",
+        "|cd| ",
+        "+--ou",
+    ]
+
+
+@patch.multiple(jchess.terminal._writer, os=DEFAULT)
+@patch.multiple(Game, get_action=DEFAULT)
+def _test_cursor_move_bytes(get_action: Mock, os: Mock) -> None:
+    os.write.side_effect = lambda fd, data: len(data)
+    actions = [Action.DOWN, Action.SELECT, Action.RIGHT, Action.UP, Action.LEFT]
+    get_action.side_effect = actions
+    game = Game()
+    display = Display(game, DEFAULT_PALLET, DEFAULT_SYMBOLS)
+
+    frame_bytes = []
+    for _ in actions:
+        game.evolve_state()
+        display.refresh()
+        frame_bytes.append(display.frame.frame_bytes)
+
+    assert os.write.call_count == len(actions)  # a single system call per frame
+    assert len(os.write.call_args.args[1]) == display.frame.frame_bytes
+    assert frame_bytes[1] > 2000  # the whole board is drawn once
+    assert all(n < 200 for n in frame_bytes[2:])  # then only the cursor moves
+
+
+def test_cursor_move_bytes() -> None:
+    _test_cursor_move_bytes()  # pylint: disable=no-value-for-parameter
+
+
+def test_layout_cache() -> None:
+    layout.cache_clear()
+    frame = FrameBuffer(10, 3)
+    for _ in range(3):
+        frame.draw("ab", clr="*", at=(2, 2), edge=True)
+    assert (layout.cache_info().hits, layout.cache_info().misses) == (2, 1)
+    assert layout("ab", "*", (2, 2), True)[0] == (2, 2, (("a", "*"), ("b", "*")))
+
+
+@patch.multiple(jchess.terminal._writer, os=DEFAULT)
+def _test_remote_display(os: Mock) -> None:
+    os.write.side_effect = lambda fd, data: len(data)
+    game = Game()
+    game.play_remotely(Player.TWO)
+    display = Display(game, DEFAULT_PALLET, DEFAULT_SYMBOLS)
+    display.refresh()  # the main board is drawn without the start menu
+
+    screen = "\n".join("".join(char for char, _ in row) for row in display.frame.back)
+    assert "You are Player TWO." in screen
+    assert "remote" in screen and "Arrow keys" in screen
+
+
+def test_remote_display() -> None:
+    _test_remote_display()  # pylint: disable=no-value-for-parameter
@@ -1,4 +1,9 @@
-from jchess.game import Game
+import random
+from unittest.mock import patch
+
+from jchess.action import Action
+from jchess.board import Board, Move
+from jchess.game import Game, Mode, Pacing, Status
 from jchess.geometry import V
 from jchess.pieces import Piece, Player, Role
 from jchess.testutils import patch_inputs
@@ -35,3 +40,51 @@ def test_promotion(game: Game) -> None:
 @patch_inputs("↲ ↑ ↲ ↑ ↑ ↲ ← ↓ ↓ ↲ ↲ ↑ ↑ ↑ ↑ ↑ ↑ ← ↲ ↲ ↓ ↓")
 def test_selection_ignored(game: Game) -> None:
     pass
+
+
+def play_bots(pacing: Pacing, ply_count: int = 6) -> list[tuple[V, V]]:
+    """Play a seeded "Two Dumb Bots" game, returning the moves made."""
+    random.seed(0)
+    game = Game(pacing=pacing)
+    game.mode, game.status = Mode.TDB, Status.BOARD_FOCUS
+    while game.board.ply < ply_count:
+        game.evolve_state()
+    return [(undo.src, undo.dst) for undo in game.board.history]
+
+
+# moves of the seeded game, as played by the original (unpaced) dumb bots
+SEEDED_MOVES = """
+    g2g3 b8c6 b1a3 f7f6 h2h3 c6e5 a1b1 b7b6 g3g4 g7g6 c2c4 e5c4 g1f3 d7d6 d2d3 g8h6
+    c1d2 c7c6 a3c2 h6f5 f3g5 f6g5 f1g2 b6b5 h1h2 e8f7 b1a1 f8g7 a2a4 d6d5 d3c4 e7e5
+    c4d5 b5b4 a1b1 b4b3 g2f3 c6d5 h2g2 d5d4
+"""
+
+
+def test_seeded_moves() -> None:
+    moves = play_bots(Pacing.INSTANT, ply_count=40)
+    assert " ".join(str(Move(src, dst)) for src, dst in moves) == " ".join(
+        SEEDED_MOVES.split()
+    )
+
+
+def test_pacing() -> None:
+    with patch("jchess.game.sleep") as sleep:
+        realtime = play_bots(Pacing.REALTIME)
+        assert sleep.call_count > 0
+        sleep.reset_mock()
+        assert play_bots(Pacing.INSTANT) == realtime
+        assert play_bots(Pacing.FRAME) == realtime
+        assert sleep.call_count == 0
+
+
+def test_promotion_menu_reset() -> None:
+    game = Game()
+    game.board = Board.from_fen("k7/8/8/8/8/8/p7/7K b - - 0 1")
+    game.mode, game.status = Mode.LTP, Status.BOARD_FOCUS
+    game.bcursor, game.pcursor = V(0, 6), 1  # as left by an earlier promotion
+    for action in [Action.SELECT, Action.DOWN, Action.SELECT]:
+        game.apply_action(action)
+    assert game.status is Status.PROMOTING and game.pcursor == 0
+
+    game.apply_action(Action.SELECT)
+    assert game.board[V(0, 7)] == Piece(Role.QUEEN, Player.TWO, moved=True)
@@ -1,7 +1,10 @@
 """Tests for `geometry.py`."""
+import pickle
+from copy import deepcopy
+
 from pytest import raises
 
-from jchess.geometry import V
+from jchess.geometry import OFF_BOARD, SQUARES, V, neighbors, ray, square
 
 
 def test_init() -> None:
@@ -36,3 +39,21 @@ def test_unpacking() -> None:
     assert V(*V(1, 2)) == V(1, 2)
     x, y = V(1, 2)
     assert (x, y) == (1, 2)
+
+
+def test_interned() -> None:
+    assert square(3, 5) is SQUARES[43]
+    assert square(3, 5) == V(3, 5)
+    assert hash(square(3, 5)) == hash(V(3, 5))
+    assert square(8, 0) is square(0, -1) is OFF_BOARD
+    assert deepcopy(square(3, 5)) is square(3, 5)
+    assert pickle.loads(pickle.dumps(square(3, 5))) is square(3, 5)
+    assert pickle.loads(pickle.dumps(V(9, 9))) == V(9, 9)
+
+
+def test_tables() -> None:
+    assert neighbors(V(0, 0), (V(1, 2), V(-1, 2), V(2, 1))) == (V(1, 2), V(2, 1))
+    assert ray(V(5, 5), V(1, -1)) == (V(6, 4), V(7, 3))
+    assert all(
+        a is b for a, b in zip(ray(V(5, 5), V(1, -1)), (SQUARES[38], SQUARES[31]))
+    )
@@ -0,0 +1,97 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from unittest.mock import Mock
+
+from pytest import raises
+
+from jchess.action import ExitGame
+from jchess.board import Board, Move
+from jchess.game import Game, Mode, Pacing
+from jchess.geometry import V
+from jchess.net import Client, Kind, Server, load
+from jchess.pieces import Player, Role
+from jchess.run import play
+
+E2E4 = Move(V(4, 6), V(4, 4))
+E7E5 = Move(V(4, 1), V(4, 3))
+
+
+def with_server(test: Callable[[Server, int], Awaitable[None]]) -> None:
+    """Run `test` with a server listening on a free port of localhost."""
+
+    async def main() -> None:
+        server = Server()
+        async with await server.start(port=0) as listener:
+            await test(server, listener.sockets[0].getsockname()[1])
+
+    asyncio.run(main())
+
+
+async def join_both(port: int) -> tuple[Client, Client]:
+    """Join a game as both of it's players, in order."""
+    one = asyncio.create_task(Client.join(port=port))
+    await asyncio.sleep(0.01)  # so it's the first to join
+    two = await Client.join(port=port)
+    return await one, two
+
+
+def test_encode() -> None:
+    moves = Board().legal_moves() + [Move(V(0, 1), V(1, 0), Role.KNIGHT)]
+    assert [Move.decode(move.encode()) for move in moves] == moves
+    assert all(0 <= move.encode() < 1 << 16 for move in moves)
+    with raises(ValueError):
+        Move.decode(5 << 12)
+
+
+def test_load() -> None:
+    async def test(server: Server, port: int) -> None:
+        summary = await load(10, plies=8, port=port)
+        assert summary.games == 10 and summary.moves == server.moves == 80
+        assert not server.matches and server.waiting is None
+
+    with_server(test)
+
+
+def test_reject() -> None:
+    async def test(server: Server, port: int) -> None:
+        one, two = await join_both(port)
+        assert (one.player, two.player) == (Player.ONE, Player.TWO)
+
+        two.send_move(E7E5)  # out of turn
+        one.send_move(too_far := Move(V(4, 6), V(4, 3)))
+        assert await two.connection.receive() == (Kind.REJECT, E7E5.encode())
+        assert await one.connection.receive() == (Kind.REJECT, too_far.encode())
+        one.send_move(E2E4)
+        assert await anext(two.moves()) == E2E4
+
+        await one.close()  # the opponent is told the game is over
+        assert await two.connection.receive() == (Kind.OVER, 0)
+        await two.close()
+        await asyncio.sleep(0.01)
+        assert not server.matches and server.moves == 1
+
+    with_server(test)
+
+
+def test_remote_game() -> None:
+    async def test(_: Server, port: int) -> None:
+        opponent, client = await join_both(port)
+        game = Game(pacing=Pacing.INSTANT)
+        game.play_remotely(client.player)
+
+        async def keys() -> AsyncIterator[str]:
+            opponent.send_move(E2E4)
+            while game.board.ply < 1:
+                await asyncio.sleep(0.01)
+            for key in ["UP", "UP", "UP", " ", "DOWN", "DOWN", " "]:
+                yield key
+            assert await anext(opponent.moves()) == E7E5
+            yield "\x1b"
+
+        with raises(ExitGame):
+            await play(game, Mock(), keys(), client)
+        assert game.mode is Mode.RMP and game.board.ply == 2
+        await client.close()
+        await opponent.close()
+
+    with_server(test)
@@ -0,0 +1,67 @@
+"""Perft counts of standard positions; a regression guard for move generation."""
+from pytest import CaptureFixture, mark, raises
+
+from jchess.board import START_FEN, Board, Engine, Move
+from jchess.geometry import V
+from jchess.pieces import Role
+from jchess.run import main
+
+# well known reference counts (see the chess programming wiki)
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+POSITIONS = {
+    "start": (START_FEN, [20, 400, 8902]),
+    "kiwipete": (KIWIPETE, [48, 2039, 97862]),
+    "endgame": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812]),
+    "promotions": (
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        [6, 264, 9467],
+    ),
+    "discovered": (
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        [44, 1486, 62379],
+    ),
+}
+ENGINES = {
+    "dict": {"engine": Engine.DICT},
+    "incremental": {"engine": Engine.DICT, "incremental": True},
+    "bitboard": {"engine": Engine.BITBOARD},
+}
+
+
+@mark.parametrize("kwargs", ENGINES.values(), ids=ENGINES.keys())
+@mark.parametrize("fen, counts", POSITIONS.values(), ids=POSITIONS.keys())
+def test_perft(fen: str, counts: list[int], kwargs: dict[str, object]) -> None:
+    board = Board.from_fen(fen, **kwargs)
+    # the deepest counts are slow, so only checked with the fastest engine
+    depth = len(counts) if kwargs["engine"] is Engine.BITBOARD else 2
+    for i, count in enumerate(counts[:depth]):
+        assert board.perft(i + 1) == count
+    assert not board.history
+
+
+def test_divide() -> None:
+    counts = Board().divide(2)
+    assert len(counts) == 20 and sum(counts.values()) == 400
+    assert counts[Move(V(4, 6), V(4, 4))] == 20
+    assert str(Move(V(4, 1), V(4, 0), promote_to=Role.QUEEN)) == "e7e8q"
+
+
+def test_from_fen() -> None:
+    board = Board.from_fen(START_FEN)
+    assert dict(board) == dict(Board()) and board.key == Board().key
+
+    board = Board.from_fen("4k3/8/8/3pP3/8/8/8/4K2R w K d6 0 20")
+    assert board.ply == 38 and board.passant and board.passant.coord == V(3, 3)
+    assert V(3, 2) in board.targets_of[V(4, 3)] and V(6, 7) in board.targets_of[V(4, 7)]
+
+    for fen in ["8/8/8 w - -", "9/8/8/8/8/8/8/8 w - -", "8/8/8/8/8/8/8/8 x - -"]:
+        with raises(ValueError):
+            Board.from_fen(fen)
+    with raises(ValueError):
+        Board.from_fen("8/8/8/8/8/8/8/4K3 w K - 0 1")
+
+
+def test_main(capsys: CaptureFixture[str]) -> None:
+    main(["perft", "--depth", "2", "--divide", "--engine", "dict"])
+    out = capsys.readouterr().out
+    assert "e2e4: 20" in out and "Nodes: 400" in out
@@ -0,0 +1,107 @@
+import random
+from io import StringIO
+from pathlib import Path
+
+from pytest import mark, raises
+
+from jchess.board import Board, Move, from_algebraic
+from jchess.game import Game, Mode
+from jchess.pgn import export, parse_san, read_games, san, to_pgn
+from jchess.pieces import Role
+from jchess.run import save_game
+from jchess.selfplay import random_move
+
+COLLECTION = """\
+[Event "Casual \\"blitz\\""]
+[Site "?"]
+[Result "0-1"]
+
+1. f3 {the worst move} e5 2. g4?! (2. e4 Nc6) 2... Qh4# $4 0-1
+
+[Event "Second"]
+[Result "*"]
+% an escaped line
+1.e4 c5 2.Nf3
+*
+"""
+
+
+@mark.parametrize(
+    "fen, uci, expected",
+    [
+        ("4k3/8/8/8/8/5N2/8/1N2K3 w - - 0 1", "b1d2", "Nbd2"),
+        ("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1", "a1a3", "R1a3"),
+        ("4k3/8/8/8/8/Q7/8/Q1Q1K3 w - - 0 1", "a1b2", "Qa1b2"),
+        ("4k3/P7/8/8/8/8/8/4K3 w - - 0 1", "a7a8q", "a8=Q+"),
+        ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "e1c1", "O-O-O"),
+        ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "e8g8", "O-O"),
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2", "e5d6", "exd6"),
+        (
+            "rnbqkbnr/pppp1ppp/8/4p3/6P1/5P2/PPPPP2P/RNBQKBNR b KQkq - 0 2",
+            "d8h4",
+            "Qh4#",
+        ),
+    ],
+)
+def test_san(fen: str, uci: str, expected: str) -> None:
+    board = Board.from_fen(fen)
+    roles = {"q": Role.QUEEN}
+    move = Move(from_algebraic(uci[:2]), from_algebraic(uci[2:4]), roles.get(uci[4:]))
+    assert san(board, move) == expected
+    assert parse_san(board, expected) == move
+    assert board.to_fen() == fen  # the move was unmade
+
+
+def test_parse_san_invalid() -> None:
+    board = Board.from_fen("4k3/8/8/8/8/5N2/8/1N2K3 w - - 0 1")
+    for text in ["Nd2", "Ne5x", "Ke3e4", "O-O", "e4"]:  # ambiguous, not SAN or illegal
+        with raises(ValueError):
+            parse_san(board, text)
+
+
+def test_export_and_read() -> None:
+    rng = random.Random(3)
+    board = Board()
+    while board.ply < 300 and not board.ending():
+        move = random_move(board, rng)
+        board.process_move(move.src, move.dst, promote_to=move.promote_to)
+    fen = board.to_fen()
+
+    text = to_pgn(board, {"Event": 'A "random" game'})
+    assert board.to_fen() == fen and len(board.history) == board.ply
+    assert all(len(line) <= 80 for line in text.splitlines())
+
+    (game,) = read_games(StringIO(text))
+    assert game.headers["Event"] == 'A "random" game' and game.result in text
+    *_, final = game.replay()
+    assert final.to_fen() == fen
+
+
+def test_read_collection() -> None:
+    first, second = read_games(StringIO(COLLECTION))
+    assert first.headers == {"Event": 'Casual "blitz"', "Site": "?", "Result": "0-1"}
+    assert first.sans() == ["f3", "e5", "g4?!", "Qh4#"]  # without the variation
+    assert [board.ply for board in first.replay()] == [1, 2, 3, 4]
+    assert second.sans() == ["e4", "c5", "Nf3"] and second.result == "*"
+
+    # the moves can be skipped, when only the headers are wanted
+    headers = [game.headers for game in read_games(StringIO(COLLECTION), moves=False)]
+    assert headers == [first.headers, second.headers]
+    assert not next(read_games(StringIO(COLLECTION), moves=False)).movetext
+
+
+def test_export_game(tmp_path: Path) -> None:
+    game = Game()
+    game.mode = Mode.VAI
+    for src, dst in [("f2", "f3"), ("e7", "e5"), ("g2", "g4"), ("d8", "h4")]:
+        game.board.process_move(from_algebraic(src), from_algebraic(dst))
+
+    text = export(game)
+    assert '[White "Player"]' in text and '[Black "AI"]' in text
+    assert text.endswith("1. f3 e5 2. g4 Qh4# 0-1\n") and '[Result "0-1"]' in text
+
+    path = tmp_path / "games.pgn"
+    save_game(game, str(path))
+    save_game(Game(), str(path))  # no moves, so not saved
+    save_game(game, str(path))
+    assert len(list(read_games(path.open(encoding="utf-8")))) == 2
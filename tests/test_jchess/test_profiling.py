@@ -0,0 +1,39 @@
+from pathlib import Path
+from pstats import Stats
+
+from pytest import CaptureFixture, MonkeyPatch
+
+from jchess.profiling import PROFILE_ENV, PROFILER, session, timed
+from jchess.run import main
+
+
+@timed("double")
+def double(x: int) -> int:
+    return 2 * x
+
+
+def test_session(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    assert double(1) == 2 and "double" not in PROFILER.stats  # only timed if enabled
+    path = tmp_path / "test.prof"
+    with session(str(path)) as profiler:
+        assert double(2) == 4 and double(3) == 6
+        profiler.add("bytes", 10)
+        profiler.add("bytes", 5)
+    double(4)
+
+    assert PROFILER.stats["double"].calls == 2
+    assert PROFILER.stats["bytes"].amount == 15
+    err = capsys.readouterr().err
+    assert "double" in err and str(path) in err
+    assert Stats(str(path)).total_calls > 0  # type: ignore[attr-defined]
+
+
+def test_main_profile(
+    tmp_path: Path, monkeypatch: MonkeyPatch, capsys: CaptureFixture[str]
+) -> None:
+    path = tmp_path / "perft.prof"
+    monkeypatch.setenv(PROFILE_ENV, str(path))
+    main(["perft", "--depth", "2", "--engine", "dict"])
+    err = capsys.readouterr().err
+    assert "Board.update_targets" in err and "Board.__risky_targets" in err
+    assert path.exists()
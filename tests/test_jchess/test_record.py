@@ -0,0 +1,70 @@
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+from pytest import raises
+
+from jchess.board import Board, Move
+from jchess.geometry import V
+from jchess.record import RecordWriter, read_games, replay
+from jchess.run import main
+from jchess.search import Budget, Searcher
+from jchess.selfplay import Settings, play_games
+
+E2E4 = Move(V(4, 6), V(4, 4))
+E7E5 = Move(V(4, 1), V(4, 3))
+G1F3 = Move(V(6, 7), V(5, 5))
+
+
+def test_write_and_read() -> None:
+    file = BytesIO()
+    with RecordWriter(file) as writer:
+        board = Board()
+        writer.attach(board)
+        for move in [E2E4, E7E5]:
+            board.process_move(move.src, move.dst)
+        Searcher(Budget(seconds=None, nodes=50)).search(board)  # records nothing
+        writer.write_game([G1F3])  # ends the first game
+        writer.attach(board := Board())
+        board.process_move(E2E4.src, E2E4.dst)
+    assert writer.games == 3 and board.history.recorder is None
+    assert len(file.getvalue()) == 2 * (3 + 2 + 2)  # each game ends with `END`
+
+    for chunk_size in [3, 1 << 16]:  # moves split between chunks are read whole
+        file.seek(0)
+        with patch("jchess.record.CHUNK_SIZE", chunk_size):
+            games = [list(map(Move.decode, game)) for game in read_games(file)]
+        assert games == [[E2E4, E7E5], [G1F3], [E2E4]]
+
+    *_, final = replay(move.encode() for move in games[0])
+    assert (
+        final.to_fen()
+        == "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2"
+    )
+
+
+def test_read_invalid() -> None:
+    with raises(ValueError):
+        list(read_games(BytesIO(E2E4.encode().to_bytes(2, "little") + b"\x00")))
+    with raises(ValueError):
+        list(replay([E7E5.encode()]))  # out of turn
+
+    # an unended game is still read
+    games = read_games(BytesIO(E2E4.encode().to_bytes(2, "little")))
+    assert [list(game) for game in games] == [[E2E4.encode()]]
+
+
+def test_selfplay(tmp_path: Path) -> None:
+    file = BytesIO()
+    summary = play_games(4, settings=Settings(max_plies=30), record=file)
+    file.seek(0)
+    games = list(read_games(file))
+    assert len(games) == 4 and sum(map(len, games)) == summary.plies
+
+    path = tmp_path / "games.jcr"
+    args = ["--games", "4", "--workers", "2", "--max-plies", "30"]
+    main(["selfplay", *args, "--record", str(path)])
+    assert path.read_bytes() == file.getvalue()
+    for game in games:
+        for board in replay(game):
+            assert board.ending() is None or board.ply == len(game)
@@ -1,22 +1,65 @@
+import asyncio
+from collections.abc import AsyncIterator
+from time import perf_counter
 from unittest.mock import DEFAULT, Mock, patch
 
+from pytest import raises
+
 import jchess.display._class
-import jchess.game
-import jchess.run
-from jchess.action import Action
-from jchess.run import run
+import jchess.terminal
+from jchess.action import ExitGame
+from jchess.game import Game, Pacing
+from jchess.run import play, run
+from jchess.search import Budget
+
+# select "Versus AI" (the start menu wraps around) then move the king's pawn forward 2
+VAI_OPENING = ["UP", " ", "UP", " ", "UP", "UP", " "]
+
 
+async def type_keys(keys: list[str], pause: float = 0.0) -> AsyncIterator[str]:
+    for key in keys:
+        yield key
+    await asyncio.sleep(pause)
+    yield "\x1b"
 
-@patch.multiple(jchess.display._class, os=DEFAULT, terminal=DEFAULT, print=DEFAULT)
-@patch.multiple(jchess.run.Game, get_action=DEFAULT)  # type: ignore
-def _test_run(get_action: Mock, print: Mock, terminal: Mock, os: Mock) -> None:
-    get_action.side_effect = list(Action) + [Action.IGNORE]
-    run()
 
-    assert get_action.call_count == len(Action) + 1
-    assert print.call_count == len(Action) + 1
+@patch.multiple(jchess.display._class, os=DEFAULT, terminal=DEFAULT)
+@patch.multiple(jchess.terminal, read_keys=DEFAULT)
+def _test_run(read_keys: Mock, terminal: Mock, os: Mock) -> None:
+    read_keys.side_effect = lambda: type_keys(["DOWN", " ", "w", " "])
+    run(Pacing.INSTANT)
+    read_keys.assert_called_once()
+    assert terminal.Writer().flush.call_count > 2  # entering, refreshing & exiting
+    assert os.get_terminal_size.called
 
 
 def test_run() -> None:
     # I don't know why, but it is necessary to wrap the patched function
     _test_run()
+
+
+def test_quit_while_bot_thinks() -> None:
+    game = Game(budget=Budget(seconds=None), pacing=Pacing.INSTANT)  # searches forever
+    display = Mock()
+    start = perf_counter()
+    with raises(ExitGame):
+        asyncio.run(play(game, display, type_keys(VAI_OPENING, pause=0.2)))
+
+    assert perf_counter() - start < 2
+    assert game.board.ply == 1
+    assert display.refresh.called
+
+
+def test_bots_play_between_keys() -> None:
+    game = Game(pacing=Pacing.INSTANT)
+
+    async def keys() -> AsyncIterator[str]:
+        yield " "  # select the mode
+        while game.board.ply < 6:
+            await asyncio.sleep(0.01)
+        yield "\x1b"
+
+    game.scursor = 2  # "Two Dumb Bots"
+    with raises(ExitGame):
+        asyncio.run(play(game, Mock(), keys()))
+    assert game.board.ply >= 6
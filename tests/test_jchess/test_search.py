@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from pytest import raises
+
+from jchess.board import Board, Move
+from jchess.geometry import V
+from jchess.search import (
+    MATE,
+    MAX_DEPTH,
+    Bound,
+    Budget,
+    Entry,
+    Searcher,
+    TranspositionTable,
+    legal_moves,
+)
+from jchess.testutils import board_from_ssv
+
+DATA = Path(__file__).parent / "data"
+
+
+def test_legal_moves() -> None:
+    board = Board()
+    moves = legal_moves(board)
+    assert len(moves) == 20
+    assert Move(V(6, 7), V(5, 5)) in moves
+
+
+def test_mate_in_one() -> None:
+    board, _ = board_from_ssv(DATA / "mate_in_one.ssv")
+    result = Searcher().search(board, Budget(seconds=None, depth=3))
+    assert result.move == Move(V(6, 7), V(6, 0))
+    assert result.score >= MATE - MAX_DEPTH
+
+
+def test_no_moves() -> None:
+    board, _ = board_from_ssv(DATA / "stalemate.ssv")
+    board.ply = 11
+    board.update_targets()
+    result = Searcher().search(board)
+    assert result.move is None and result.depth == 0
+
+
+def test_budget() -> None:
+    board = Board()
+    key = board.key
+    result = Searcher().search(board, Budget(seconds=None, nodes=50))
+    assert result.nodes <= 51 and result.move in legal_moves(board)
+    assert result.nps > 0
+    # the searched board is left untouched
+    assert board.key == key and not board.history
+
+
+def test_transposition_table() -> None:
+    with raises(ValueError):
+        TranspositionTable(3)
+
+    table = TranspositionTable(4)
+    table.store(Entry(1, 5, 10, Bound.EXACT, None))
+    table.store(Entry(5, 2, 20, Bound.EXACT, None))  # same slot, but shallower
+    assert table.probe(5) is None
+    entry = table.probe(1)
+    assert entry and entry.score == 10
+
+    table.new_search()  # old entries are replaced regardless of depth
+    table.store(Entry(5, 2, 20, Bound.EXACT, None))
+    assert table.probe(1) is None
+    entry = table.probe(5)
+    assert entry and entry.score == 20
+
+
+def test_stop_before_search() -> None:
+    searcher = Searcher(Budget(seconds=None))
+    searcher.stop()  # eg from another thread, before this one starts searching
+    result = searcher.search(Board())
+    assert result.move and result.depth == 0
@@ -0,0 +1,32 @@
+from pytest import CaptureFixture
+
+from jchess.run import main
+from jchess.selfplay import Bot, Outcome, Settings, play_game, play_games
+
+
+def test_play_game() -> None:
+    result = play_game(0)
+    assert result == play_game(0), "Games should be reproducible from their seed."
+    assert result.outcome is not Outcome.PLY_LIMIT  # games end by the rules
+
+    result = play_game(0, Settings(max_plies=10))
+    assert result.outcome is Outcome.PLY_LIMIT and result.plies == 10
+
+
+def test_ai_beats_random() -> None:
+    settings = Settings(bots=(Bot.RANDOM, Bot.AI), nodes=200)
+    assert play_game(1, settings).outcome is Outcome.TWO_WINS
+
+
+def test_play_games() -> None:
+    summary = play_games(8, workers=1, settings=Settings(max_plies=40))
+    parallel = play_games(8, workers=2, settings=Settings(max_plies=40))
+    assert summary.games == parallel.games == 8
+    assert summary.outcomes == parallel.outcomes
+    assert summary.average_plies == parallel.average_plies
+
+
+def test_main(capsys: CaptureFixture[str]) -> None:
+    main(["selfplay", "--games", "2", "--workers", "1", "--max-plies", "10"])
+    out = capsys.readouterr().out
+    assert "Games: 2" in out and "Average plies: 10.0" in out
@@ -0,0 +1,67 @@
+"""Tests for `jchess.terminal`."""
+import os
+import sys
+from unittest.mock import patch
+
+from pytest import mark
+
+from jchess.terminal import Writer
+
+
+def test_writer() -> None:
+    read_fd, write_fd = os.pipe()
+    writer = Writer(write_fd)
+    writer.clear()
+    writer.hide_cursor()
+    writer.write("♔")
+    assert os.fstat(read_fd).st_size == 0  # nothing is written until flushed
+
+    assert writer.flush() == len("\x1b[2J\x1b[H\x1b[?25l") + len("♔".encode())
+    assert os.read(read_fd, 100) == "\x1b[2J\x1b[H\x1b[?25l♔".encode()
+    assert writer.flush() == 0
+    assert writer.flushes == 1
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+@mark.skipif(sys.platform == "win32", reason="linux only")
+def test_parse_key() -> None:
+    # pylint: disable-next=import-outside-toplevel
+    from jchess.terminal._linux import parse_key
+
+    assert parse_key("", final=False) is None
+    assert parse_key("ab", final=False) == ("a", "b")
+    assert parse_key("\x1b[A\x1b", final=False) == ("UP", "\x1b")
+    assert parse_key("\x1b[24~", final=False) == ("F12", "")
+    assert parse_key("\x1bOPx", final=False) == ("F1", "x")
+    assert parse_key("\x1b[H", final=False) == ("\x1b[H", "")  # unrecognised
+    assert parse_key("\x1b\x1bx", final=False) == ("\x1b", "x")  # double tapped
+    assert parse_key("\x1bx", final=False) == ("\x1bx", "")  # alt + x
+    assert parse_key("\x1b\x1b[Ax", final=False) == ("\x1b\x1b[A", "x")  # alt + up
+    assert parse_key("\x1b\x1b", final=False) is None
+    assert parse_key("\x1b\x1b", final=True) == ("\x1b", "\x1b")
+
+    # the start of a sequence waits for the rest, unless no more is coming
+    assert parse_key("\x1b", final=False) is None
+    assert parse_key("\x1b[2", final=False) is None
+    assert parse_key("\x1b", final=True) == ("\x1b", "")
+    assert parse_key("\x1b[2", final=True) == ("\x1b", "[2")
+
+
+@mark.skipif(sys.platform == "win32", reason="linux only")
+def test_key_reader() -> None:
+    # pylint: disable=import-outside-toplevel
+    from termios import ISIG, tcgetattr
+    from tty import LFLAG
+
+    from jchess.terminal._linux import KeyReader
+
+    main_fd, tty_fd = os.openpty()
+    with KeyReader(tty_fd) as reader, patch("os.read", wraps=os.read) as read:
+        os.write(main_fd, "\x1b[A\x1b[24~♔\x1b".encode())
+        keys = [reader.read_key() for _ in range(4)]
+        assert keys == ["UP", "F12", "♔", "\x1b"]  # a lone escape is read alone
+        assert read.call_count == 1
+        assert tcgetattr(tty_fd)[LFLAG] & ISIG  # CTRL+C still interrupts
+    os.close(main_fd)
+    os.close(tty_fd)
@@ -0,0 +1,59 @@
+"""Tests for `zobrist.py` and it's use by `Board`."""
+import random
+
+from jchess.board import Board
+from jchess.geometry import V
+from jchess.pieces import Role
+from jchess.zobrist import passant_key, zobrist_key
+
+
+def play(board: Board, moves: str) -> None:
+    """Play moves given as whitespace separated 'x1y1x2y2' strings."""
+    for move in moves.split():
+        x1, y1, x2, y2 = map(int, move)
+        board.process_move(V(x1, y1), V(x2, y2))
+
+
+def test_init() -> None:
+    board = Board()
+    assert board.key == zobrist_key(board, 0, None)
+    assert board.key == Board().key
+
+
+def test_incremental() -> None:
+    rng = random.Random(4)
+    board = Board()
+    for _ in range(80):
+        src = rng.choice([v for v in board if board.can_move_from(v)])
+        dst = rng.choice(sorted(board.targets_of[src], key=tuple))
+        piece = board[src]
+        promote = piece and piece.role is Role.PAWN and dst.y in [0, 7]
+        key = board.key
+        board.make_move(src, dst, promote_to=Role.QUEEN if promote else None)
+        assert board.key == zobrist_key(board, board.ply, board.passant) != key
+        if rng.random() < 0.3:
+            board.unmake_move()
+            assert board.key == key
+
+
+def test_transposition() -> None:
+    board1, board2 = Board(), Board()
+    play(board1, "6755 6052 1725 1022")  # knights out: king side first
+    play(board2, "1725 1022 6755 6052")  # knights out: queen side first
+    assert board1.key == board2.key
+
+
+def test_castling_rights() -> None:
+    board1, board2 = Board(), Board()
+    play(board1, "4645 4142")
+    play(board2, "4645 4142 4746 4041 4647 4140")  # kings step out & back
+    assert dict(board1) != dict(board2)  # only the `moved` flags differ...
+    assert board1.key != board2.key  # ... which removes the right to castle
+
+
+def test_passant() -> None:
+    board1, board2 = Board(), Board()
+    play(board1, "3634 0103 3433 4143")  # e-pawn jumps, so is vulnerable...
+    play(board2, "3634 0102 3433 0203 6755 4142 5567 4243")  # ... but not if it steps
+    assert board1.passant and not board2.passant
+    assert board1.key ^ passant_key(board1.passant) == board2.key